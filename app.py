@@ -4,183 +4,262 @@ Flask Web Application for Website Business Information Scraper
 Provides a web UI for scraping websites and downloading results as CSV.
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 import os
 import json
 import threading
-import time
 from datetime import datetime
-import pandas as pd
+from importlib.util import find_spec
 from scraper import BusinessScraper
-import io
-import requests
-from bs4 import BeautifulSoup
+from journal import CrawlJournal
+from dedupe import iter_deduped, url_digest
+from jobs import FINISHED_STATES, JobManager, JobQueueFullError, QUEUED, RUNNING
+from metrics import JobProfiler, ScrapeMetrics, gauge_lines
+from progress import ProgressAggregator
+from streaming import csv_chunks, gzip_chunks
+from workqueue import JobOptionError, QueueJobManager, WorkQueue
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# Global variables to store scraping state
-scraping_status = {
-    'is_running': False,
-    'current_url': '',
-    'progress': 0,
-    'total_urls': 0,
-    'completed': 0,
-    'results': [],
-    'errors': []
-}
+# Journal of finished URLs, used to resume interrupted runs
+JOURNAL_PATH = os.environ.get('SCRAPER_JOURNAL', 'crawl_journal.db')
+# How many jobs may scrape at the same time
+MAX_JOBS = int(os.environ.get('SCRAPER_MAX_JOBS', 2))
+# Progress is sent as one batched event per interval with a capped message sample
+PROGRESS_INTERVAL = float(os.environ.get('SCRAPER_PROGRESS_INTERVAL', 0.5))
+PROGRESS_MESSAGES = int(os.environ.get('SCRAPER_PROGRESS_MESSAGES', 20))
+# Rows per page of the results API, and how often a followed NDJSON stream checks for new rows
+RESULTS_PAGE_SIZE = 500
+MAX_RESULTS_PAGE_SIZE = 5000
+FOLLOW_POLL_INTERVAL = 0.5
+# With a shared queue database the app only enqueues jobs and reports on them;
+# `python workqueue.py worker` processes on any machine do the scraping
+QUEUE_PATH = os.environ.get('SCRAPER_QUEUE')
+# Jobs started with {"profile": "cprofile"|"sample"} write their profile here (unset disables profiling)
+PROFILE_DIR = os.environ.get('SCRAPER_PROFILE_DIR')
+# Finished jobs are kept as runs of this result store (see resultstore.py; unset keeps them in memory only)
+STORE_DIR = os.environ.get('SCRAPER_STORE')
+# Refuse to start rather than fail every job after it has scraped
+if STORE_DIR and find_spec('pyarrow') is None:
+    raise RuntimeError("SCRAPER_STORE needs pyarrow: pip install pyarrow")
+
+# Phase timings and counters of every job, served on /metrics
+metrics = ScrapeMetrics()
+
+_journal = None
+_journal_lock = threading.Lock()
+
+def get_journal():
+    """The crawl journal shared by all jobs, opened on first use"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = CrawlJournal(JOURNAL_PATH)
+        return _journal
 
 class WebScraper(BusinessScraper):
     """Extended scraper class with web socket support"""
     
-    def __init__(self, socketio):
-        super().__init__()
+    def __init__(self, socketio, job=None, progress=None):
+        super().__init__(metrics=metrics)
         self.socketio = socketio
+        self.job = job
+        self.progress = progress  # ProgressAggregator that batches events
         
     def emit_progress(self, message, progress_type='info'):
         """Emit progress updates to the web client"""
+        if self.progress is not None:
+            self.progress.message(message, progress_type)
+            return
         self.socketio.emit('scraping_update', {
+            'job_id': self.job.id if self.job else None,
             'message': message,
             'type': progress_type,
             'timestamp': datetime.now().strftime('%H:%M:%S')
-        })
+        }, to=self.job.id if self.job else None)
     
-    def scrape_website(self, url):
-        """Override to add progress updates"""
-        try:
-            self.emit_progress(f"🔍 Scraping: {url}", 'scraping')
-            
-            # Add http:// if no protocol specified
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            business_name = self.extract_business_name(soup, url)
-            email = self.extract_email(soup, url)
-            instagram = self.extract_instagram(soup, url)
-            phone = self.extract_phone(soup, url)
-            
-            result = {
-                'Business Name': business_name,
-                'Website': url,
-                'Email': email,
-                'Instagram': instagram,
-                'Phone': phone
-            }
-            
-            self.emit_progress(f"✅ Found: {business_name}", 'success')
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"❌ Error loading {url}: {str(e)}"
-            self.emit_progress(error_msg, 'error')
-            return {
-                'Business Name': 'N/A',
-                'Website': url,
-                'Email': 'N/A',
-                'Instagram': 'N/A',
-                'Phone': 'N/A'
-            }
-        except Exception as e:
-            error_msg = f"❌ Unexpected error with {url}: {str(e)}"
-            self.emit_progress(error_msg, 'error')
-            return {
-                'Business Name': 'N/A',
-                'Website': url,
-                'Email': 'N/A',
-                'Instagram': 'N/A',
-                'Phone': 'N/A'
-            }
+    def log(self, message, progress_type='info'):
+        """Send scraper log lines to the web client instead of the console"""
+        self.emit_progress(message.strip(), progress_type)
     
-    def scrape_websites(self, urls):
-        """Override to add progress tracking"""
+    def scrape_websites(self, urls, journal=None, resume=False):
+        """Override to add progress tracking, journaling and per-job results"""
         results = []
-        total_urls = len(urls)
+        # Spellings of the same site are scraped once, so progress counts distinct sites
+        total_urls = len({url_digest(url) for url in urls if url.strip()})
         
         self.emit_progress(f"🚀 Starting to scrape {total_urls} websites...", 'start')
         
-        for i, url in enumerate(urls, 1):
-            if not scraping_status['is_running']:
-                self.emit_progress("⏹️ Scraping stopped by user", 'warning')
-                break
+        def scrape_each(distinct_urls):
+            for i, url in enumerate(distinct_urls, 1):
+                if self.job is not None and self.job.cancelled:
+                    self.emit_progress("⏹️ Scraping stopped by user", 'warning')
+                    return
                 
-            url = url.strip()
-            if not url:
-                continue
+                # Update progress
+                if self.progress is not None:
+                    self.progress.progress(i, total_urls, url)
+                else:
+                    self.socketio.emit('progress_update', {
+                        'job_id': self.job.id if self.job else None,
+                        'current': i,
+                        'total': total_urls,
+                        'percentage': round(i / total_urls * 100, 1),
+                        'current_url': url
+                    }, to=self.job.id if self.job else None)
+                if self.job is not None:
+                    self.job.current_url = url
                 
-            # Update progress
-            progress = (i / total_urls) * 100
-            self.socketio.emit('progress_update', {
-                'current': i,
-                'total': total_urls,
-                'percentage': round(progress, 1),
-                'current_url': url
-            })
-            
-            result = self.scrape_website(url)
+                # Reuse the journaled result of URLs a previous run already finished
+                if resume and journal is not None:
+                    latest = journal.latest(self.prepare_url(url))
+                    if latest is not None and latest[0] == 'done':
+                        self.emit_progress(f"⏭️ Already scraped: {url}", 'info')
+                        yield latest[1]
+                        continue
+                
+                # Politeness delays are applied per host inside scrape_website
+                yield self.scrape_website(url)
+        
+        for result in iter_deduped(scrape_each, urls):
+            if journal is not None:
+                journal.record(result)
             results.append(result)
-            
-            # Small delay to be respectful to servers
-            if i < total_urls and scraping_status['is_running']:
-                time.sleep(1)
+            if self.job is not None:
+                self.job.add_result(result)
         
         return results
 
-def start_scraping_thread(urls):
-    """Start scraping in a separate thread"""
-    global scraping_status
-    
-    scraping_status['is_running'] = True
-    scraping_status['results'] = []
-    scraping_status['errors'] = []
-    scraping_status['completed'] = 0
-    scraping_status['total_urls'] = len(urls)
-    
+def emit_to_job(event, data):
+    """Send a job's event only to the clients watching that job (its Socket.IO room, see watch_job)"""
+    socketio.emit(event, data, to=data['job_id'])
+
+def completion_event(job_id, total_results, csv_ready):
+    return {
+        'job_id': job_id,
+        'message': f"✅ Scraping complete! Found data for {total_results} websites.",
+        'total_results': total_results,
+        'csv_ready': csv_ready
+    }
+
+def summary_event(job_id, found):
+    return {
+        'job_id': job_id,
+        'business_names': found['Business Name'],
+        'emails': found['Email'],
+        'instagram': found['Instagram'],
+        'phones': found['Phone']
+    }
+
+def store_results(job, results):
+    """Write a finished job's results as a new run of the SCRAPER_STORE result store"""
+    from resultstore import ResultStore
+
+    with ResultStore(STORE_DIR).open_run() as writer:
+        for result in results:
+            writer.write(result)
+    emit_to_job('scraping_update', {
+        'job_id': job.id,
+        'message': f"🗄️ {writer.total} results stored as run {writer.run_id}",
+        'type': 'info',
+        'timestamp': datetime.now().strftime('%H:%M:%S')
+    })
+
+def run_job(job):
+    """Scrape a job's URLs on a job worker thread into the job's result store"""
     try:
-        scraper = WebScraper(socketio)
-        results = scraper.scrape_websites(urls)
-        scraping_status['results'] = results
+        progress = ProgressAggregator(emit_to_job, job.id, PROGRESS_INTERVAL, PROGRESS_MESSAGES)
+        scraper = WebScraper(socketio, job, progress)
+        profile_path = None
+        if job.profile and PROFILE_DIR:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            suffix = 'prof' if job.profile == 'cprofile' else 'stacks'
+            profile_path = os.path.join(PROFILE_DIR, f'{job.id}.{suffix}')
+        # The last batch is flushed before the completion events below
+        # Only this job's thread is profiled; other jobs and the Socket.IO threads run alongside
+        with progress, JobProfiler(profile_path, job.profile or 'cprofile', thread_ids=[threading.get_ident()]):
+            results = scraper.scrape_websites(job.urls, journal=get_journal(), resume=job.resume)
+        if profile_path:
+            emit_to_job('scraping_update', {
+                'job_id': job.id,
+                'message': f"📈 Profile written to {profile_path}",
+                'type': 'info',
+                'timestamp': datetime.now().strftime('%H:%M:%S')
+            })
         
-        # Save to CSV
+        if results and STORE_DIR:
+            store_results(job, results)
+
         if results:
-            df = pd.DataFrame(results)
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False, encoding='utf-8')
-            csv_buffer.seek(0)
-            
-            # Save to file
-            with open('business_info.csv', 'w', encoding='utf-8') as f:
-                f.write(csv_buffer.getvalue())
-            
-            # Send completion message
-            socketio.emit('scraping_complete', {
-                'message': f"✅ Scraping complete! Found data for {len(results)} websites.",
-                'total_results': len(results),
-                'csv_ready': True
-            })
-            
-            # Show summary
-            summary = {
-                'business_names': len([r for r in results if r['Business Name'] != 'N/A']),
-                'emails': len([r for r in results if r['Email'] != 'N/A']),
-                'instagram': len([r for r in results if r['Instagram'] != 'N/A']),
-                'phones': len([r for r in results if r['Phone'] != 'N/A'])
-            }
-            socketio.emit('summary_update', summary)
+            # Send completion message and summary
+            emit_to_job('scraping_complete', completion_event(job.id, len(results), True))
+            emit_to_job('summary_update', summary_event(job.id, job.found))
             
     except Exception as e:
-        socketio.emit('scraping_error', {
+        emit_to_job('scraping_error', {
+            'job_id': job.id,
             'message': f"❌ Scraping failed: {str(e)}",
             'type': 'error'
         })
-    finally:
-        scraping_status['is_running'] = False
+        raise
+
+def watch_queue_jobs():
+    """Queue mode: turn the queue's job counters into the progress events the page listens for"""
+    reported = {job.id for job in job_manager.jobs() if not job.is_running}
+    last_completed = {}
+    while True:
+        socketio.sleep(PROGRESS_INTERVAL)
+        for job in job_manager.jobs():
+            if job.id in reported:
+                continue
+            status = job.status()
+            if last_completed.get(job.id) != status['completed']:
+                last_completed[job.id] = status['completed']
+                emit_to_job('progress_batch', {
+                    'job_id': job.id,
+                    'current': status['completed'],
+                    'total': status['total_urls'],
+                    'percentage': status['progress'],
+                    'current_url': '',
+                    'counts': {},
+                    'messages': [],
+                    'dropped': 0
+                })
+            if not status['is_running']:
+                reported.add(job.id)
+                last_completed.pop(job.id, None)
+                emit_to_job('scraping_complete', completion_event(job.id, status['completed'], status['csv_ready']))
+                emit_to_job('summary_update', summary_event(job.id, status['found']))
+
+if QUEUE_PATH:
+    job_manager = QueueJobManager(WorkQueue(QUEUE_PATH))
+    socketio.start_background_task(watch_queue_jobs)
+else:
+    job_manager = JobManager(run_job, max_workers=MAX_JOBS)
+
+@socketio.on('watch_job')
+def watch_job(data):
+    """Move the client into its job's room, so it gets that job's events and no one else's"""
+    job = job_manager.get(str((data or {}).get('job_id', '')))
+    if job is None:
+        return
+    for room in rooms():
+        if room not in (request.sid, job.id):
+            leave_room(room)
+    join_room(job.id)
+    
+    # Events sent before the client joined are lost; catch it up on a job that already ended
+    status = job.status()
+    if status['is_running']:
+        return
+    if status['error']:
+        emit('scraping_error', {'job_id': job.id, 'message': f"❌ Scraping failed: {status['error']}", 'type': 'error'})
+    else:
+        emit('scraping_complete', completion_event(job.id, status['completed'], status['csv_ready']))
+        emit('summary_update', summary_event(job.id, status['found']))
 
 @app.route('/')
 def index():
@@ -203,50 +282,159 @@ def start_scraping():
         if not urls:
             return jsonify({'error': 'No valid URLs found'}), 400
         
-        # Check if scraping is already running
-        if scraping_status['is_running']:
-            return jsonify({'error': 'Scraping is already in progress'}), 400
+        # Profiling is only offered when the server has somewhere to keep profiles
+        profile = data.get('profile') if PROFILE_DIR else None
+        if profile and profile not in JobProfiler.MODES:
+            return jsonify({'error': f"profile must be one of {', '.join(JobProfiler.MODES)}"}), 400
         
-        # Start scraping in background thread
-        thread = threading.Thread(target=start_scraping_thread, args=(urls,))
-        thread.daemon = True
-        thread.start()
+        # Queue the job; up to MAX_JOBS jobs scrape at the same time
+        try:
+            job = job_manager.submit(urls, resume=bool(data.get('resume')), profile=profile)
+        except JobQueueFullError as e:
+            return jsonify({'error': str(e)}), 429
+        except JobOptionError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             'message': f'Started scraping {len(urls)} websites',
+            'job_id': job.id,
             'total_urls': len(urls)
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def job_or_404(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return None, (jsonify({'error': f'Job {job_id} not found'}), 404)
+    return job, None
+
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    """Get the status of one job"""
+    job, error = job_or_404(job_id)
+    if error:
+        return error
+    return jsonify(job.status())
+
+def flag_arg(name):
+    """Whether a query argument such as ?follow=1 is switched on"""
+    return request.args.get(name, '0').lower() in ('1', 'true', 'yes')
+
+def cursor_args():
+    """The since/limit query arguments of a results request"""
+    since = max(0, request.args.get('since', 0, type=int))
+    limit = request.args.get('limit', RESULTS_PAGE_SIZE, type=int)
+    return since, max(1, min(limit, MAX_RESULTS_PAGE_SIZE))
+
+@app.route('/jobs/<job_id>/results')
+def job_results(job_id):
+    """Result rows from ?since=<offset>, at most ?limit=N; 'next' is the cursor for the following call"""
+    job, error = job_or_404(job_id)
+    if error:
+        return error
+    since, limit = cursor_args()
+    rows = job.results_since(since, limit)
+    return jsonify({
+        'job_id': job.id,
+        'since': since,
+        'next': since + len(rows),
+        'completed': job.completed,
+        'is_running': job.is_running,
+        'results': rows
+    })
+
+@app.route('/jobs/<job_id>/results.ndjson')
+def job_results_ndjson(job_id):
+    """Stream result rows as NDJSON from ?since=<offset>; ?follow=1 keeps streaming until the job ends"""
+    job, error = job_or_404(job_id)
+    if error:
+        return error
+    since = max(0, request.args.get('since', 0, type=int))
+    
+    def generate():
+        for rows in job.iter_result_batches(since, flag_arg('follow'), RESULTS_PAGE_SIZE, FOLLOW_POLL_INTERVAL):
+            yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/jobs/<job_id>/stop', methods=['POST'])
+def stop_job(job_id):
+    """Stop one job after the website it is scraping now"""
+    job, error = job_or_404(job_id)
+    if error:
+        return error
+    job.stop()
+    return jsonify({'message': 'Scraping stopped', 'job_id': job.id})
+
+@app.route('/jobs/<job_id>/download')
+def download_job(job_id):
+    """Stream one job's results as CSV, straight from its result store
+
+    Works while the job is still running (the rows finished so far, or every
+    row until the end with ?follow=1); ?gzip=1 sends a .csv.gz instead and
+    ?normalize=1 normalizes phones, emails and Instagram links and adds a
+    'Duplicate Of' column.
+    """
+    job, error = job_or_404(job_id)
+    if error:
+        return error
+    
+    batches = job.iter_result_batches(0, flag_arg('follow'), RESULTS_PAGE_SIZE, FOLLOW_POLL_INTERVAL)
+    fields = None
+    if flag_arg('normalize'):
+        # pandas is only loaded once somebody asks for cleaned results
+        from postprocess import CLEAN_FIELDS, PostProcessor
+        batches = PostProcessor().iter_batches(batches)
+        fields = CLEAN_FIELDS
+    chunks = csv_chunks(batches, fields)
+    filename = f'business_info_{job.id}.csv'
+    mimetype = 'text/csv'
+    if flag_arg('gzip'):
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 @app.route('/stop_scraping', methods=['POST'])
 def stop_scraping():
-    """Stop the scraping process"""
-    global scraping_status
-    scraping_status['is_running'] = False
+    """Stop the most recent job (kept for older clients)"""
+    job = job_manager.latest()
+    if job is not None:
+        job.stop()
     return jsonify({'message': 'Scraping stopped'})
 
 @app.route('/download_csv')
 def download_csv():
-    """Download the CSV file"""
-    try:
-        if not os.path.exists('business_info.csv'):
-            return jsonify({'error': 'CSV file not found'}), 404
-        
-        return send_file(
-            'business_info.csv',
-            as_attachment=True,
-            download_name='business_info.csv',
-            mimetype='text/csv'
-        )
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    """Download the CSV file of the most recent job (kept for older clients)"""
+    job = job_manager.latest()
+    if job is None:
+        return jsonify({'error': 'No scraping job has been started'}), 404
+    return download_job(job.id)
 
 @app.route('/get_status')
 def get_status():
-    """Get current scraping status"""
-    return jsonify(scraping_status)
+    """Get the status of the most recent job (kept for older clients)"""
+    job = job_manager.latest()
+    if job is None:
+        return jsonify({'is_running': False, 'current_url': '', 'progress': 0, 'total_urls': 0,
+                        'completed': 0, 'failed': 0})
+    return jsonify(job.status())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Phase histograms, result counters and job counts in the Prometheus text format"""
+    jobs = job_manager.jobs()
+    states = [QUEUED, RUNNING] + list(FINISHED_STATES)
+    lines = gauge_lines('scraper_jobs', 'Jobs known to the server, by state',
+                        [({'state': state}, sum(1 for job in jobs if job.state == state)) for state in states])
+    return Response(metrics.render() + '\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     print("🌐 Website Scraper Web App")
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Concurrent scraping engine for the Website Business Information Scraper
+Runs many website fetches at once on an asyncio event loop while reusing the
+BusinessScraper extraction logic, so large lists finish in minutes instead of hours.
+With workers > 0, parsing and extraction move to a pool of worker processes so
+large pages are not limited to one core.
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from crawl import ContactCrawl
+from dedupe import iter_deduped
+from parsers import timed_extract_page
+from politeness import host_key
+from scraper import BusinessScraper
+
+
+class AsyncBusinessScraper(BusinessScraper):
+    """Scraper that keeps many website fetches in flight at once"""
+
+    def __init__(self, concurrency=20, workers=0, max_queued_pages=None, **kwargs):
+        super().__init__(**kwargs)
+        self.concurrency = concurrency
+        # Extraction worker processes (0 extracts on the fetch threads instead)
+        self.workers = workers
+        # Fetched pages allowed to wait for a worker before fetchers are held back
+        self.max_queued_pages = max_queued_pages or workers * 2
+
+        # Keep a pool for every host in the look-ahead window unless asked for more
+        self.mount_adapter(max(kwargs.get('pool_hosts', 256), concurrency * 4),
+                           kwargs.get('pool_per_host') or self.scheduler.max_per_host)
+
+    def prefetch_dns(self, url):
+        """Start a background DNS lookup for the URL's host"""
+        parts = urlsplit(url)
+        if parts.hostname:
+            self.dns_cache.prefetch(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+
+    async def polite_fetch_async(self, url, executor, fetch_slots):
+        """Fetch a page within the per-host limits without tying up a worker while waiting"""
+        loop = asyncio.get_running_loop()
+
+        # Fresh cached pages skip the network and the politeness delays
+        if self.cache is not None:
+            content = await loop.run_in_executor(executor, self.cached_page, url)
+            if content is not None:
+                return content
+
+        host = host_key(url)
+        attempt = 0
+        while True:
+            self.breaker.check(host)
+            # Wait for the host first so a cooling host never holds a global slot
+            await self.scheduler.acquire_async(host)
+            try:
+                async with fetch_slots:
+                    content = await loop.run_in_executor(executor, self.fetch_page, url)
+            except requests.exceptions.RequestException as e:
+                delay = self.retry_delay(host, e, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.breaker.record_success(host)
+                return content
+            finally:
+                self.scheduler.release(host)
+
+            # Back off without holding the host or a fetch slot
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def extract_async(self, content, url, executor, extract_pool, extract_slots):
+        """Extract page fields on a fetch thread or in a worker process"""
+        loop = asyncio.get_running_loop()
+        if extract_pool is None:
+            return await loop.run_in_executor(executor, self.page_fields, content, url)
+
+        # Only raw bytes go to the worker
+        async with extract_slots:
+            fields, timings = await loop.run_in_executor(
+                extract_pool, timed_extract_page, content, url, self.parser, self.contact_pages
+            )
+        self.metrics.observe_phases(timings)
+        self.record_candidates(fields)
+        return fields
+
+    async def fetch_contact_page_async(self, link, executor, fetch_slots, extract_pool, extract_slots):
+        """Fields from one contact/about page, or None if it could not be loaded"""
+        try:
+            content = await self.polite_fetch_async(link, executor, fetch_slots)
+            return await self.extract_async(content, link, executor, extract_pool, extract_slots)
+        except Exception as e:
+            self.log(f"   ⚠️ Skipped {link}: {str(e)}", 'warning')
+            return None
+
+    async def crawl_contact_pages_async(self, result, links, deadline, *engine):
+        """Fill missing fields from contact/about pages, fetched concurrently"""
+        crawl = ContactCrawl(result, links, self.contact_pages, self.contact_depth, deadline)
+        tasks = {}
+        try:
+            while not crawl.complete:
+                for link, depth in crawl.next_batch():
+                    tasks[asyncio.ensure_future(self.fetch_contact_page_async(link, *engine))] = depth
+                if not tasks:
+                    break
+
+                done, _ = await asyncio.wait(
+                    tasks, timeout=max(crawl.time_left(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self.log(f"   ⏱️ Site time budget used up for {result['Website']}", 'warning')
+                    break
+                for task in done:
+                    depth = tasks.pop(task)
+                    fields = task.result()
+                    if fields:
+                        crawl.add(fields, depth)
+        finally:
+            # Do not wait for pages that are no longer needed
+            for task in tasks:
+                task.cancel()
+        return crawl.result
+
+    async def scrape_website_async(self, url, executor, fetch_slots, extract_pool=None, extract_slots=None):
+        """Scrape a single website on the event loop"""
+        engine = (executor, fetch_slots, extract_pool, extract_slots)
+        started = time.monotonic()
+        try:
+            self.log(f"🔍 Scraping: {url}", 'scraping')
+            url = self.prepare_url(url)
+
+            # Resolve the host in the background while this URL waits for a fetch slot
+            self.prefetch_dns(url)
+            content = await self.polite_fetch_async(url, executor, fetch_slots)
+            fields = await self.extract_async(content, url, executor, extract_pool, extract_slots)
+            result = self.result_row(url, fields)
+
+            if self.needs_contact_crawl(result, fields):
+                result = await self.crawl_contact_pages_async(
+                    result, fields['Contact Links'], started + self.site_time_budget, *engine
+                )
+            return self.found_website(result, started)
+
+        except Exception as e:
+            return self.failed_website(url, e, started)
+
+    async def iter_websites_async(self, urls, concurrency=None):
+        """Yield results in input order while up to `concurrency` fetches run"""
+        concurrency = concurrency or self.concurrency
+        fetch_slots = asyncio.Semaphore(concurrency)
+
+        # Only look this far ahead of the slowest unfinished URL, so hosts that are
+        # cooling down do not stall the batch but memory stays bounded
+        window = concurrency * 4
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        extract_pool = extract_slots = None
+        if self.workers:
+            # Spawned workers do not inherit the fetch threads or open sockets
+            extract_pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+            extract_slots = asyncio.Semaphore(self.max_queued_pages)
+
+        pending = deque()
+        try:
+            for url in urls:
+                url = url.strip()
+                if not url:
+                    continue
+
+                pending.append(asyncio.ensure_future(self.scrape_website_async(
+                    url, executor, fetch_slots, extract_pool, extract_slots
+                )))
+                if len(pending) >= window:
+                    yield await pending.popleft()
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            if extract_pool is not None:
+                extract_pool.shutdown(wait=False, cancel_futures=True)
+
+    async def scrape_websites_async(self, urls, concurrency=None):
+        """Scrape multiple websites concurrently and return results in input order"""
+        concurrency = concurrency or self.concurrency
+
+        print(f"🚀 Starting to scrape {len(urls)} websites ({concurrency} at a time)...")
+        print("=" * 50)
+
+        return [result async for result in self.iter_websites_async(urls, concurrency)]
+
+    def iter_websites(self, urls):
+        """Yield results in input order from a plain loop, while the event loop runs in a thread"""
+        results = queue.Queue(maxsize=self.concurrency * 4)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            # Give up once the consumer has gone away, instead of blocking forever
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        async def produce():
+            try:
+                async for result in self.iter_websites_async(urls):
+                    if not await asyncio.to_thread(put, result):
+                        break
+            except Exception as e:
+                put(_Failure(e))
+            finally:
+                put(done)
+
+        thread = threading.Thread(target=asyncio.run, args=(produce(),), daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    def scrape_websites(self, urls):
+        """Scrape multiple websites concurrently and return results"""
+        # Spellings of the same site are scraped once and copied to each input row
+        return list(iter_deduped(
+            lambda distinct_urls: asyncio.run(self.scrape_websites_async(list(distinct_urls))), urls
+        ))
+
+
+class _Failure:
+    """Carries an exception from the event loop thread to iter_websites"""
+
+    def __init__(self, error):
+        self.error = error
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Extraction benchmark: per-field extract_* methods vs parsers.extract_page
+Times turning page bytes into fields: the reference extract_* methods on a
+BeautifulSoup document against extract_page, the path every scrape uses
+(parse, collect and rank candidates), on html.parser and the fastest
+installed backend. The two speedups are kept apart: on html.parser the single
+pass saves little, since building the BeautifulSoup tree dominates either
+way, and nearly all of the gain comes from the faster backend. Fields where
+the ranked result differs from the reference methods are listed; the ranking
+drops dates and IDs on purpose.
+
+Usage: python benchmarks/bench_extraction.py [--repeat N] [--json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+# Add the project root to path to import modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+from parsers import extract_page, resolve_backend
+from scraper import BusinessScraper
+
+PAGES_DIR = os.path.join(ROOT, 'fixtures', 'pages')
+URL = 'https://www.example.com/'
+
+
+def builder_page(blocks=3000):
+    """A large page in the style of site-builder output: deep nesting, lots of numbers"""
+    filler = ''.join(
+        f'<div class="wrapper"><div class="row"><div class="col">'
+        f'<span>Item {i} SKU {i * 7919} ${i % 90}.99 updated 2024-0{i % 9 + 1}-1{i % 9}</span>'
+        f'</div></div></div>'
+        for i in range(blocks)
+    )
+    return (
+        '<html><head><title>Builder Co - Home</title></head><body>'
+        + filler
+        + '<footer><p>Call (303) 555-0100</p><p>team@builder.example.com</p>'
+        '<a href="https://instagram.com/builderco">IG</a></footer></body></html>'
+    )
+
+
+def load_corpus():
+    """Fixture pages plus one large synthetic page"""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            corpus.append((os.path.basename(path), f.read()))
+    corpus.append(('builder-large (synthetic)', builder_page().encode('utf-8')))
+    return corpus
+
+
+def legacy_extract(scraper, html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return {
+        'Business Name': scraper.extract_business_name(soup, URL),
+        'Email': scraper.extract_email(soup, URL),
+        'Instagram': scraper.extract_instagram(soup, URL),
+        'Phone': scraper.extract_phone(soup, URL)
+    }
+
+
+def ranked_extract(html, backend):
+    fields = extract_page(html, URL, backend)
+    del fields['Candidates']
+    return fields
+
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(repeat):
+    scraper = BusinessScraper()
+    fastest = resolve_backend('auto')
+    rows = []
+    for name, html in load_corpus():
+        # Big pages are slow enough that fewer rounds give a stable number
+        rounds = max(1, repeat // 20) if len(html) > 100_000 else repeat
+
+        legacy = time_per_call(lambda: legacy_extract(scraper, html), rounds)
+        same_parser = time_per_call(lambda: ranked_extract(html, 'html.parser'), rounds)
+        fast = time_per_call(lambda: ranked_extract(html, fastest), rounds)
+        reference = legacy_extract(scraper, html)
+        ranked = ranked_extract(html, fastest)
+        rows.append({
+            'page': name,
+            'bytes': len(html),
+            'backend': fastest,
+            'legacy_ms': round(legacy * 1000, 3),
+            'extract_page_ms': round(same_parser * 1000, 3),
+            'fastest_ms': round(fast * 1000, 3),
+            'single_pass_speedup': round(legacy / same_parser, 2) if same_parser else None,
+            'backend_speedup': round(same_parser / fast, 2) if fast else None,
+            'differs': [field for field in reference if reference[field] != ranked[field]]
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='timing rounds per page')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON')
+    args = parser.parse_args()
+
+    rows = run(args.repeat)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"extract_page on html.parser and on the fastest backend ({rows[0]['backend']})")
+    print(f"{'page':<28}{'bytes':>9}{'legacy ms':>12}{'page ms':>10}{'fastest ms':>12}"
+          f"{'1-pass':>9}{'backend':>9}  differs")
+    for row in rows:
+        print(f"{row['page']:<28}{row['bytes']:>9}{row['legacy_ms']:>12.3f}{row['extract_page_ms']:>10.3f}"
+              f"{row['fastest_ms']:>12.3f}{row['single_pass_speedup']:>8.2f}x{row['backend_speedup']:>8.2f}x"
+              f"  {', '.join(row['differs']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
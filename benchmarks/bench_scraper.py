@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+End-to-end scraper benchmark against the offline fixture server
+Scrapes a mix of normal, slow, huge and failing pages served from loopback
+hosts and reports throughput, per-URL latency percentiles, the time spent in
+fetch / parse / extract, and peak RSS. Use --json to compare runs.
+
+Usage: python benchmarks/bench_scraper.py [--urls N] [--concurrency N] [--json]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Add the project root to path to import modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from async_scraper import AsyncBusinessScraper
+from fixture_server import FixtureServer
+from network import PHASES as NETWORK_PHASES
+from politeness import HostScheduler
+from scraper import BusinessScraper
+
+PHASES = ('fetch', 'parse', 'extract')
+ERROR_STATUSES = (404, 500, 503)
+
+
+class TimingMixin:
+    """Records per-URL latency and fetch phase time on top of a scraper class
+
+    Fetch, parse and extract totals are read from the scraper's own metrics,
+    so the benchmark times exactly the code that ships.
+    """
+
+    def start_timing(self):
+        self.network = {phase: 0.0 for phase in NETWORK_PHASES}
+        self.latencies = []
+        self._timing_lock = threading.Lock()
+        self.timing_sink = self.add_network_time
+
+    def add_network_time(self, url, phases):
+        with self._timing_lock:
+            for phase, seconds in phases.items():
+                self.network[phase] += seconds
+
+    def phase_seconds(self):
+        """Seconds spent in each of PHASES, from the scraper's metrics"""
+        totals = {}
+        for phase in PHASES:
+            histogram = self.metrics.histogram(phase)
+            totals[phase] = histogram.sum if histogram is not None else 0.0
+        return totals
+
+    def log(self, message, progress_type='info'):
+        pass
+
+
+class TimedScraper(TimingMixin, BusinessScraper):
+    """Sequential BusinessScraper with timing"""
+
+    def scrape_website(self, url):
+        start = time.perf_counter()
+        result = super().scrape_website(url)
+        self.latencies.append(time.perf_counter() - start)
+        return result
+
+
+class TimedAsyncScraper(TimingMixin, AsyncBusinessScraper):
+    """AsyncBusinessScraper with timing"""
+
+    async def scrape_website_async(self, url, *engine):
+        start = time.perf_counter()
+        result = await super().scrape_website_async(url, *engine)
+        self.latencies.append(time.perf_counter() - start)
+        return result
+
+
+def build_urls(bases, page_names, count, slow_share=0.1, huge_share=0.05, error_share=0.05,
+               delay=0.5, huge_blocks=20000, seed=0):
+    """A shuffled mix of page, slow, huge and error URLs spread over the hosts"""
+    kinds = (['error'] * round(count * error_share) + ['huge'] * round(count * huge_share)
+             + ['slow'] * round(count * slow_share))
+    kinds = kinds[:count] + ['page'] * (count - len(kinds))
+    random.Random(seed).shuffle(kinds)
+
+    urls = []
+    for i, kind in enumerate(kinds):
+        base = bases[i % len(bases)]
+        page = page_names[i % len(page_names)]
+        if kind == 'error':
+            urls.append(f"{base}/status/{ERROR_STATUSES[i % len(ERROR_STATUSES)]}")
+        elif kind == 'huge':
+            urls.append(f"{base}/huge?blocks={huge_blocks}&n={i}")
+        elif kind == 'slow':
+            urls.append(f"{base}/slow/{page}?delay={delay}&n={i}")
+        else:
+            urls.append(f"{base}/page/{page}?n={i}")
+    return urls
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = math.ceil(share * len(ordered)) - 1
+    return ordered[max(0, min(len(ordered) - 1, index))]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, if the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run(urls=200, concurrency=1, workers=0, hosts=4, parser='auto', delay=0.5,
+        slow_share=0.1, huge_share=0.05, error_share=0.05, huge_blocks=20000, seed=0):
+    """Run one benchmark and return the report as a dict"""
+    with FixtureServer(hosts) as server:
+        url_list = build_urls(server.bases, server.page_names, urls, slow_share, huge_share,
+                              error_share, delay, huge_blocks, seed)
+        scheduler = HostScheduler(min_interval=0, max_per_host=max(concurrency, 2))
+
+        if concurrency > 1 or workers:
+            scraper = TimedAsyncScraper(concurrency=concurrency, workers=workers,
+                                        scheduler=scheduler, parser=parser)
+        else:
+            scraper = TimedScraper(scheduler=scheduler, parser=parser)
+        scraper.start_timing()
+
+        start = time.perf_counter()
+        results = list(scraper.iter_websites(url_list))
+        elapsed = time.perf_counter() - start
+
+    latencies = scraper.latencies
+    timings = scraper.phase_seconds()
+    phase_total = sum(timings.values()) or 1.0
+    return {
+        'config': {
+            'urls': urls, 'concurrency': concurrency, 'workers': workers,
+            'hosts': len(server.bases), 'parser': scraper.parser, 'slow_delay_s': delay,
+            'slow_share': slow_share, 'huge_share': huge_share, 'error_share': error_share,
+            'huge_blocks': huge_blocks, 'seed': seed
+        },
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(len(results) / elapsed, 2) if elapsed else None,
+        'results': {
+            'ok': sum(1 for row in results if not row['Error']),
+            'errors': sum(1 for row in results if row['Error'])
+        },
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'max': round(max(latencies, default=0.0) * 1000, 2)
+        },
+        'phases_ms': {phase: round(seconds * 1000, 2) for phase, seconds in timings.items()},
+        'phase_share': {phase: round(seconds / phase_total, 3) for phase, seconds in timings.items()},
+        'fetch_phases_ms': {phase: round(seconds * 1000, 2) for phase, seconds in scraper.network.items()},
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--urls', type=int, default=200, help='number of URLs to scrape')
+    parser.add_argument('--concurrency', type=int, default=1, help='1 runs the sequential BusinessScraper')
+    parser.add_argument('--workers', type=int, default=0, help='extraction worker processes (async engine)')
+    parser.add_argument('--hosts', type=int, default=4, help='loopback hosts to spread URLs over')
+    parser.add_argument('--parser', default='auto', help='HTML parser backend')
+    parser.add_argument('--delay', type=float, default=0.5, help='seconds a slow page takes')
+    parser.add_argument('--slow-share', type=float, default=0.1, help='fraction of slow pages')
+    parser.add_argument('--huge-share', type=float, default=0.05, help='fraction of huge pages')
+    parser.add_argument('--error-share', type=float, default=0.05, help='fraction of error responses')
+    parser.add_argument('--huge-blocks', type=int, default=20000, help='size of huge pages in blocks')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the URL mix')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = run(args.urls, args.concurrency, args.workers, args.hosts, args.parser, args.delay,
+                 args.slow_share, args.huge_share, args.error_share, args.huge_blocks, args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    config = report['config']
+    latency = report['latency_ms']
+    print(f"📊 {config['urls']} URLs on {config['hosts']} hosts, concurrency {config['concurrency']}, "
+          f"workers {config['workers']}, parser {config['parser']}")
+    print(f"   {report['pages_per_sec']} pages/sec in {report['seconds']}s "
+          f"({report['results']['ok']} ok, {report['results']['errors']} errors)")
+    print(f"   latency p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms  max {latency['max']}ms")
+    print('   ' + '  '.join(f"{phase} {report['phases_ms'][phase]}ms ({report['phase_share'][phase]:.0%})"
+                           for phase in PHASES))
+    print('   fetch: ' + '  '.join(f"{phase} {ms}ms" for phase, ms in report['fetch_phases_ms'].items()))
+    print(f"   peak RSS {report['peak_rss_mb']} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time of the entry modules in fresh interpreters
+Each module is imported in a new Python process with -X importtime, which is
+what a CLI run or a spawned worker pays before doing any work. The result is
+checked against a budget, and the heavy dependencies the module should leave
+unloaded must not show up in sys.modules.
+
+Usage: python benchmarks/bench_startup.py [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# The project root, where the imports run
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'flask', 'flask_socketio', 'bs4')
+
+# module -> (budget in ms of cumulative import time, heavy modules it must not load)
+STARTUP_BUDGETS = {
+    'extraction': (25, HEAVY_MODULES),
+    'candidates': (50, HEAVY_MODULES),
+    'parsers': (120, HEAVY_MODULES),
+    'workqueue': (120, HEAVY_MODULES),
+    'cli': (25, HEAVY_MODULES),
+    'resultstore': (60, HEAVY_MODULES),
+    'scraper': (350, HEAVY_MODULES),
+    'async_scraper': (400, HEAVY_MODULES),
+    # The web app needs Flask; pandas only loads for ?normalize=1 downloads
+    'app': (1500, ('pandas', 'numpy', 'pyarrow', 'bs4')),
+}
+
+
+def import_once(module):
+    """(milliseconds, heavy modules loaded) for importing module in a fresh interpreter"""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    # Lines are "import time: self [us] | cumulative | name"
+    match = re.search(rf'^import time:\s*\d+ \|\s*(\d+) \| {re.escape(module)}$', completed.stderr, re.MULTILINE)
+    loaded = [name for name in completed.stdout.strip().split(',') if name]
+    return int(match.group(1)) / 1000, loaded
+
+
+def measure(module, repeat=3):
+    """Best of repeat fresh imports, so a busy machine does not fail the budget by chance"""
+    timings = []
+    loaded = []
+    for _ in range(repeat):
+        ms, loaded = import_once(module)
+        timings.append(ms)
+    budget, forbidden = STARTUP_BUDGETS[module]
+    unwanted = [name for name in loaded if name in forbidden]
+    best = min(timings)
+    return {
+        'module': module,
+        'import_ms': round(best, 1),
+        'budget_ms': budget,
+        'loaded': loaded,
+        'unwanted': unwanted,
+        'ok': best <= budget and not unwanted
+    }
+
+
+def run(repeat=3, modules=None):
+    return [measure(module, repeat) for module in modules or STARTUP_BUDGETS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='fresh imports per module (the best one counts)')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON')
+    args = parser.parse_args()
+
+    rows = run(args.repeat)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'module':<16}{'import ms':>11}{'budget ms':>11}  ok    heavy modules loaded")
+        for row in rows:
+            print(f"{row['module']:<16}{row['import_ms']:>11.1f}{row['budget_ms']:>11}  "
+                  f"{'yes' if row['ok'] else 'NO':<6}{', '.join(row['loaded']) or '-'}")
+    sys.exit(0 if all(row['ok'] for row in rows) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Offline fixture server for the scraper benchmarks
+Serves the recorded pages in fixtures/pages plus synthetic slow, huge and
+failing responses from local HTTP servers, one per loopback address
+(127.0.0.1, 127.0.0.2, ...) so per-host politeness behaves as it would on
+real sites. Nothing leaves the machine.
+
+Routes:
+    /page/<name>          a fixture page, e.g. /page/bakery.html
+    /slow/<name>          the same page after a delay (?delay=seconds)
+    /huge                 a large site-builder style page (?blocks=N)
+    /status/<code>        an empty error response with that status code
+"""
+
+import glob
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bench_extraction import PAGES_DIR, builder_page
+
+
+def load_pages():
+    """Fixture pages by file name"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Answers the benchmark routes from an in-memory corpus"""
+
+    pages = {}
+    huge_pages = {}
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        route, _, name = parts.path.lstrip('/').partition('/')
+
+        if route == 'page' and name in self.pages:
+            self.send_body(self.pages[name])
+        elif route == 'slow' and name in self.pages:
+            time.sleep(float(query.get('delay', ['1'])[0]))
+            self.send_body(self.pages[name])
+        elif route == 'huge':
+            self.send_body(self.huge_page(int(query.get('blocks', ['20000'])[0])))
+        elif route == 'status' and name.isdigit():
+            self.send_body(b'', int(name))
+        else:
+            self.send_body(b'', 404)
+
+    def huge_page(self, blocks):
+        if blocks not in self.huge_pages:
+            self.huge_pages[blocks] = builder_page(blocks).encode('utf-8')
+        return self.huge_pages[blocks]
+
+    def send_body(self, body, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Fixture HTTP servers on several loopback addresses"""
+
+    def __init__(self, hosts=4):
+        FixtureHandler.pages = load_pages()
+        self.servers = []
+        for i in range(1, hosts + 1):
+            try:
+                server = ThreadingHTTPServer((f'127.0.0.{i}', 0), FixtureHandler)
+            except OSError:
+                # Only 127.0.0.1 exists on some systems (e.g. macOS without aliases)
+                break
+            server.daemon_threads = True
+            self.servers.append(server)
+
+    @property
+    def bases(self):
+        """Base URL of every host, e.g. http://127.0.0.2:43121"""
+        return [f"http://{host}:{port}" for host, port in (s.server_address for s in self.servers)]
+
+    @property
+    def page_names(self):
+        return sorted(FixtureHandler.pages)
+
+    def start(self):
+        for server in self.servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
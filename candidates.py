@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Candidate collection and confidence ranking for the Website Business Information Scraper
+Gathers every email, phone number, Instagram profile and business name a parsed
+page offers, each tagged with where it was found: a tel:/mailto:/Instagram link,
+schema.org JSON-LD, the footer or the body text. Everything comes from the one
+ParsedPage the parser backends build, with the extractor's own patterns, so
+nothing is parsed twice. Candidates are kept in a compact per-page record:
+
+    {"url": "https://shop.com/", "candidates": {"Phone": [[value, source, kind, hits], ...], ...}}
+
+and ranked by a confidence score. Records can be stored as JSON Lines and ranked
+again offline, e.g. after changing the scoring, without fetching or parsing
+any page again.
+
+Usage: python candidates.py candidates.jsonl results.csv [--min-confidence 0.3]
+"""
+
+import argparse
+import json
+import re
+import threading
+from bisect import bisect_left
+from urllib.parse import unquote, urlparse
+
+from extraction import (EMAIL_PATTERN, INSTAGRAM_RE, INSTAGRAM_RESERVED, INTERNATIONAL_PHONE_PATTERN,
+                        TITLE_SUFFIX_RE, US_PHONE_PATTERN, WHITESPACE_RE)
+
+FIELDS = ('Business Name', 'Email', 'Instagram', 'Phone')
+
+# How much a value is trusted for where it was found, before its own checks
+SOURCE_CONFIDENCE = {
+    'json_ld': 0.9,  # schema.org markup published on purpose
+    'href': 0.85,  # tel:, mailto: and Instagram links
+    'title': 0.7,
+    'footer': 0.65,
+    'h1': 0.6,
+    'text': 0.45,
+    'domain': 0.3,
+}
+# Best candidates scoring lower than this are reported as N/A
+MIN_CONFIDENCE = 0.3
+# Candidates kept per field; pages full of numbers stop adding phones after this
+MAX_CANDIDATES = 25
+
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+US_PHONE_RE = re.compile(US_PHONE_PATTERN)
+INTL_PHONE_RE = re.compile(INTERNATIONAL_PHONE_PATTERN)
+NON_DIGIT_RE = re.compile(r'\D')
+# 2024, 2023-2024, 2024-03-14, 03/14/2024, 14.03.2024
+DATE_RE = re.compile(r'(?:19|20)\d\d(?:[\s./-]+(?:19|20)\d\d)?'
+                     r'|(?:19|20)\d\d[\s./-]\d{1,2}[\s./-]\d{1,2}'
+                     r'|\d{1,2}[\s./-]\d{1,2}[\s./-](?:19|20)\d\d')
+ASSET_SUFFIX_RE = re.compile(r'\.(?:png|jpe?g|gif|svg|webp|ico|css|js)$', re.IGNORECASE)
+# Error trackers and site builders whose addresses end up in page text
+TRACKER_EMAIL_DOMAINS = ('sentry.io', 'wixpress.com')
+INSTAGRAM_HANDLE_RE = re.compile(r'instagram\.com/([A-Za-z0-9._]+)', re.IGNORECASE)
+
+# schema.org types that carry a name which is not the business's
+NON_BUSINESS_TYPES = {
+    'WebSite', 'WebPage', 'BreadcrumbList', 'ListItem', 'ImageObject', 'VideoObject', 'SearchAction',
+    'ContactPoint', 'PostalAddress', 'GeoCoordinates', 'OpeningHoursSpecification', 'Person', 'Offer',
+    'Product', 'Review', 'Rating', 'AggregateRating', 'Article', 'BlogPosting', 'FAQPage', 'Question',
+    'Answer', 'Event', 'SiteNavigationElement', 'Place'
+}
+
+
+def site_domain(url):
+    """Host of a URL without www., lowercased"""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def candidate_key(field, value):
+    """What makes two candidates the same value"""
+    if field == 'Phone':
+        # +1-303-555-0199, (303) 555-0199 and tel:+13035550199 are one number
+        return NON_DIGIT_RE.sub('', value)[-10:]
+    if field == 'Instagram':
+        handle = INSTAGRAM_HANDLE_RE.search(value)
+        return handle.group(1).lower().rstrip('.') if handle else value.lower()
+    return WHITESPACE_RE.sub(' ', value).strip().lower()
+
+
+def usable_email(value):
+    return '@' in value and '.' in value.split('@')[1]
+
+
+def json_ld_items(blocks):
+    """Every JSON object in the page's JSON-LD blocks, outermost first"""
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, dict):
+                yield item
+                stack.extend(reversed([value for value in item.values() if isinstance(value, (dict, list))]))
+
+
+def as_strings(value):
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, str)]
+    return []
+
+
+def overlaps(starts, ends, start, end):
+    """Whether start..end overlaps one of the sorted, non-overlapping spans in starts/ends"""
+    # The last span starting before this one ends is the only one it can overlap
+    before = bisect_left(starts, end) - 1
+    return before >= 0 and ends[before] > start
+
+
+class CandidateSet:
+    """Candidates of every field, merged by value, in the order they were first seen"""
+
+    def __init__(self, url):
+        self.url = url
+        self.fields = {field: {} for field in FIELDS}
+
+    def add(self, field, value, source, kind='', hits=1):
+        """Record one sighting; a value seen again keeps its most trusted source"""
+        value = WHITESPACE_RE.sub(' ', value).strip()
+        if not value:
+            return
+        key = candidate_key(field, value)
+        seen = self.fields[field]
+        entry = seen.get(key)
+        if entry is None:
+            if len(seen) < MAX_CANDIDATES:
+                seen[key] = [value, source, kind, hits]
+            return
+        entry[3] += hits
+        if SOURCE_CONFIDENCE[source] > SOURCE_CONFIDENCE[entry[1]]:
+            entry[:3] = value, source, kind
+
+    def add_links(self, hrefs):
+        for href in hrefs:
+            if href.startswith('mailto:'):
+                email = unquote(href[7:].split('?')[0])
+                if usable_email(email):
+                    self.add('Email', email, 'href')
+            elif href.startswith('tel:'):
+                self.add('Phone', unquote(href[4:]), 'href', 'tel')
+            else:
+                match = INSTAGRAM_RE.search(href)
+                if match:
+                    self.add('Instagram', match.group(0), 'href')
+
+    def add_json_ld(self, blocks):
+        for item in json_ld_items(blocks):
+            for phone in as_strings(item.get('telephone')):
+                self.add('Phone', phone, 'json_ld', 'json_ld')
+            for email in as_strings(item.get('email')):
+                email = email[7:] if email.startswith('mailto:') else email
+                if usable_email(email):
+                    self.add('Email', email, 'json_ld')
+            for link in as_strings(item.get('sameAs')) + as_strings(item.get('url')):
+                match = INSTAGRAM_RE.search(link)
+                if match:
+                    self.add('Instagram', match.group(0), 'json_ld')
+
+            types = set(as_strings(item.get('@type')))
+            name = item.get('name')
+            if types and not types & NON_BUSINESS_TYPES and isinstance(name, str):
+                self.add('Business Name', name, 'json_ld')
+
+    def add_text(self, text, source, hits=1):
+        """Every email, Instagram URL and phone number in text
+
+        Each field's pattern runs over the text on its own, which is far faster
+        than stopping at every position for all of them. Digits inside an email
+        address (2175550142@vtext.com) are not a phone number, and looser
+        international matches overlapping a US-style number are the same digits;
+        both are dropped. Once a page has MAX_CANDIDATES phones the rest are not read.
+        """
+        email_starts = []
+        email_ends = []
+        for match in EMAIL_RE.finditer(text):
+            email_starts.append(match.start())
+            email_ends.append(match.end())
+            self.add('Email', match.group(), source, hits=hits)
+        for match in INSTAGRAM_RE.finditer(text):
+            self.add('Instagram', match.group(), source, hits=hits)
+
+        us_starts = []
+        us_ends = []
+        for match in US_PHONE_RE.finditer(text):
+            start, end = match.span()
+            if overlaps(email_starts, email_ends, start, end):
+                continue
+            us_starts.append(start)
+            us_ends.append(end)
+            self.add('Phone', match.group(), source, 'us', hits)
+
+        phones = self.fields['Phone']
+        for match in INTL_PHONE_RE.finditer(text):
+            if len(phones) >= MAX_CANDIDATES:
+                break
+            start, end = match.span()
+            if overlaps(us_starts, us_ends, start, end) or overlaps(email_starts, email_ends, start, end):
+                continue
+            self.add('Phone', match.group(), source, 'intl', hits)
+
+    def add_names(self, page):
+        if page.title and page.title.strip():
+            self.add('Business Name', TITLE_SUFFIX_RE.sub('', page.title.strip()), 'title')
+        if page.h1:
+            self.add('Business Name', page.h1, 'h1')
+        domain = site_domain(self.url)
+        if domain:
+            name = domain.replace('.com', '').replace('.org', '').replace('.net', '').title()
+            self.add('Business Name', name, 'domain')
+
+    def record(self):
+        """The compact per-page record: url and [value, source, kind, hits] lists per field"""
+        return {
+            'url': self.url,
+            'candidates': {field: list(seen.values()) for field, seen in self.fields.items() if seen}
+        }
+
+
+def collect_candidates(page, url):
+    """Every candidate of every field on a ParsedPage, as a compact record"""
+    candidates = CandidateSet(url)
+    candidates.add_links(page.hrefs)
+    candidates.add_json_ld(page.json_ld)
+    # Footer text is part of the body text too: the footer pass only marks
+    # where a value came from, the body pass counts the sightings
+    if page.footer:
+        candidates.add_text(page.footer, 'footer', hits=0)
+    candidates.add_text(page.text, 'text')
+    candidates.add_names(page)
+    return candidates.record()
+
+
+def phone_confidence(value, kind):
+    """Penalties for what the loose phone patterns also match: dates, IDs, prices"""
+    digits = NON_DIGIT_RE.sub('', value)
+    penalty = 0.0
+    if not 7 <= len(digits) <= 15:
+        penalty += 0.5
+    if DATE_RE.fullmatch(value):
+        penalty += 0.5
+    if kind == 'intl' and not value.startswith('+'):
+        penalty += 0.2
+        if value.isdigit():
+            # One unbroken run of digits reads like an ID more than a phone
+            penalty += 0.2
+    return -penalty
+
+
+def email_confidence(value, site):
+    domain = value.rsplit('@', 1)[-1].lower()
+    score = 0.0
+    if ASSET_SUFFIX_RE.search(value):
+        score -= 0.6
+    if domain.endswith(TRACKER_EMAIL_DOMAINS):
+        score -= 0.5
+    if site and (domain == site or domain.endswith('.' + site)):
+        score += 0.1
+    return score
+
+
+def instagram_confidence(value):
+    handle = INSTAGRAM_HANDLE_RE.search(value)
+    if handle is None or handle.group(1).lower() in INSTAGRAM_RESERVED:
+        return -0.6
+    return 0.0
+
+
+def candidate_confidence(field, candidate, site):
+    """Confidence score of one [value, source, kind, hits] candidate, roughly 0 to 1"""
+    value, source, kind, hits = candidate
+    score = SOURCE_CONFIDENCE.get(source, 0.0)
+    # Values the page repeats (in markup and text, or on several lines) are likelier
+    score += min(0.1, 0.05 * (max(hits, 1) - 1))
+    if field == 'Phone':
+        score += phone_confidence(value, kind)
+    elif field == 'Email':
+        score += email_confidence(value, site)
+    elif field == 'Instagram':
+        score += instagram_confidence(value)
+    return score
+
+
+def rank_candidates(record, scorer=candidate_confidence):
+    """(score, value, source) lists per field, best first; ties keep page order"""
+    site = site_domain(record['url'])
+    ranked = {}
+    for field, candidates in record['candidates'].items():
+        scored = [(scorer(field, candidate, site), candidate[0], candidate[1]) for candidate in candidates]
+        scored.sort(key=lambda item: -item[0])
+        ranked[field] = scored
+    return ranked
+
+
+def best_fields(record, scorer=candidate_confidence, min_confidence=MIN_CONFIDENCE):
+    """The best ranked value of every field, or N/A when none is confident enough"""
+    ranked = rank_candidates(record, scorer)
+    fields = {}
+    for field in FIELDS:
+        best = ranked.get(field)
+        fields[field] = best[0][1] if best and best[0][0] >= min_confidence else "N/A"
+    return fields
+
+
+def merge_records(records):
+    """One record per site from the records of its pages (homepage first)"""
+    merged = {}
+    for record in records:
+        site = site_domain(record['url'])
+        candidates = merged.get(site)
+        if candidates is None:
+            candidates = merged[site] = CandidateSet(record['url'])
+        for field, entries in record['candidates'].items():
+            for value, source, kind, hits in entries:
+                candidates.add(field, value, source, kind, hits)
+    return [candidates.record() for candidates in merged.values()]
+
+
+class CandidateLog:
+    """Candidate sink that appends one compact JSON line per page"""
+
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            self.file.write(line)
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_records(path):
+    """Candidate records of a JSON Lines file, one at a time"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def rerank_file(source, destination, min_confidence=MIN_CONFIDENCE):
+    """Result rows from stored candidate records, without fetching anything; returns the row count"""
+    from streaming import ResultWriter
+
+    count = 0
+    with ResultWriter(destination) as writer:
+        for record in merge_records(read_records(source)):
+            row = best_fields(record, min_confidence=min_confidence)
+            row.update({'Website': record['url'], 'Error': '', 'Error Type': ''})
+            writer.write(row)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank stored candidates again into result rows")
+    parser.add_argument('input', help="JSON Lines file written with --candidates")
+    parser.add_argument('output', help="CSV or .jsonl file to write")
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE,
+                        help=f"lowest score a value is reported with (default: {MIN_CONFIDENCE})")
+    args = parser.parse_args()
+
+    count = rerank_file(args.input, args.output, args.min_confidence)
+    print(f"💾 {count} sites ranked into {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Command line interface for the Website Business Information Scraper
+
+    python -m scraper run --input websites.txt --out results.jsonl [options]
+    cat websites.txt | python -m scraper run --progress summary > results.csv
+    python -m scraper run --input websites.txt --store results/ [options]
+    python -m scraper worker --queue queue.db [options]
+
+`run` streams URLs from a file or stdin to CSV, JSON Lines, Parquet or Arrow
+(or CSV and JSON Lines on stdout), or with --store into a new run of a result
+store that keeps every run (see resultstore.py). `worker` scrapes jobs from a
+shared work queue (see workqueue.py). Both take the same tuning options. The older
+`python scraper.py websites.txt results.csv` form still works and means `run`.
+"""
+
+import argparse
+import os
+import sys
+from importlib.util import find_spec
+
+COMMANDS = ('run', 'worker')
+PROGRESS_MODES = ('sites', 'summary', 'none')
+
+
+def add_scraper_options(parser):
+    """Tuning options shared by every command that scrapes"""
+    from metrics import JobProfiler
+    from parsers import PARSER_BACKENDS
+
+    throughput = parser.add_argument_group('throughput')
+    throughput.add_argument('--concurrency', type=int, default=20, help="fetches in flight (default: 20)")
+    throughput.add_argument('--workers', type=int, default=0,
+                            help="processes that parse and extract pages (default: 0, on the fetch threads)")
+    throughput.add_argument('--per-host', type=int, default=2,
+                            help="requests in flight to one host (default: 2)")
+    throughput.add_argument('--host-delay', type=float, default=1.0,
+                            help="seconds between requests to one host (default: 1)")
+
+    limits = parser.add_argument_group('timeouts and limits')
+    limits.add_argument('--timeout', type=float, default=10,
+                        help="connect and read timeout in seconds (default: 10)")
+    limits.add_argument('--deadline', type=float, default=30,
+                        help="seconds allowed to download one page (default: 30)")
+    limits.add_argument('--site-budget', type=float, default=15.0,
+                        help="seconds allowed per site including contact pages (default: 15)")
+    limits.add_argument('--max-kb', type=int, default=2048,
+                        help="stop reading a page after this many KB (default: 2048)")
+    limits.add_argument('--head-kb', type=int,
+                        help="stop reading this many KB after </head> (default: read the whole page)")
+    limits.add_argument('--retries', type=int, default=2,
+                        help="retries of timeouts, dropped connections and 5xx gateway errors (default: 2)")
+    limits.add_argument('--breaker-threshold', type=int, default=5,
+                        help="failures in a row after which a host is skipped (default: 5)")
+    limits.add_argument('--breaker-cooldown', type=float, default=300,
+                        help="seconds a failing host is skipped before it is tried again (default: 300)")
+
+    extraction = parser.add_argument_group('extraction')
+    extraction.add_argument('--parser', choices=('auto',) + PARSER_BACKENDS, default='auto',
+                            help="HTML parser backend (default: auto, the fastest installed)")
+    extraction.add_argument('--contact-pages', type=int, default=0,
+                            help="contact/about pages to check per site when fields are missing (default: 0)")
+
+    cache = parser.add_argument_group('cache and network')
+    cache.add_argument('--cache-dir', help="keep downloaded pages in this directory and revalidate them")
+    cache.add_argument('--cache-ttl', type=float, default=7 * 24,
+                       help="hours a cached page is used without revalidating (default: 168)")
+    cache.add_argument('--offline', action='store_true',
+                       help="extract only from the cache, never touch the network")
+    cache.add_argument('--dns-ttl', type=float, default=300,
+                       help="seconds a DNS answer is reused (default: 300)")
+    cache.add_argument('--dns-negative-ttl', type=float, default=60,
+                       help="seconds an unknown domain keeps failing fast (default: 60)")
+    cache.add_argument('--pool-hosts', type=int, default=256,
+                       help="hosts that keep a connection pool (default: 256)")
+    cache.add_argument('--pool-per-host', type=int,
+                       help="connections kept per host (default: --per-host)")
+
+    reporting = parser.add_argument_group('reporting')
+    reporting.add_argument('--progress', choices=PROGRESS_MODES, default='sites',
+                           help="sites: a line per website; summary: a status line every "
+                                "--progress-interval seconds on stderr; none (default: sites)")
+    reporting.add_argument('--progress-interval', type=float, default=5.0,
+                           help="seconds between summary lines (default: 5)")
+    reporting.add_argument('--timings', help="append dns/connect/tls/ttfb/body times of every fetch to this JSONL file")
+    reporting.add_argument('--candidates',
+                           help="append every page's ranked field candidates to this JSONL file (see candidates.py)")
+    reporting.add_argument('--metrics-file',
+                           help="write phase histograms and counters to this file (Prometheus text format)")
+    reporting.add_argument('--profile', help="profile the run and write the profile to this file")
+    reporting.add_argument('--profile-mode', choices=JobProfiler.MODES, default='cprofile',
+                           help="cprofile (.prof for pstats) or sample (collapsed stacks of all threads)")
+
+
+def build_scraper(args):
+    """An AsyncBusinessScraper configured from parsed scraper options"""
+    from async_scraper import AsyncBusinessScraper
+    from candidates import CandidateLog
+    from http_cache import ResponseCache
+    from network import DnsCache, TimingLog
+    from politeness import HostScheduler
+    from resilience import CircuitBreaker, RetryPolicy
+
+    cache = None
+    if args.cache_dir or args.offline:
+        cache = ResponseCache(args.cache_dir or '.http_cache', ttl=args.cache_ttl * 3600, offline=args.offline)
+
+    scraper = AsyncBusinessScraper(
+        concurrency=args.concurrency, workers=args.workers,
+        scheduler=HostScheduler(min_interval=args.host_delay, max_per_host=args.per_host),
+        parser=args.parser, cache=cache, contact_pages=args.contact_pages, site_time_budget=args.site_budget,
+        dns_cache=DnsCache(args.dns_ttl, args.dns_negative_ttl),
+        pool_hosts=args.pool_hosts, pool_per_host=args.pool_per_host,
+        timing_sink=TimingLog(args.timings) if args.timings else None,
+        candidate_sink=CandidateLog(args.candidates) if args.candidates else None,
+        timeout=args.timeout, max_bytes=args.max_kb * 1024, head_kb=args.head_kb, fetch_deadline=args.deadline,
+        retry_policy=RetryPolicy(args.retries),
+        breaker=CircuitBreaker(args.breaker_threshold, args.breaker_cooldown)
+    )
+    scraper.verbose = args.progress == 'sites'
+    return scraper
+
+
+def finish(scraper, args, log_file):
+    """Close the scraper's sinks, print its metrics summary and save the metrics file"""
+    for sink in (scraper.timing_sink, scraper.candidate_sink):
+        if sink is not None:
+            sink.close()
+    for line in scraper.metrics.summary_lines():
+        print(line, file=log_file)
+    if args.metrics_file:
+        with open(args.metrics_file, 'w', encoding='utf-8') as f:
+            f.write(scraper.metrics.render())
+
+
+def progress_reporter(scraper, args, log_file):
+    """Context manager for the chosen kind of progress output"""
+    from contextlib import nullcontext
+    from progress import ConsoleProgress
+
+    if args.progress == 'summary':
+        return ConsoleProgress(scraper.metrics, args.progress_interval, log_file)
+    return nullcontext()
+
+
+def run_command(args, parser):
+    from journal import CrawlJournal
+    from metrics import JobProfiler
+    from streaming import COLUMNAR_FORMATS, output_format, scrape_file
+
+    source = args.input or args.input_path or 'websites.txt'
+    destination = args.out or args.output_path or 'business_info.csv'
+    format = args.format or output_format(destination)
+    if args.store:
+        if args.out or args.output_path or args.format:
+            parser.error("--store replaces the output file: leave out --out and --format")
+        if find_spec('pyarrow') is None:
+            parser.error("--store needs pyarrow: pip install pyarrow")
+    elif format in COLUMNAR_FORMATS:
+        if destination == '-' or args.resume:
+            parser.error(f"{format.title()} output needs a new file: not '-' and not --resume")
+        if find_spec('pyarrow') is None:
+            parser.error(f"{format.title()} output needs pyarrow: pip install pyarrow")
+    if source != '-' and not os.path.exists(source):
+        parser.error(f"No such input file: {source}")
+    if args.normalize and find_spec('pandas') is None:
+        parser.error("--normalize needs pandas: pip install pandas")
+
+    if args.store:
+        destination = open_store_run(args)
+
+    processor = None
+    if args.normalize:
+        from postprocess import PostProcessor
+        processor = PostProcessor(args.country_code)
+
+    scraper = build_scraper(args)
+    # Keep stdout clean for the data when it is being piped
+    log_file = sys.stderr if destination == '-' else sys.stdout
+    scraper.log_file = log_file
+    try:
+        with CrawlJournal(args.journal) as journal, JobProfiler(args.profile, args.profile_mode), \
+                progress_reporter(scraper, args, sys.stderr):
+            scrape_file(scraper, source, destination, format=format, journal=journal, resume=args.resume,
+                        processor=processor)
+    finally:
+        finish(scraper, args, log_file)
+
+
+def open_store_run(args):
+    """A writer for a new run of the --store result store; --resume adds parts to its latest run"""
+    from resultstore import ResultStore
+
+    store = ResultStore(args.store, args.store_format)
+    runs = store.runs()
+    writer = store.open_run(runs[-1]['run'] if args.resume and runs else None)
+    print(f"🗄️ Writing run {writer.run_id} to {args.store}")
+    return writer
+
+
+def worker_command(args, parser):
+    from metrics import JobProfiler
+    from workqueue import WorkQueue, run_worker
+
+    scraper = build_scraper(args)
+    try:
+        with WorkQueue(args.queue) as queue, JobProfiler(args.profile, args.profile_mode), \
+                progress_reporter(scraper, args, sys.stderr):
+            run_worker(queue, scraper, args)
+    finally:
+        finish(scraper, args, sys.stdout)
+
+
+def build_parser():
+    from streaming import COLUMNAR_FORMATS, OUTPUT_FORMATS
+    from workqueue import add_worker_options
+
+    parser = argparse.ArgumentParser(
+        prog='python -m scraper', description="Scrape business info from a list of websites"
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="scrape a file (or stdin) of URLs into a result file (or stdout)")
+    run.add_argument('input_path', nargs='?', metavar='input', help=argparse.SUPPRESS)
+    run.add_argument('output_path', nargs='?', metavar='output', help=argparse.SUPPRESS)
+    run.add_argument('-i', '--input', help="file with one URL per line, or - for stdin (default: websites.txt)")
+    run.add_argument('-o', '--out',
+                     help="CSV, .jsonl, .parquet or .arrow file, or - for stdout (default: business_info.csv)")
+    run.add_argument('--format', choices=OUTPUT_FORMATS, help="output format (default: from the --out extension)")
+    run.add_argument('--store', help="keep the results as a new run in this result store directory")
+    run.add_argument('--store-format', choices=COLUMNAR_FORMATS, default='parquet',
+                     help="file format of the result store (default: parquet)")
+    run.add_argument('--journal', default='crawl_journal.db',
+                     help="journal of finished URLs (default: crawl_journal.db)")
+    run.add_argument('--normalize', action='store_true',
+                     help="normalize phones, emails and Instagram links and add a 'Duplicate Of' column "
+                          "(needs pandas; see postprocess.py)")
+    run.add_argument('--country-code', default='1',
+                     help="with --normalize, country code for phones without one (default: 1)")
+    run.add_argument('--resume', action='store_true',
+                     help="skip URLs the journal has as done and append to the output (or the store's latest run)")
+    add_scraper_options(run)
+    run.set_defaults(handler=run_command)
+
+    worker = commands.add_parser('worker', help="scrape URLs from a shared work queue until stopped")
+    worker.add_argument('--queue', default=os.environ.get('SCRAPER_QUEUE', 'scrape_queue.db'),
+                        help="queue database (default: $SCRAPER_QUEUE or scrape_queue.db)")
+    add_worker_options(worker)
+    add_scraper_options(worker)
+    worker.set_defaults(handler=worker_command)
+    return parser
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # No command, or the old `scraper.py input output [options]` form, means run
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'run')
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.handler(args, parser)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures: a local bakery site and helpers the test modules reuse
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import network
+from politeness import HostScheduler
+
+PAGE_DELAY = 0.3
+FAST = ['--host-delay', '0', '--per-host', '20', '--progress', 'none']
+
+
+class SlowBusinessHandler(BaseHTTPRequestHandler):
+    """Serves a small business page for every path after a fixed delay"""
+
+    def do_GET(self):
+        time.sleep(PAGE_DELAY)
+        name = self.path.strip('/') or 'home'
+        body = (
+            f"<html><head><title>{name} Bakery</title></head><body>"
+            f"<p>Call us at (555) 123-4567 or mail {name}@bakery.com</p>\n"
+            f"<a href='https://instagram.com/{name}'>Instagram</a>"
+            f"</body></html>"
+        ).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def page_delay():
+    """Seconds the bakery site waits before answering each page"""
+    return PAGE_DELAY
+
+
+@pytest.fixture
+def serve():
+    """Start a local server for a handler class and return its base URL"""
+    servers = []
+
+    def start(handler):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def site(serve):
+    """Base URL of a local bakery site that serves a page for every path"""
+    return serve(SlowBusinessHandler)
+
+
+@pytest.fixture
+def unthrottled():
+    """All test URLs share one host, so lift the per-host limits"""
+    return HostScheduler(min_interval=0, max_per_host=100)
+
+
+@pytest.fixture
+def counting_getaddrinfo(monkeypatch):
+    """Resolve every host to localhost (.invalid fails) and record the lookups"""
+    calls = []
+    real = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        calls.append(host)
+        if host.endswith('.invalid'):
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return real('127.0.0.1', *args, **kwargs)
+
+    monkeypatch.setattr(network.socket, 'getaddrinfo', getaddrinfo)
+    return calls
+
+
+@pytest.fixture
+def wait_for():
+    """Block until a job stops running or the timeout passes"""
+    def wait(job, timeout=10):
+        deadline = time.monotonic() + timeout
+        while job.is_running and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return job
+    return wait
+
+
+@pytest.fixture
+def fast_options():
+    """CLI flags that keep test runs from waiting on politeness delays"""
+    return list(FAST)
+
+
+@pytest.fixture
+def url_file(tmp_path, site):
+    """Write a websites.txt listing `count` bakery pages and return its path"""
+    def write(count=3):
+        path = tmp_path / 'websites.txt'
+        path.write_text(''.join(f"{site}/shop{i}\n" for i in range(count)))
+        return str(path)
+    return write
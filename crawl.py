@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Contact-page discovery for the Website Business Information Scraper
+Most sites only list their email and phone on /contact or /about. ContactCrawl
+plans a shallow crawl from the homepage links: it hands out the most promising
+links within a per-site page budget and time budget, fills fields that are still
+N/A from each page fetched, and stops as soon as every field is found.
+"""
+
+import time
+from collections import deque
+
+# Fields a contact page can fill in
+CONTACT_FIELDS = ('Email', 'Phone', 'Instagram')
+
+
+class ContactCrawl:
+    """Crawl plan and merged result for one website"""
+
+    def __init__(self, result, links, max_pages, max_depth, deadline):
+        self.result = result
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.deadline = deadline  # time.monotonic() value
+        self.fetched = 0
+        self._seen = set(links)
+        self._queue = deque((link, 1) for link in links)
+
+    @property
+    def complete(self):
+        """Every contact field has a value"""
+        return all(self.result[field] != 'N/A' for field in CONTACT_FIELDS)
+
+    def time_left(self):
+        return self.deadline - time.monotonic()
+
+    def next_batch(self):
+        """Queued (link, depth) pairs to fetch now, within the page and time budgets"""
+        if self.complete or self.time_left() <= 0:
+            return []
+
+        batch = []
+        while self._queue and self.fetched < self.max_pages:
+            batch.append(self._queue.popleft())
+            self.fetched += 1
+        return batch
+
+    def add(self, fields, depth):
+        """Merge fields from a fetched page and queue its links if the depth allows"""
+        for field in CONTACT_FIELDS:
+            if self.result[field] == 'N/A' and fields.get(field, 'N/A') != 'N/A':
+                self.result[field] = fields[field]
+
+        if depth < self.max_depth:
+            for link in fields.get('Contact Links', ()):
+                if link not in self._seen:
+                    self._seen.add(link)
+                    self._queue.append((link, depth + 1))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+URL normalization and deduplication for the Website Business Information Scraper
+Pasted lists often name one business several ways (example.com,
+https://www.example.com/, http://example.com/index.html?utm_source=x). Every
+input URL is canonicalized before fetching, each business is scraped once, and
+its result row is fanned back out to every input row that named it, in input
+order. Seen URLs are remembered as 64-bit digests so multi-million-URL inputs
+stay small in memory.
+"""
+
+import hashlib
+from collections import deque
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Query parameters that only track where a visitor came from (generic names such as
+# ref or source are left alone: sites also use them to pick what a page shows)
+TRACKING_PARAMS = {
+    'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'twclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref_src',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hsa_')
+
+# Directory index pages that are the same page as the directory itself
+INDEX_PAGES = {'index.html', 'index.htm', 'index.php', 'index.asp', 'default.htm', 'default.html', 'default.aspx'}
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url):
+    """The URL to fetch: https:// added if missing, lowercase scheme and host,
+    no default port, index page, trailing slash, tracking parameters or fragment
+    (user info and IPv6 brackets are kept)"""
+    url = url.strip()
+    if not url.startswith(('http://', 'https://')) and '://' not in url:
+        url = 'https://' + url
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower().rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"  # IPv6 literal
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    userinfo, at, _ = parts.netloc.rpartition('@')
+    if at:
+        host = f"{userinfo}@{host}"
+
+    path = parts.path
+    while '//' in path:
+        path = path.replace('//', '/')
+    head, _, last = path.rpartition('/')
+    if last.lower() in INDEX_PAGES:
+        path = head + '/'
+    path = path.rstrip('/')
+
+    query = urlencode([(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                       if not is_tracking_param(name)])
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def dedupe_key(url):
+    """Key under which spellings of the same site collide: canonical URL without scheme or www."""
+    canonical = canonical_url(url)
+    _, _, rest = canonical.partition('://')
+    if rest.startswith('www.'):
+        rest = rest[4:]
+    return rest
+
+
+def url_digest(url):
+    """64-bit digest of the dedupe key (any collision among 10 million URLs: ~3 in a million)"""
+    digest = hashlib.blake2b(dedupe_key(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def iter_deduped(scrape, urls, remember=10_000):
+    """Scrape each distinct site once and yield one result row per input URL, in input order
+
+    scrape takes an iterable of URLs and yields their results in the same order
+    (e.g. scraper.iter_websites). Duplicate rows are copies of the first row
+    with their own canonical URL as 'Website'. Digests and results are kept for
+    the last `remember` distinct sites; a duplicate seen further back than that
+    is simply scraped again, so memory stays bounded on any input size.
+    """
+    first_seen = {}  # url digest -> index of its distinct site
+    window = deque()  # (site index, url digest) of the remembered sites, oldest first
+    pending = deque()  # (input URL, site index, first time seen) in input order
+    counter = [0]
+
+    def distinct_urls():
+        for url in urls:
+            url = url.strip()
+            if not url:
+                continue
+            digest = url_digest(url)
+            index = first_seen.get(digest)
+            if index is not None and counter[0] - index <= remember:
+                pending.append((url, index, False))
+                continue
+            index = first_seen[digest] = counter[0]
+            counter[0] += 1
+            window.append((index, digest))
+            # Sites that fell out of the window could only cause a second scrape
+            while counter[0] - window[0][0] > remember:
+                old_index, old_digest = window.popleft()
+                if first_seen.get(old_digest) == old_index:
+                    del first_seen[old_digest]
+            pending.append((url, index, True))
+            yield url
+
+    def fan_out(row, url, first):
+        return row if first else dict(row, Website=canonical_url(url))
+
+    results = {}
+    latest = -1
+    for latest, result in enumerate(scrape(distinct_urls())):
+        results[latest] = result
+        results.pop(latest - remember - 1, None)
+
+        # Rows whose site is finished can go out now
+        while pending and pending[0][1] <= latest:
+            url, index, first = pending.popleft()
+            yield fan_out(results[index], url, first)
+
+    # Duplicates after the last distinct site (sites never scraped, e.g. after a stop, are skipped)
+    for url, index, first in pending:
+        if index <= latest and index in results:
+            yield fan_out(results[index], url, first)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Page collection for the Website Business Information Scraper
+Walks a parsed page once to collect its title, first heading, visible text,
+footer text, JSON-LD blocks and links into a ParsedPage, which candidates.py
+turns into ranked field values. Also holds the field patterns shared by the
+candidate scanner and the contact-link ranking used when crawling.
+"""
+
+import re
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
+
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+INSTAGRAM_PATTERN = r'https?://(?:www\.)?instagram\.com/[A-Za-z0-9._]+/?'
+US_PHONE_PATTERN = r'\+?1?\s*\(?[0-9]{3}\)?[\s.-]?[0-9]{3}[\s.-]?[0-9]{4}'
+INTERNATIONAL_PHONE_PATTERN = r'\+?[0-9]{1,4}[\s.-]?[0-9]{1,4}[\s.-]?[0-9]{1,4}[\s.-]?[0-9]{1,4}'
+
+# Links likely to lead to contact details, most promising first
+CONTACT_LINK_PATTERNS = [
+    re.compile(r'contact|kontakt|contacto|get-in-touch|reach-us', re.IGNORECASE),
+    re.compile(r'about|impressum|location|find-us|visit|team', re.IGNORECASE),
+]
+
+INSTAGRAM_RE = re.compile(INSTAGRAM_PATTERN)
+# instagram.com paths that are not profiles
+INSTAGRAM_RESERVED = {'p', 'reel', 'reels', 'explore', 'stories', 'accounts', 'tv', 'about',
+                      'developer', 'legal', 'direct', 'web'}
+TITLE_SUFFIX_RE = re.compile(r'\s*[-|]\s*(Home|Welcome|Official Site|Website).*$', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+class ParsedPage:
+    """The parts of a page the extractors read, collected in a single walk"""
+
+    __slots__ = ('title', 'h1', 'text', 'hrefs', 'footer', 'json_ld')
+
+    def __init__(self, title=None, h1=None, text='', hrefs=(), footer='', json_ld=()):
+        self.title = title  # text of the first <title>, or None
+        self.h1 = h1  # text of the first <h1>, or None
+        self.text = text  # same string soup.get_text() returns
+        self.hrefs = list(hrefs)  # href of every <a href> in document order
+        self.footer = footer  # text of the outermost <footer> elements, one per line
+        self.json_ld = list(json_ld)  # contents of every <script type="application/ld+json">
+
+
+def is_json_ld(script_type):
+    """Whether a <script> type attribute marks JSON-LD structured data"""
+    return (script_type or '').strip().lower() == 'application/ld+json'
+
+
+def collect_page(soup):
+    """Walk a BeautifulSoup document once and return a ParsedPage"""
+    text_types = soup.interesting_string_types
+    title = h1 = None
+    strings = []
+    hrefs = []
+    footers = []
+    json_ld = []
+
+    for element in soup.descendants:
+        element_type = type(element)
+        if element_type in text_types:
+            strings.append(element)
+            continue
+
+        name = getattr(element, 'name', None)
+        if name == 'a':
+            href = element.get('href')
+            if href is not None:
+                hrefs.append(href)
+        elif name == 'title' and title is None:
+            title = element.get_text()
+        elif name == 'h1' and h1 is None:
+            h1 = element.get_text()
+        elif name == 'footer' and not (footers and element.find_parent('footer')):
+            footers.append(element.get_text())
+        elif name == 'script' and is_json_ld(element.get('type')):
+            json_ld.append(element.string or '')
+
+    return ParsedPage(title, h1, ''.join(strings), hrefs, '\n'.join(footers), json_ld)
+
+
+def contact_links(hrefs, base_url, limit):
+    """Same-site links that probably lead to contact or about pages, best first"""
+    base = urlparse(base_url)
+    site = (base.hostname or '').lower()
+    if site.startswith('www.'):
+        site = site[4:]
+
+    ranked = [[] for _ in CONTACT_LINK_PATTERNS]
+    seen = {urlunsplit((base.scheme, base.netloc, base.path or '/', base.query, ''))}
+    for href in hrefs:
+        href = href.strip()
+        if not href or href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            continue
+
+        parts = urlsplit(urljoin(base_url, href))
+        host = (parts.hostname or '').lower()
+        if parts.scheme not in ('http', 'https') or (host != site and host != 'www.' + site):
+            continue
+
+        link = urlunsplit((parts.scheme, parts.netloc, parts.path or '/', parts.query, ''))
+        if link in seen:
+            continue
+        for rank, pattern in enumerate(CONTACT_LINK_PATTERNS):
+            if pattern.search(parts.path):
+                seen.add(link)
+                ranked[rank].append(link)
+                break
+
+    return [link for links in ranked for link in links][:limit]
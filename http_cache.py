@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache for the Website Business Information Scraper
+Stores each page body with its headers, ETag and Last-Modified, keyed by the
+same canonical URL the dedupe and journal layers use (dedupe.canonical_url). Fresh entries are served without touching the network, stale
+ones are revalidated with If-None-Match / If-Modified-Since, and offline mode
+re-extracts purely from what is cached. The oldest entries are evicted once the
+cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from dedupe import canonical_url
+
+
+class CachedResponse:
+    """A cached page body and the validators needed to revalidate it"""
+
+    def __init__(self, url, body, headers, stored_at):
+        self.url = url
+        self.body = body
+        self.headers = headers
+        self.stored_at = stored_at
+
+    @property
+    def etag(self):
+        return self.headers.get('etag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('last-modified')
+
+    def conditional_headers(self):
+        """Request headers that ask the server to answer 304 if nothing changed"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Persistent page cache with a freshness TTL and size-based eviction"""
+
+    # Only these response headers are kept
+    STORED_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control', 'date')
+
+    def __init__(self, directory='.http_cache', ttl=7 * 24 * 3600, max_bytes=1024 ** 3, offline=False):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # Offline mode never touches the network: cache misses become errors
+        self.offline = offline
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entry_files())
+
+    def _paths(self, url):
+        key = hashlib.sha256(canonical_url(url).encode('utf-8')).hexdigest()
+        folder = os.path.join(self.directory, key[:2])
+        return os.path.join(folder, key + '.json'), os.path.join(folder, key + '.body')
+
+    def _entry_files(self):
+        for folder, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(('.json', '.body')):
+                    yield os.path.join(folder, name)
+
+    def get(self, url):
+        """The cached response for url (fresh or stale), or None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        # Touch the body so eviction drops the least recently used pages first
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return CachedResponse(meta['url'], body, meta['headers'], meta['stored_at'])
+
+    def is_fresh(self, entry):
+        """Whether an entry is young enough to use without revalidating"""
+        return time.time() - entry.stored_at < self.ttl
+
+    def store(self, url, body, headers):
+        """Save a downloaded page"""
+        kept = {name: headers[name] for name in self.STORED_HEADERS if headers.get(name)}
+        self._write(url, body, kept, time.time())
+
+    def refresh(self, entry):
+        """Mark an entry fresh again after the server answered 304 Not Modified"""
+        self._write(entry.url, entry.body, entry.headers, time.time())
+
+    def _write(self, url, body, headers, stored_at):
+        meta_path, body_path = self._paths(url)
+        folder = os.path.dirname(meta_path)
+        os.makedirs(folder, exist_ok=True)
+
+        meta = json.dumps({'url': url, 'headers': headers, 'stored_at': stored_at}).encode('utf-8')
+        old_size = sum(os.path.getsize(p) for p in (meta_path, body_path) if os.path.exists(p))
+
+        # Write to temporary files and swap them in, so readers never see half a page
+        for path, data in ((body_path, body), (meta_path, meta)):
+            fd, tmp_path = tempfile.mkstemp(dir=folder)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size += len(body) + len(meta) - old_size
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache is under 90% of max_bytes"""
+        with self._lock:
+            bodies = []
+            for path in self._entry_files():
+                if path.endswith('.body'):
+                    try:
+                        bodies.append((os.path.getmtime(path), path))
+                    except OSError:
+                        pass
+            bodies.sort()
+
+            target = self.max_bytes * 0.9
+            for _, body_path in bodies:
+                if self._size <= target:
+                    break
+                for path in (body_path, body_path[:-len('.body')] + '.json'):
+                    try:
+                        self._size -= os.path.getsize(path)
+                        os.remove(path)
+                    except OSError:
+                        pass
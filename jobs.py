@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Background scraping jobs for the web application
+Each job has its own ID, status, cancel flag and in-memory result store that
+downloads stream from, and jobs run on a bounded pool of worker threads so
+several users can scrape at once without sharing one global state dict or one
+output file.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from streaming import SUMMARY_FIELDS
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+STOPPED = 'stopped'
+FAILED = 'failed'
+
+FINISHED_STATES = (DONE, STOPPED, FAILED)
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many jobs are already waiting for a worker"""
+
+
+class ScrapeJob:
+    """State of one scraping job"""
+
+    def __init__(self, urls, resume=False, profile=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.urls = urls
+        self.resume = resume
+        self.profile = profile  # None, or the metrics.JobProfiler mode to profile the job with
+
+        self.state = QUEUED
+        self.current_url = ''
+        self.completed = 0
+        self.failed = 0
+        self.found = {field: 0 for field, _ in SUMMARY_FIELDS}
+        self.results = []
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def total_urls(self):
+        return len(self.urls)
+
+    @property
+    def is_running(self):
+        return self.state in (QUEUED, RUNNING)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def stop(self):
+        """Ask the job to stop after the website it is scraping now"""
+        self._cancel.set()
+
+    def add_result(self, result):
+        self.results.append(result)
+        self.completed += 1
+        if result.get('Error'):
+            self.failed += 1
+        for field in self.found:
+            if result.get(field, 'N/A') != 'N/A':
+                self.found[field] += 1
+
+    def results_since(self, since=0, limit=None):
+        """Result rows from offset since onwards, at most limit of them"""
+        end = self.completed if limit is None else min(self.completed, since + limit)
+        return self.results[since:end]
+
+    def iter_result_batches(self, since=0, follow=False, batch_size=500, poll_interval=0.5):
+        """Yield lists of result rows from offset since; with follow, until the job ends"""
+        while True:
+            # Check before reading so rows added just before the job ends are still sent
+            running = self.is_running
+            rows = self.results_since(since, batch_size)
+            if rows:
+                since += len(rows)
+                yield rows
+            elif follow and running:
+                time.sleep(poll_interval)
+            else:
+                return
+
+    def status(self):
+        """JSON-friendly counters of the job, without the result rows"""
+        return {
+            'job_id': self.id,
+            'state': self.state,
+            'is_running': self.is_running,
+            'current_url': self.current_url,
+            'progress': round(self.completed / self.total_urls * 100, 1) if self.total_urls else 0,
+            'total_urls': self.total_urls,
+            'completed': self.completed,
+            'failed': self.failed,
+            'found': dict(self.found),
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'csv_ready': self.completed > 0
+        }
+
+
+class JobManager:
+    """Runs scraping jobs on a bounded thread pool and keeps recent jobs by ID"""
+
+    def __init__(self, run_job, max_workers=2, max_queued=20, max_jobs=100):
+        self.run_job = run_job  # called with the job on a worker thread
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+
+    def submit(self, urls, resume=False, profile=None):
+        """Queue a new job and return it"""
+        job = ScrapeJob(urls, resume, profile)
+        with self._lock:
+            queued = sum(1 for other in self._jobs.values() if other.state == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFullError(f"{queued} jobs are already waiting, try again later")
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        if job.cancelled:
+            job.state = STOPPED
+            job.finished_at = time.time()
+            return
+
+        job.state = RUNNING
+        job.started_at = time.time()
+        try:
+            self.run_job(job)
+            job.state = STOPPED if job.cancelled else DONE
+        except Exception as e:
+            job.error = str(e)
+            job.state = FAILED
+        finally:
+            job.current_url = ''
+            job.finished_at = time.time()
+
+    def _forget_old_jobs(self):
+        """Drop the oldest finished jobs and their results beyond max_jobs"""
+        finished = [job for job in self._jobs.values() if job.state in FINISHED_STATES]
+        for job in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id):
+        """The job with this ID, or None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self):
+        """The most recently submitted job, or None"""
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stop(self, job_id):
+        """Cancel a job; returns the job, or None if it does not exist"""
+        job = self.get(job_id)
+        if job is not None:
+            job.stop()
+        return job
+
+    def shutdown(self, wait=True):
+        for job in self.jobs():
+            job.stop()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Crawl journal for the Website Business Information Scraper
+An append-only SQLite log of every URL's final status and result row. A resumed
+run skips URLs whose latest entry is 'done' and only scrapes pending or failed
+ones, so restarting after a deploy or crash costs almost nothing.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+DONE = 'done'
+FAILED = 'failed'
+
+
+class CrawlJournal:
+    """Append-only record of finished URLs; the latest entry per URL wins"""
+
+    def __init__(self, path='crawl_journal.db', commit_every=100, commit_interval=2.0):
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        # The async engine reads pending URLs on its own thread while rows are recorded on another
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS entries_url ON entries (url, id)')
+        self.conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def record(self, result):
+        """Append a result row, keyed by its Website, as done or failed"""
+        status = FAILED if result.get('Error') else DONE
+        with self._lock:
+            self.conn.execute(
+                'INSERT INTO entries (url, status, result, recorded_at) VALUES (?, ?, ?, ?)',
+                (result['Website'], status, json.dumps(result, ensure_ascii=False), time.time())
+            )
+
+            # Commit in batches: a crash only re-scrapes the last few URLs
+            self._uncommitted += 1
+            if (self._uncommitted >= self.commit_every
+                    or time.monotonic() - self._last_commit >= self.commit_interval):
+                self.commit()
+        return status
+
+    def latest(self, url):
+        """(status, result) of the latest entry for url, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT status, result FROM entries WHERE url = ? ORDER BY id DESC LIMIT 1', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def is_done(self, url):
+        """Whether url has already been scraped successfully"""
+        latest = self.latest(url)
+        return latest is not None and latest[0] == DONE
+
+    def pending(self, urls, key=None):
+        """Yield only the URLs that still need scraping (never seen, or last attempt failed)"""
+        for url in urls:
+            if not self.is_done(key(url) if key else url):
+                yield url
+
+    def iter_results(self):
+        """Latest result row for every journaled URL, in the order they were recorded"""
+        rows = self.conn.execute('''
+            SELECT result FROM entries
+            WHERE id IN (SELECT MAX(id) FROM entries GROUP BY url)
+            ORDER BY id
+        ''')
+        for (result,) in rows:
+            yield json.loads(result)
+
+    def counts(self):
+        """Number of URLs whose latest entry is done / failed"""
+        rows = self.conn.execute('''
+            SELECT status, COUNT(*) FROM entries
+            WHERE id IN (SELECT MAX(id) FROM entries GROUP BY url)
+            GROUP BY status
+        ''')
+        counts = {DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Metrics for the Website Business Information Scraper
+Every scrape records how long each phase took (fetch and its dns / connect /
+tls / ttfb / body parts, parse, extract and the whole site) in histograms, and
+counts results by outcome, failures by error class, retries, bytes downloaded
+and fields found. ScrapeMetrics renders them in the Prometheus text format for
+the web app's /metrics endpoint and as a short summary at the end of a CLI run.
+JobProfiler optionally profiles one job with cProfile or a stack sampler.
+"""
+
+import cProfile
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PHASES = ('fetch', 'dns', 'connect', 'tls', 'ttfb', 'body', 'parse', 'extract', 'site')
+
+COUNTERS = {
+    'results_total': 'Websites scraped, by outcome',
+    'errors_total': 'Websites that could not be scraped, by error class',
+    'retries_total': 'Fetches retried, by the error class of the failed attempt',
+    'fields_found_total': 'Websites a field was found on, by field',
+    'downloaded_bytes_total': 'Bytes of page bodies downloaded',
+}
+
+FOUND_FIELDS = ('Business Name', 'Email', 'Instagram', 'Phone')
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their sum"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, share):
+        """Upper bound of the bucket holding the given share of observations (inf past the last bucket)"""
+        if not self.count:
+            return 0.0
+        rank = share * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+def format_labels(labels):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}' if labels else ''
+
+
+def gauge_lines(name, help_text, samples):
+    """Prometheus text lines of a gauge from (labels dict, value) pairs"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(sorted(labels.items()))} {value}")
+    return lines
+
+
+class ScrapeMetrics:
+    """Thread-safe phase histograms and counters shared by scrapers"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, prefix='scraper'):
+        self.buckets = buckets
+        self.prefix = prefix
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._phases = {}  # phase -> Histogram
+        self._counters = Counter()  # (name, sorted label pairs) -> value
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            histogram = self._phases.get(phase)
+            if histogram is None:
+                histogram = self._phases[phase] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_phases(self, phases):
+        """Observe a dict of phase -> seconds (e.g. one fetch's network phases)"""
+        for phase, seconds in phases.items():
+            self.observe(phase, seconds)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def value(self, name, **labels):
+        with self._lock:
+            return self._counters[(name, tuple(sorted(labels.items())))]
+
+    def histogram(self, phase):
+        with self._lock:
+            return self._phases.get(phase)
+
+    def record_result(self, result, seconds=None):
+        """Count one finished website and, if given, how long it took"""
+        error_type = result.get('Error Type') or ('other' if result.get('Error') else '')
+        self.inc('results_total', outcome='error' if error_type else 'ok')
+        if error_type:
+            self.inc('errors_total', type=error_type)
+        for field in FOUND_FIELDS:
+            if result.get(field, 'N/A') != 'N/A':
+                self.inc('fields_found_total', field=field)
+        if seconds is not None:
+            self.observe('site', seconds)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            phases = {phase: (list(h.counts), h.sum, h.count) for phase, h in self._phases.items()}
+
+        lines = []
+        for name, help_text in COUNTERS.items():
+            full_name = f"{self.prefix}_{name}"
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} counter"]
+            samples = [(labels, value) for (counter, labels), value in counters if counter == name]
+            for labels, value in samples or [((), 0)]:
+                lines.append(f"{full_name}{format_labels(labels)} {value}")
+
+        name = f"{self.prefix}_phase_seconds"
+        lines += [f"# HELP {name} Seconds spent in each scraping phase", f"# TYPE {name} histogram"]
+        ordered = [phase for phase in PHASES if phase in phases] + sorted(set(phases) - set(PHASES))
+        for phase in ordered:
+            counts, total, count = phases[phase]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{phase="{phase}"}} {total:.6f}')
+            lines.append(f'{name}_count{{phase="{phase}"}} {count}')
+
+        lines += gauge_lines(f"{self.prefix}_start_time_seconds", 'When metrics collection started',
+                             [({}, round(self.started, 3))])
+        return '\n'.join(lines) + '\n'
+
+    def summary_lines(self):
+        """Human-readable end-of-run summary"""
+        ok = self.value('results_total', outcome='ok')
+        errors = self.value('results_total', outcome='error')
+        megabytes = self.value('downloaded_bytes_total') / (1024 * 1024)
+        lines = [f"📈 {ok + errors} websites scraped ({ok} ok, {errors} failed), {megabytes:.1f} MB downloaded"]
+
+        with self._lock:
+            error_counts = sorted(((dict(labels)['type'], value) for (name, labels), value in self._counters.items()
+                                   if name == 'errors_total'), key=lambda item: -item[1])
+            retries = sum(value for (name, _), value in self._counters.items() if name == 'retries_total')
+        if error_counts:
+            lines.append('   errors: ' + ', '.join(f"{error_type} {count}" for error_type, count in error_counts))
+        if retries:
+            lines.append(f"   retries: {retries}")
+        lines.append('   found: ' + ', '.join(
+            f"{field} {self.value('fields_found_total', field=field)}" for field in FOUND_FIELDS))
+
+        for phase in PHASES:
+            histogram = self.histogram(phase)
+            if histogram is None or not histogram.count:
+                continue
+            p95 = histogram.quantile(0.95)
+            bound = '>60s' if p95 == float('inf') else f"≤{p95 * 1000:.0f}ms"
+            lines.append(f"   {phase:<8} {histogram.count:>7} × avg {histogram.sum / histogram.count * 1000:8.1f}ms"
+                         f"   p95 {bound}")
+        return lines
+
+
+class SamplingProfiler:
+    """Samples the stack of every thread (or only of thread_ids) at an interval
+    and counts identical stacks
+
+    Unlike cProfile it sees the fetch threads and event loop alike, and its
+    output is in the collapsed-stack format that flame graph tools read.
+    """
+
+    def __init__(self, interval=0.005, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class JobProfiler:
+    """Profiles the code run inside it and writes the profile to path on exit
+
+    mode 'cprofile' profiles the calling thread (a .prof file for pstats or
+    snakeviz); 'sample' samples every thread, or only thread_ids when given
+    (collapsed stacks). A server running several jobs passes the job's own
+    thread so other jobs do not end up in its profile. With no path it does
+    nothing.
+    """
+
+    MODES = ('cprofile', 'sample')
+
+    def __init__(self, path=None, mode='cprofile', interval=0.005, thread_ids=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {', '.join(self.MODES)}")
+        self.path = path
+        self.mode = mode
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self._profiler = None
+
+    def __enter__(self):
+        if self.path:
+            if self.mode == 'sample':
+                self._profiler = SamplingProfiler(self.interval, self.thread_ids)
+                self._profiler.start()
+            else:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is None:
+            return
+        if self.mode == 'sample':
+            self._profiler.stop()
+            self._profiler.dump(self.path)
+        else:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.path)
+        self._profiler = None
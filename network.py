@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Network layer for the Website Business Information Scraper
+Almost every URL in a list is a different small-business domain, so each fetch
+pays a DNS lookup plus TCP and TLS setup. This module adds a shared DNS cache
+with a TTL (and a shorter negative TTL so dead domains fail fast), a requests
+adapter with configurable pool sizes whose connections resolve through that
+cache, and a per-thread trace that times every fetch in phases:
+dns, connect, tls, ttfb (request sent to response headers) and body.
+"""
+
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'body')
+
+
+class DnsCache:
+    """Thread-safe getaddrinfo cache with positive and negative TTLs"""
+
+    def __init__(self, ttl=300, negative_ttl=60, max_entries=100_000, prefetch_workers=8):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.prefetch_workers = prefetch_workers
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}  # (host, port) -> (expires, addresses or gaierror)
+        self._inflight = {}  # (host, port) -> Future of a lookup already running
+        self._executor = None
+
+    def _lookup(self, host, port):
+        try:
+            value = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+            expires = time.monotonic() + self.ttl
+        except socket.gaierror as e:
+            # NXDOMAIN and friends: remember the failure so the next URL fails fast
+            value = e
+            expires = time.monotonic() + self.negative_ttl
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._prune()
+            self._entries[(host, port)] = (expires, value)
+        return value
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+
+    def _cached(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def resolve(self, host, port):
+        """getaddrinfo results for host:port, raising socket.gaierror for unknown hosts"""
+        key = (host, port)
+        with self._lock:
+            value = self._cached(key)
+            inflight = self._inflight.get(key) if value is None else None
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if value is None:
+            # Share a lookup that a prefetch already started
+            value = inflight.result() if inflight is not None else self._lookup(host, port)
+        if isinstance(value, socket.gaierror):
+            raise value
+        return value
+
+    def prefetch(self, host, port):
+        """Start resolving host:port in the background if it is not cached yet"""
+        key = (host, port)
+        with self._lock:
+            if self._cached(key) is not None or key in self._inflight:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.prefetch_workers, thread_name_prefix='dns')
+            future = self._executor.submit(self._lookup, host, port)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _: self._forget_inflight(key))
+
+    def _forget_inflight(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+
+class PhaseTrace:
+    """Seconds spent in each phase of the fetches made for one URL"""
+
+    __slots__ = ('phases', 'mark')
+
+    def __init__(self):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.mark = time.perf_counter()  # start of the current request
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds
+
+
+_local = threading.local()
+
+
+def start_trace():
+    """Start timing the fetches made on this thread"""
+    _local.trace = PhaseTrace()
+    return _local.trace
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+def end_trace():
+    """Stop timing on this thread and return the phase timings"""
+    trace = current_trace()
+    _local.trace = None
+    return trace.phases if trace is not None else None
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """urllib3 connection that resolves through a DnsCache and records phase timings"""
+
+    dns_cache = None  # set on the subclasses that ScraperAdapter builds
+
+    def _new_conn(self):
+        trace = current_trace()
+        start = time.perf_counter()
+        try:
+            addresses = self.dns_cache.resolve(self._dns_host, self.port)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        finally:
+            if trace is not None:
+                trace.add('dns', time.perf_counter() - start)
+
+        # Connect to the resolved addresses in turn; TLS still uses self.host for SNI
+        host = self._dns_host
+        connecting = time.perf_counter()
+        error = None
+        try:
+            for _, _, _, _, sockaddr in addresses:
+                self._dns_host = sockaddr[0]
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+            raise error
+        finally:
+            self._dns_host = host
+            if trace is not None:
+                trace.add('connect', time.perf_counter() - connecting)
+
+    def connect(self):
+        trace = current_trace()
+        if trace is None:
+            return super().connect()
+
+        start = time.perf_counter()
+        before = trace.phases['dns'] + trace.phases['connect']
+        super().connect()
+        now = time.perf_counter()
+        if isinstance(self, HTTPSConnection):
+            trace.add('tls', max(0.0, now - start - (trace.phases['dns'] + trace.phases['connect'] - before)))
+        # Plain HTTP connects lazily while sending, so time to first byte starts here
+        trace.mark = now
+
+    def request(self, *args, **kwargs):
+        trace = current_trace()
+        if trace is not None:
+            trace.mark = time.perf_counter()
+        return super().request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        sock = self.sock
+        response = super().getresponse(*args, **kwargs)
+        # Kept so abort_response() can interrupt a body read that is stuck on a slow server
+        response.source_socket = sock
+        trace = current_trace()
+        if trace is not None:
+            trace.add('ttfb', time.perf_counter() - trace.mark)
+        return response
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    pass
+
+
+def abort_response(response):
+    """Shut down the socket a streamed requests response reads from, so a read
+    blocked on a server that trickles its body in returns at once"""
+    sock = getattr(response.raw, 'source_socket', None)
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class ScraperAdapter(HTTPAdapter):
+    """requests adapter whose pools use the DNS cache and timed connections
+
+    pool_hosts is how many per-host pools are kept (the rest are closed least
+    recently used first) and pool_per_host how many connections each keeps.
+    """
+
+    def __init__(self, dns_cache, pool_hosts=256, pool_per_host=2, **kwargs):
+        self.dns_cache = dns_cache
+        # Each adapter gets its own connection classes bound to its cache
+        http_conn = type('CachedHTTPConnection', (TimedHTTPConnection,), {'dns_cache': dns_cache})
+        https_conn = type('CachedHTTPSConnection', (TimedHTTPSConnection,), {'dns_cache': dns_cache})
+        self._pool_classes = {
+            'http': type('CachedHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_conn}),
+            'https': type('CachedHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_conn}),
+        }
+        super().__init__(pool_connections=pool_hosts, pool_maxsize=pool_per_host, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+
+class TimingLog:
+    """Timing sink that appends one JSON line of phase milliseconds per fetch"""
+
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, url, phases):
+        record = {'url': url}
+        record.update({f"{phase}_ms": round(seconds * 1000, 2) for phase, seconds in phases.items()})
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            self.file.write(line)
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
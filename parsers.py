@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+HTML parser backends for the Website Business Information Scraper
+Every backend turns a downloaded page into the ParsedPage that extract_page
+ranks field candidates from (see candidates.py), so they are interchangeable. The fastest installed backend is
+picked automatically:
+
+    selectolax   - lexbor C parser (optional: pip install selectolax)
+    lxml-stream  - lxml parser events collected without building a tree
+    lxml         - BeautifulSoup on top of lxml
+    html.parser  - BeautifulSoup on the pure-Python parser (always available)
+"""
+
+import codecs
+import re
+import time
+
+from candidates import best_fields, collect_candidates
+from extraction import ParsedPage, collect_page, contact_links, is_json_ld
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Fastest first
+PARSER_BACKENDS = ('selectolax', 'lxml-stream', 'lxml', 'html.parser')
+
+# Elements whose text BeautifulSoup's get_text() leaves out
+NON_TEXT_TAGS = ('script', 'style', 'template')
+
+DECLARED_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def backend_available(name):
+    """Whether the libraries a backend needs are installed"""
+    if name == 'selectolax':
+        return LexborHTMLParser is not None
+    if name in ('lxml-stream', 'lxml'):
+        return etree is not None
+    return name == 'html.parser'
+
+
+def available_backends():
+    """Installed backends, fastest first"""
+    return [name for name in PARSER_BACKENDS if backend_available(name)]
+
+
+def resolve_backend(name='auto'):
+    """Pick the backend to use, falling back to the fastest installed one"""
+    if name in (None, 'auto'):
+        return available_backends()[0]
+
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser {name!r}, choose from: auto, {', '.join(PARSER_BACKENDS)}")
+
+    if not backend_available(name):
+        fallback = available_backends()[0]
+        print(f"⚠️ Parser {name!r} is not installed, using {fallback!r} instead")
+        return fallback
+
+    return name
+
+
+def decode_html(content):
+    """Decode page bytes: BOM, then declared charset, then UTF-8, then Windows-1252"""
+    if isinstance(content, str):
+        return content
+
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return content.decode(encoding, errors='replace')
+
+    declared = DECLARED_CHARSET_RE.search(content[:4096])
+    if declared:
+        try:
+            return content.decode(declared.group(1).decode('ascii'))
+        except (LookupError, UnicodeDecodeError):
+            pass
+
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('windows-1252', errors='replace')
+
+
+class PageEventCollector:
+    """lxml parser target that builds a ParsedPage straight from parse events"""
+
+    def __init__(self):
+        self.title = None
+        self.h1 = None
+        self.strings = []
+        self.hrefs = []
+        self._skip_depth = 0  # inside script/style/template
+        self._title_parts = None  # collecting the first <title>
+        self._h1_parts = None  # collecting the first <h1>
+        self._h1_depth = 0
+        self.footers = []
+        self._footer_parts = None  # collecting an outermost <footer>
+        self._footer_depth = 0
+        self.json_ld = []
+        self._json_ld_parts = None  # collecting a JSON-LD <script>
+
+    def start(self, tag, attrib):
+        if tag in NON_TEXT_TAGS:
+            self._skip_depth += 1
+            if tag == 'script' and is_json_ld(attrib.get('type')):
+                self._json_ld_parts = []
+        elif tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.hrefs.append(href)
+        elif tag == 'title' and self.title is None and self._title_parts is None:
+            self._title_parts = []
+        elif tag == 'h1':
+            if self._h1_parts is not None:
+                self._h1_depth += 1
+            elif self.h1 is None:
+                self._h1_parts = []
+                self._h1_depth = 1
+        elif tag == 'footer':
+            if self._footer_parts is None:
+                self._footer_parts = []
+            self._footer_depth += 1
+
+    def end(self, tag):
+        if tag in NON_TEXT_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            if tag == 'script' and self._json_ld_parts is not None:
+                self.json_ld.append(''.join(self._json_ld_parts))
+                self._json_ld_parts = None
+        elif tag == 'title' and self._title_parts is not None:
+            self.title = ''.join(self._title_parts)
+            self._title_parts = None
+        elif tag == 'h1' and self._h1_parts is not None:
+            self._h1_depth -= 1
+            if not self._h1_depth:
+                self.h1 = ''.join(self._h1_parts)
+                self._h1_parts = None
+        elif tag == 'footer' and self._footer_parts is not None:
+            self._footer_depth -= 1
+            if not self._footer_depth:
+                self.footers.append(''.join(self._footer_parts))
+                self._footer_parts = None
+
+    def data(self, data):
+        if self._skip_depth:
+            if self._json_ld_parts is not None:
+                self._json_ld_parts.append(data)
+            return
+        self.strings.append(data)
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if self._h1_parts is not None:
+            self._h1_parts.append(data)
+        if self._footer_parts is not None:
+            self._footer_parts.append(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return ParsedPage(self.title, self.h1, ''.join(self.strings), self.hrefs,
+                          '\n'.join(self.footers), self.json_ld)
+
+
+def parse_lxml_stream(content):
+    """Collect the page in one streaming pass through lxml, without building a tree"""
+    parser = etree.HTMLParser(target=PageEventCollector())
+    parser.feed(decode_html(content))
+    return parser.close()
+
+
+def parse_selectolax(content):
+    """Collect the page from a lexbor tree"""
+    tree = LexborHTMLParser(decode_html(content))
+    json_ld = [node.text() for node in tree.css('script[type]') if is_json_ld(node.attributes.get('type'))]
+    tree.strip_tags(list(NON_TEXT_TAGS))
+
+    title = tree.css_first('title')
+    h1 = tree.css_first('h1')
+    hrefs = [node.attributes.get('href') or '' for node in tree.css('a[href]')]
+    text = tree.root.text(deep=True, separator='') if tree.root is not None else ''
+    footers = [node.text(deep=True, separator='') for node in tree.css('footer') if not inside_footer(node)]
+
+    return ParsedPage(
+        title.text() if title is not None else None,
+        h1.text() if h1 is not None else None,
+        text,
+        hrefs,
+        '\n'.join(footers),
+        json_ld
+    )
+
+
+def inside_footer(node):
+    """Whether a lexbor node sits inside another <footer>"""
+    parent = node.parent
+    while parent is not None:
+        if parent.tag == 'footer':
+            return True
+        parent = parent.parent
+    return False
+
+
+def parse_soup(content, builder):
+    """Collect the page from a BeautifulSoup tree"""
+    # Imported here: with selectolax or lxml installed most runs never need it
+    from bs4 import BeautifulSoup
+    return collect_page(BeautifulSoup(content, builder))
+
+
+def parse_html(content, backend='html.parser'):
+    """Parse page bytes into a ParsedPage with the given backend"""
+    if not content or not content.strip():
+        return ParsedPage()
+
+    if backend == 'selectolax':
+        parse = parse_selectolax
+    elif backend == 'lxml-stream':
+        parse = parse_lxml_stream
+    elif backend == 'lxml':
+        return parse_soup(content, 'lxml')
+    else:
+        return parse_soup(content, 'html.parser')
+
+    # The fast paths give up on some badly broken pages; the forgiving
+    # pure-Python parser still gets something out of them
+    try:
+        return parse(content)
+    except Exception:
+        return parse_soup(content, 'html.parser')
+
+
+def extract_page(content, url, backend='html.parser', max_links=0, timings=None):
+    """Parse page bytes and extract the business fields
+
+    Each field is the best ranked of the page's candidates; the compact
+    candidate record itself is returned under 'Candidates'. With max_links the
+    likely contact/about links are returned too, under 'Contact Links'. Seconds
+    spent parsing and extracting are stored in the timings dict, if one is
+    given. A plain module-level function so extraction worker processes can
+    run it.
+    """
+    start = time.perf_counter()
+    page = parse_html(content, backend)
+    parsed = time.perf_counter()
+    record = collect_candidates(page, url)
+    fields = best_fields(record)
+    fields['Candidates'] = record
+    if max_links:
+        fields['Contact Links'] = contact_links(page.hrefs, url, max_links)
+    if timings is not None:
+        timings['parse'] = parsed - start
+        timings['extract'] = time.perf_counter() - parsed
+    return fields
+
+
+def timed_extract_page(content, url, backend='html.parser', max_links=0):
+    """extract_page for worker processes: returns (fields, parse/extract timings)"""
+    timings = {}
+    return extract_page(content, url, backend, max_links, timings), timings
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Per-host politeness scheduling for the Website Business Information Scraper
+Limits how often and how many requests go to each host, so different hosts can be
+fetched back to back while a single busy host is spaced out and its Retry-After
+responses are respected.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+def host_key(url):
+    """Return the host name that politeness limits are tracked under"""
+    return (urlparse(url).hostname or '').lower()
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) to seconds, or None"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostScheduler:
+    """Per-host rate and concurrency limits shared by every fetch worker"""
+
+    # How long to wait before re-checking a host that is at its concurrency limit
+    POLL_INTERVAL = 0.05
+
+    # Forget idle hosts after this many acquisitions to keep memory flat on huge lists
+    PRUNE_EVERY = 10000
+
+    def __init__(self, min_interval=1.0, max_per_host=2, max_retry_after=120):
+        self.min_interval = min_interval
+        self.max_per_host = max_per_host
+        self.max_retry_after = max_retry_after
+        self._lock = threading.Lock()
+        self._hosts = {}  # host -> [active requests, earliest next start]
+        self._acquired = 0
+
+    def try_acquire(self, host):
+        """Claim a request slot for host, or return the seconds to wait before retrying"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._hosts.setdefault(host, [0, 0.0])
+
+            if state[0] >= self.max_per_host:
+                return self.POLL_INTERVAL
+            if now < state[1]:
+                return state[1] - now
+
+            state[0] += 1
+            state[1] = now + self.min_interval
+
+            self._acquired += 1
+            if self._acquired % self.PRUNE_EVERY == 0:
+                self._prune(now)
+            return 0.0
+
+    def acquire(self, host):
+        """Block until a request to host is allowed"""
+        while True:
+            wait = self.try_acquire(host)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, host):
+        """Wait without blocking the event loop until a request to host is allowed"""
+        while True:
+            wait = self.try_acquire(host)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, host):
+        """Return a request slot taken with acquire()"""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state and state[0] > 0:
+                state[0] -= 1
+
+    def backoff(self, host, seconds):
+        """Hold off all requests to host for `seconds` (capped at max_retry_after)"""
+        seconds = min(max(seconds, 0.0), self.max_retry_after)
+        with self._lock:
+            state = self._hosts.setdefault(host, [0, 0.0])
+            state[1] = max(state[1], time.monotonic() + seconds)
+
+    def _prune(self, now):
+        """Drop hosts with no active requests and no pending cool-down"""
+        idle = [host for host, (active, next_start) in self._hosts.items()
+                if not active and next_start <= now]
+        for host in idle:
+            del self._hosts[host]
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Post-processing of scraped results for the Website Business Information Scraper
+Works on whole columns of a batch of result rows at a time with pandas string
+operations instead of looping over rows: phones are normalized to E.164,
+emails lowercased and validated, Instagram links reduced to one canonical
+profile URL per handle, and rows that share an email, phone or Instagram
+profile with an earlier row are flagged as duplicate businesses. Summary
+counts are gathered in the same pass. Batches can be fed one after another
+(e.g. chunks of a multi-million row file), duplicates are tracked across them.
+
+Usage: python postprocess.py results.csv cleaned.csv [--country-code 1] [--chunksize 100000]
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from extraction import INSTAGRAM_RESERVED
+from streaming import CLEAN_FIELDS, RESULT_FIELDS, SUMMARY_FIELDS, output_format
+
+# A business is the same one if any of these match, checked in this order
+DUPLICATE_KEYS = ('Email', 'Phone', 'Instagram')
+
+EMAIL_PATTERN = (r'[a-z0-9._%+-]+@[a-z0-9](?:[a-z0-9-]*[a-z0-9])?'
+                 r'(?:\.[a-z0-9](?:[a-z0-9-]*[a-z0-9])?)*\.[a-z]{2,24}')
+# Image and asset names such as logo@2x.png look like addresses to the extractor
+ASSET_SUFFIX_PATTERN = r'\.(?:png|jpe?g|gif|svg|webp|ico|css|js)$'
+
+INSTAGRAM_HANDLE_PATTERN = r'(?i)instagram\.com/([a-z0-9_.]{1,30})'
+
+
+def missing_mask(values):
+    return values.isna() | values.eq('N/A') | values.eq('')
+
+
+def normalize_phones(phones, country_code='1'):
+    """E.164 numbers (+15550102030); numbers without a country code get country_code"""
+    raw = phones.fillna('N/A').astype(str).str.strip()
+    missing = missing_mask(raw)
+    digits = raw.str.replace(r'\D', '', regex=True)
+
+    international = raw.str.startswith('+')
+    dialed_out = ~international & digits.str.startswith('00')
+    digits = digits.where(~dialed_out, digits.str.slice(2))
+    has_country = international | dialed_out
+    if country_code == '1':
+        # North American numbers are often written with their leading 1
+        has_country |= (digits.str.len() == 11) & digits.str.startswith('1')
+
+    # National numbers lose their trunk 0 and gain the default country code
+    full = digits.where(has_country, country_code + digits.str.replace(r'^0', '', regex=True))
+    valid = ~missing & full.str.len().between(8, 15) & ~full.str.startswith('0')
+    if country_code == '1':
+        valid &= has_country | (full.str.len() == 11)
+    return ('+' + full).where(valid, 'N/A')
+
+
+def normalize_emails(emails):
+    """Lowercased addresses, with anything that is not a plausible address as N/A"""
+    cleaned = emails.fillna('N/A').astype(str).str.strip().str.lower()
+    valid = cleaned.str.fullmatch(EMAIL_PATTERN) & ~cleaned.str.contains(ASSET_SUFFIX_PATTERN, regex=True)
+    return cleaned.where(valid.fillna(False).astype(bool), 'N/A')
+
+
+def normalize_instagram(links):
+    """https://instagram.com/<handle> with the handle lowercased, whatever the original scheme or www."""
+    handles = links.fillna('').astype(str).str.extract(INSTAGRAM_HANDLE_PATTERN, expand=False)
+    handles = handles.str.lower().str.rstrip('.')
+    valid = handles.notna() & handles.ne('') & ~handles.isin(INSTAGRAM_RESERVED)
+    return ('https://instagram.com/' + handles).where(valid, 'N/A')
+
+
+class PostProcessor:
+    """Normalizes batches of result rows and flags duplicate businesses across all of them"""
+
+    def __init__(self, country_code='1'):
+        self.country_code = country_code
+        self.first_seen = {key: {} for key in DUPLICATE_KEYS}  # value -> Website of its first row
+        self.rows = 0
+        self.errors = 0
+        self.duplicates = 0
+        self.found = {field: 0 for field, _ in SUMMARY_FIELDS}
+
+    def process(self, frame):
+        """Return a normalized copy of a DataFrame of result rows with a 'Duplicate Of' column"""
+        frame = frame.reindex(columns=RESULT_FIELDS, fill_value='').copy()
+        frame['Email'] = normalize_emails(frame['Email'])
+        frame['Phone'] = normalize_phones(frame['Phone'], self.country_code)
+        frame['Instagram'] = normalize_instagram(frame['Instagram'])
+        frame['Business Name'] = frame['Business Name'].fillna('N/A').astype(str).str.strip()
+        frame['Error'] = frame['Error'].fillna('').astype(str)
+        frame['Duplicate Of'] = self.duplicate_of(frame)
+
+        # Summary counts for the whole batch at once
+        found = frame[list(self.found)].ne('N/A').sum()
+        for field in self.found:
+            self.found[field] += int(found[field])
+        self.rows += len(frame)
+        self.errors += int(frame['Error'].ne('').sum())
+        self.duplicates += int(frame['Duplicate Of'].ne('').sum())
+        return frame
+
+    def duplicate_of(self, frame):
+        """Website of the first row (in this or an earlier batch) sharing a key with each row, or ''"""
+        websites = frame['Website'].to_numpy(dtype=object)
+        duplicate_of = np.full(len(frame), '', dtype=object)
+        positions = np.arange(len(frame))
+        for key in DUPLICATE_KEYS:
+            column = frame[key]
+            codes, values = pd.factorize(column.where(column.ne('N/A')))
+            present = codes >= 0
+            if not len(values):
+                continue
+
+            # Row of each value's first appearance in this batch (codes run 0..len(values)-1)
+            _, first_index = np.unique(codes[present], return_index=True)
+            first_rows = positions[present][first_index]
+
+            # Earlier batches win; values new in this batch start with their own first row
+            seen = self.first_seen[key]
+            first_site = np.array([seen.get(value) for value in values], dtype=object)
+            new = pd.isna(first_site)
+            first_site[new] = websites[first_rows[new]]
+            seen.update(zip(values[new], first_site[new]))
+
+            first = first_site[codes]
+            is_duplicate = present & (first != websites) & (duplicate_of == '')
+            duplicate_of[is_duplicate] = first[is_duplicate]
+        return pd.Series(duplicate_of, index=frame.index)
+
+    def process_rows(self, rows):
+        """process() for a list of result row dicts; returns row dicts"""
+        if not rows:
+            return []
+        return self.process(pd.DataFrame(rows)).to_dict('records')
+
+    def iter_batches(self, row_batches):
+        """Normalize each batch of an iterable of row lists as it arrives"""
+        for rows in row_batches:
+            yield self.process_rows(rows)
+
+    def summary(self):
+        return {
+            'rows': self.rows,
+            'errors': self.errors,
+            'duplicates': self.duplicates,
+            'found': dict(self.found)
+        }
+
+    def summary_lines(self):
+        """Summary in the same shape save_to_csv prints"""
+        lines = [f"   • Websites with {label}: {self.found[field]}" for field, label in SUMMARY_FIELDS]
+        lines.append(f"   • Duplicate businesses: {self.duplicates}")
+        return lines
+
+
+def read_chunks(path, chunksize=100_000):
+    """DataFrames of a CSV or JSON Lines result file, chunksize rows at a time"""
+    if output_format(path) == 'jsonl':
+        return pd.read_json(path, lines=True, dtype=False, chunksize=chunksize)
+    # Keep 'N/A' and empty cells as text instead of NaN
+    return pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize)
+
+
+def postprocess_file(source, destination, country_code='1', chunksize=100_000):
+    """Normalize a result file chunk by chunk into destination; returns the PostProcessor"""
+    processor = PostProcessor(country_code)
+    as_jsonl = output_format(destination) == 'jsonl'
+    with open(destination, 'w', encoding='utf-8', newline='') as out:
+        for number, chunk in enumerate(read_chunks(source, chunksize)):
+            frame = processor.process(chunk)
+            if as_jsonl:
+                frame.to_json(out, orient='records', lines=True, force_ascii=False)
+            else:
+                frame.to_csv(out, index=False, header=number == 0)
+        if processor.rows == 0 and not as_jsonl:
+            out.write(','.join(CLEAN_FIELDS) + '\n')
+    return processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize phones, emails and Instagram links and flag duplicates")
+    parser.add_argument('input', help="CSV or .jsonl result file")
+    parser.add_argument('output', help="CSV or .jsonl file to write")
+    parser.add_argument('--country-code', default='1',
+                        help="calling code for numbers written without one (default: 1)")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="rows processed at a time (default: 100000)")
+    args = parser.parse_args()
+
+    processor = postprocess_file(args.input, args.output, args.country_code, args.chunksize)
+    print(f"💾 {processor.rows} rows saved to {args.output}")
+    print("\n📋 Summary:")
+    for line in processor.summary_lines():
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
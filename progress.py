@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Batched progress events for the web application
+Scraping at high concurrency produces several log lines per URL. Instead of
+one websocket frame per line, ProgressAggregator merges progress and log lines
+and emits a single 'progress_batch' event per interval with the latest
+progress, running counters and a capped sample of recent messages. For long
+command line runs ConsoleProgress prints one status line per interval instead.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+
+class ProgressAggregator:
+    """Collects progress updates and emits them as periodic batched events"""
+
+    def __init__(self, emit, job_id=None, interval=0.5, max_messages=20, event='progress_batch'):
+        self.emit = emit  # called as emit(event, data), e.g. socketio.emit
+        self.job_id = job_id
+        self.interval = interval
+        self.max_messages = max_messages
+        self.event = event
+
+        self._lock = threading.Lock()
+        self._messages = deque(maxlen=max_messages)
+        self._dropped = 0
+        self._counts = Counter()
+        self._progress = {'current': 0, 'total': 0, 'percentage': 0, 'current_url': ''}
+        self._dirty = False
+        self._closed = threading.Event()
+        self._thread = None
+        self.batches = 0
+
+    def start(self):
+        """Flush on a background thread every interval"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._thread.start()
+        return self
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.interval):
+            self.flush()
+
+    def message(self, message, progress_type='info'):
+        """Queue a log line; only the newest max_messages per batch are sent"""
+        with self._lock:
+            if len(self._messages) == self.max_messages:
+                self._dropped += 1
+            self._messages.append({
+                'message': message,
+                'type': progress_type,
+                'timestamp': datetime.now().strftime('%H:%M:%S')
+            })
+            self._counts[progress_type] += 1
+            self._dirty = True
+
+    def progress(self, current, total, current_url=''):
+        """Record the latest position; earlier positions in the same interval are merged"""
+        with self._lock:
+            self._progress = {
+                'current': current,
+                'total': total,
+                'percentage': round(current / total * 100, 1) if total else 0,
+                'current_url': current_url
+            }
+            self._dirty = True
+
+    def flush(self):
+        """Emit everything collected since the last batch, if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            batch = dict(self._progress)
+            batch.update({
+                'job_id': self.job_id,
+                'counts': dict(self._counts),
+                'messages': list(self._messages),
+                'dropped': self._dropped
+            })
+            self._messages.clear()
+            self._dropped = 0
+            self._dirty = False
+            self.batches += 1
+        self.emit(self.event, batch)
+
+    def close(self):
+        """Stop the background thread and send the final batch"""
+        self._closed.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConsoleProgress:
+    """Prints a status line from the scrape metrics every interval seconds (cron and container logs)"""
+
+    def __init__(self, metrics, interval=5.0, file=None):
+        self.metrics = metrics  # metrics.ScrapeMetrics the scraper records results in
+        self.interval = interval
+        self.file = file or sys.stderr
+        self._started = time.monotonic()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def line(self):
+        ok = self.metrics.value('results_total', outcome='ok')
+        errors = self.metrics.value('results_total', outcome='error')
+        elapsed = time.monotonic() - self._started
+        rate = (ok + errors) / elapsed if elapsed > 0 else 0.0
+        return f"⏳ {ok + errors} websites in {elapsed:.0f}s ({rate:.1f}/s), {errors} failed"
+
+    def _report_periodically(self):
+        while not self._closed.wait(self.interval):
+            print(self.line(), file=self.file, flush=True)
+
+    def start(self):
+        if self._thread is None:
+            self._started = time.monotonic()
+            self._thread = threading.Thread(target=self._report_periodically, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop reporting and print the final line"""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+        print(self.line(), file=self.file, flush=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
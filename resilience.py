@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Failure handling for the Website Business Information Scraper
+Every failed URL is given an error class (dns, refused, tls, timeout,
+connection, http_4xx, http_5xx, ...) that is recorded in its result row.
+Transient failures (timeouts, dropped connections, 408/429/5xx gateway errors)
+are retried with exponential backoff and full jitter, and a per-host circuit
+breaker stops fetching from hosts that keep failing so dead sites fail at once
+instead of each waiting out the full timeout.
+"""
+
+import random
+import socket
+import ssl
+import threading
+import time
+
+import requests
+from urllib3.exceptions import NameResolutionError
+
+ERROR_TYPES = ('dns', 'refused', 'tls', 'timeout', 'connection', 'http_4xx', 'http_5xx',
+               'content_type', 'offline', 'circuit_open', 'other')
+
+# HTTP statuses worth asking for again
+TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Error classes that say the host itself is failing (a 404 or a PDF does not)
+HOST_FAILURES = {'dns', 'refused', 'tls', 'timeout', 'connection', 'http_5xx'}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of fetching from a host whose circuit breaker is open"""
+
+    error_type = 'circuit_open'
+    transient = False
+
+
+def error_chain(error):
+    """The error and every exception it wraps (urllib3 reasons, causes and contexts)"""
+    seen = set()
+    stack = [error]
+    while stack:
+        current = stack.pop()
+        if not isinstance(current, BaseException) or id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        stack.extend(arg for arg in current.args if isinstance(arg, BaseException))
+        stack.extend((getattr(current, 'reason', None), current.__cause__, current.__context__))
+
+
+def classify_error(error):
+    """Short error class of an exception raised while scraping a URL"""
+    error_type = getattr(error, 'error_type', None)
+    if error_type:
+        return error_type
+
+    response = getattr(error, 'response', None)
+    if isinstance(error, requests.exceptions.HTTPError) and response is not None:
+        return 'http_5xx' if response.status_code >= 500 else 'http_4xx'
+    if isinstance(error, requests.exceptions.SSLError):
+        return 'tls'
+    if isinstance(error, requests.exceptions.Timeout):
+        return 'timeout'
+    if isinstance(error, requests.exceptions.ConnectionError):
+        for cause in error_chain(error):
+            if isinstance(cause, (NameResolutionError, socket.gaierror)):
+                return 'dns'
+            if isinstance(cause, ConnectionRefusedError):
+                return 'refused'
+            if isinstance(cause, ssl.SSLError):
+                return 'tls'
+            if isinstance(cause, (TimeoutError, socket.timeout)):
+                return 'timeout'
+        return 'connection'
+    return 'other'
+
+
+def is_transient(error):
+    """Whether asking again a little later may succeed"""
+    transient = getattr(error, 'transient', None)
+    if transient is not None:
+        return transient
+
+    error_type = classify_error(error)
+    if error_type in ('http_4xx', 'http_5xx'):
+        return error.response.status_code in TRANSIENT_STATUSES
+    return error_type in ('timeout', 'connection')
+
+
+class RetryPolicy:
+    """How many times, and after how long, transient failures are retried"""
+
+    def __init__(self, retries=2, base_delay=0.5, max_delay=8.0):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        """Full-jitter backoff: a random wait up to base_delay * 2**attempt, capped at max_delay"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Per-host breaker that opens after `threshold` failures in a row
+
+    While open, fetches from the host fail at once with CircuitOpenError. After
+    `cooldown` seconds one probe request is let through (half-open): a success
+    closes the breaker, a failure keeps it open for another cooldown.
+    """
+
+    def __init__(self, threshold=5, cooldown=300.0, max_hosts=100_000):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_hosts = max_hosts
+        self._lock = threading.Lock()
+        self._hosts = {}  # host -> [failures in a row, closed again at]
+
+    def _is_open(self, state, now):
+        return state is not None and state[0] >= self.threshold and now < state[1]
+
+    def allow(self, host):
+        """Whether a request to host may go out now"""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state[0] < self.threshold:
+                return True
+            now = time.monotonic()
+            if now < state[1]:
+                return False
+            # Half-open: this request is the probe, everyone else waits another cooldown
+            state[1] = now + self.cooldown
+            return True
+
+    def check(self, host):
+        """Raise CircuitOpenError if requests to host should not go out"""
+        if not self.allow(host):
+            raise CircuitOpenError(
+                f"Circuit open for {host} after {self.threshold} failures in a row, not fetching"
+            )
+
+    def record_success(self, host):
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host):
+        """Count a failure; returns True if the breaker is open now"""
+        with self._lock:
+            if host not in self._hosts and len(self._hosts) >= self.max_hosts:
+                self._prune()
+            state = self._hosts.setdefault(host, [0, 0.0])
+            state[0] += 1
+            now = time.monotonic()
+            if state[0] >= self.threshold:
+                state[1] = now + self.cooldown
+            return self._is_open(state, now)
+
+    def _prune(self):
+        """Forget hosts whose breaker is not open to keep memory flat on huge lists"""
+        now = time.monotonic()
+        for host in [host for host, state in self._hosts.items() if not self._is_open(state, now)]:
+            del self._hosts[host]
+        if len(self._hosts) >= self.max_hosts:
+            self._hosts.clear()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Columnar result store for the Website Business Information Scraper
+Keeps every run instead of overwriting business_info.csv. Each run is written
+a row group at a time into Parquet (or Arrow IPC) part files, partitioned by
+date and run:
+
+    results/date=2026-10-18/run=20261018T093012-4f1c2a/part-00000.parquet
+
+A part is written under a .tmp name and renamed when it is complete, so
+readers never see half-written files and a crash only loses the part that
+was open. Reads go through pyarrow.dataset and only touch the columns, runs
+and dates asked for, so comparing the emails of two weekly runs reads two
+columns of two runs, not whole files. Needs pyarrow (pip install pyarrow).
+
+Usage:
+    python resultstore.py runs results/
+    python resultstore.py read results/ --run latest --columns Website,Email -o emails.csv
+    python resultstore.py diff results/ previous latest --columns Email -o changed.csv
+    python resultstore.py import results/ business_info.csv --date 2026-10-11
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+
+from streaming import (CLEAN_FIELDS, COLUMNAR_EXTENSIONS, COLUMNAR_FORMATS, ColumnarRows, ResultWriter, load_pyarrow,
+                       output_format)
+
+# Rows per part file; a crash loses at most the part that was still open
+PART_ROWS = 250_000
+# Fields compared by diff when no columns are given
+DIFF_FIELDS = ('Business Name', 'Email', 'Instagram', 'Phone')
+# Run names that resolve to the newest and the one before it
+RUN_ALIASES = ('latest', 'previous')
+
+
+def new_run_id(now=None):
+    """A run ID that sorts by start time: 20261018T093012-4f1c2a"""
+    now = now or datetime.now()
+    return f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+class RunWriter(ResultWriter):
+    """ResultWriter that writes one run of a ResultStore as a series of part files
+
+    Every run has the normalized columns, so runs written with and without
+    --normalize share one schema ('Duplicate Of' is empty in the latter).
+    """
+
+    def __init__(self, directory, format='parquet', part_rows=PART_ROWS, row_group_size=10_000, first_part=0):
+        self.directory = directory
+        self.part_rows = part_rows
+        self.part_number = first_part
+        self.part_total = 0
+        self.parts = []
+        self.row_group_size = row_group_size
+        self.format = format
+        super().__init__(self._tmp_path(), format=format, fields=CLEAN_FIELDS, row_group_size=row_group_size)
+        # Reported as where the data went
+        self.path = directory
+
+    def _part_path(self):
+        return os.path.join(self.directory, f"part-{self.part_number:05d}{COLUMNAR_EXTENSIONS[self.format]}")
+
+    def _tmp_path(self):
+        return self._part_path() + '.tmp'
+
+    def write(self, row):
+        super().write(row)
+        self.part_total += 1
+        if self.part_total >= self.part_rows:
+            self._finish_part()
+            self.part_number += 1
+            self.part_total = 0
+            self._columnar = ColumnarRows(self._tmp_path(), self.fields, self.format, self.row_group_size)
+
+    def _finish_part(self):
+        self._columnar.close()
+        # An empty last part is only kept when the run has no other part
+        if self.part_total == 0 and self.parts:
+            os.remove(self._tmp_path())
+            return
+        os.replace(self._tmp_path(), self._part_path())
+        self.parts.append(self._part_path())
+
+    def close(self):
+        if self._columnar is None:
+            return
+        self.flush()
+        self._finish_part()
+        self._columnar = None
+
+
+class ResultStore:
+    """Result rows of many runs in one directory, partitioned by date and run"""
+
+    def __init__(self, root, format='parquet'):
+        if format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported store format {format!r}, use one of: {', '.join(COLUMNAR_FORMATS)}")
+        self.root = root
+        self.format = format
+        self.extension = COLUMNAR_EXTENSIONS[format]
+
+    def run_directory(self, run_id):
+        """The directory of an existing run, or None"""
+        matches = glob.glob(os.path.join(glob.escape(self.root), 'date=*', f'run={glob.escape(run_id)}'))
+        return matches[0] if matches else None
+
+    def open_run(self, run_id=None, date=None, part_rows=PART_ROWS, row_group_size=10_000):
+        """A RunWriter for a new run, or for more parts of an existing one
+
+        date (YYYY-MM-DD, default today) is only used for new runs.
+        """
+        load_pyarrow()
+        run_id = run_id or new_run_id()
+        directory = self.run_directory(run_id)
+        first_part = 0
+        if directory is None:
+            date = date or datetime.now().strftime('%Y-%m-%d')
+            directory = os.path.join(self.root, f'date={date}', f'run={run_id}')
+            os.makedirs(directory, exist_ok=True)
+        else:
+            first_part = len(self._part_files(directory))
+        writer = RunWriter(directory, self.format, part_rows, row_group_size, first_part)
+        writer.run_id = run_id
+        return writer
+
+    def _part_files(self, directory):
+        return sorted(glob.glob(os.path.join(glob.escape(directory), f'part-*{self.extension}')))
+
+    def runs(self):
+        """Every run, oldest first: dicts with run, date, parts and rows"""
+        runs = []
+        for directory in glob.glob(os.path.join(glob.escape(self.root), 'date=*', 'run=*')):
+            parts = self._part_files(directory)
+            if not parts:
+                continue
+            runs.append({
+                'run': os.path.basename(directory)[len('run='):],
+                'date': os.path.basename(os.path.dirname(directory))[len('date='):],
+                'parts': len(parts),
+                'rows': self._dataset(parts).count_rows(),
+            })
+        return sorted(runs, key=lambda run: (run['date'], run['run']))
+
+    def resolve_run(self, run_id):
+        """Turn 'latest' or 'previous' into a run ID; other IDs are checked to exist"""
+        if run_id in RUN_ALIASES:
+            run_ids = [run['run'] for run in self.runs()]
+            needed = RUN_ALIASES.index(run_id) + 1
+            if len(run_ids) < needed:
+                raise ValueError(f"The store has no {run_id} run ({len(run_ids)} runs)")
+            return run_ids[-needed]
+        if self.run_directory(run_id) is None:
+            raise ValueError(f"No run {run_id!r} in {self.root}")
+        return run_id
+
+    def files(self, runs=None, dates=None):
+        """Part files of the given runs and dates (all of them by default)"""
+        run_ids = None if runs is None else {self.resolve_run(run_id) for run_id in runs}
+        paths = []
+        for directory in sorted(glob.glob(os.path.join(glob.escape(self.root), 'date=*', 'run=*'))):
+            run_id = os.path.basename(directory)[len('run='):]
+            date = os.path.basename(os.path.dirname(directory))[len('date='):]
+            if (run_ids is None or run_id in run_ids) and (dates is None or date in dates):
+                paths.extend(self._part_files(directory))
+        return paths
+
+    def _dataset(self, paths):
+        pa, _ = load_pyarrow()
+        import pyarrow.dataset as ds
+
+        # date and run come from the directory names, as columns of every row
+        partitioning = ds.partitioning(pa.schema([('date', pa.string()), ('run', pa.string())]), flavor='hive')
+        return ds.dataset(paths, format='parquet' if self.format == 'parquet' else 'ipc',
+                          partitioning=partitioning, partition_base_dir=self.root)
+
+    def dataset(self, runs=None, dates=None):
+        """A pyarrow Dataset over the selected runs, with date and run columns"""
+        return self._dataset(self.files(runs, dates))
+
+    def read(self, columns=None, runs=None, dates=None, filter=None):
+        """A pyarrow Table of the selected columns and runs; filter is a pyarrow.compute expression"""
+        return self.dataset(runs, dates).to_table(columns=columns, filter=filter)
+
+    def scan(self, columns=None, runs=None, dates=None, filter=None, batch_size=65_536):
+        """Yield the selected rows as pyarrow RecordBatches, for results bigger than memory"""
+        yield from self.dataset(runs, dates).to_batches(columns=columns, filter=filter, batch_size=batch_size)
+
+    def diff(self, old_run, new_run, columns=DIFF_FIELDS, key='Website', include_unchanged=False):
+        """Compare two runs site by site on the given columns
+
+        Returns a pyarrow Table with the key, a Change column (added, removed,
+        changed or unchanged) and an "(old)" and "(new)" column per compared
+        column. Only the key and compared columns of the two runs are read; a
+        site that appears twice in one run is compared by its first row.
+        """
+        pa, _ = load_pyarrow()
+        import pyarrow.compute as pc
+
+        columns = list(columns)
+        sides = []
+        for run_id, label in ((old_run, 'old'), (new_run, 'new')):
+            table = self.read([key] + columns, runs=[run_id])
+            table = table.group_by(key, use_threads=False).aggregate([(column, 'first') for column in columns])
+            names = {f'{column}_first': f'{column} ({label})' for column in columns}
+            table = table.rename_columns([names.get(name, name) for name in table.column_names])
+            sides.append(table.append_column(f'_{label}', pa.array([True] * table.num_rows, pa.bool_())))
+
+        joined = sides[0].join(sides[1], keys=key, join_type='full outer')
+        added = pc.is_null(joined['_old'])
+        removed = pc.is_null(joined['_new'])
+        changed = pa.array([False] * joined.num_rows, pa.bool_())
+        for column in columns:
+            old, new = joined[f'{column} (old)'], joined[f'{column} (new)']
+            both_null = pc.and_(pc.is_null(old), pc.is_null(new))
+            differs = pc.and_not(pc.invert(pc.fill_null(pc.equal(old, new), False)), both_null)
+            changed = pc.or_(changed, differs)
+
+        change = pc.if_else(added, 'added', pc.if_else(removed, 'removed', pc.if_else(changed, 'changed', 'unchanged')))
+        result = pa.table(
+            [joined[key], change] + [joined[f'{column} ({label})'] for column in columns for label in ('old', 'new')],
+            names=[key, 'Change'] + [f'{column} ({label})' for column in columns for label in ('old', 'new')]
+        )
+        if not include_unchanged:
+            result = result.filter(pc.not_equal(result['Change'], 'unchanged'))
+        return result.sort_by(key)
+
+    def import_file(self, path, run_id=None, date=None):
+        """Store an existing CSV or JSON Lines result file as a run; returns the run's RunWriter"""
+        with open(path, encoding='utf-8', newline='') as f, self.open_run(run_id, date) as writer:
+            rows = (json.loads(line) for line in f if line.strip()) if path.endswith(('.jsonl', '.ndjson')) \
+                else csv.DictReader(f)
+            for row in rows:
+                writer.write(row)
+        return writer
+
+
+def write_table(table, destination):
+    """Write a pyarrow Table as CSV, JSON Lines, Parquet or Arrow ('-' for CSV on stdout)"""
+    format = 'csv' if destination == '-' else output_format(destination)
+    with ResultWriter(destination, format=format, fields=table.column_names) as writer:
+        for batch in table.to_batches():
+            for row in batch.to_pylist():
+                writer.write(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List, read, compare and import runs of a result store")
+    parser.add_argument('--format', choices=COLUMNAR_FORMATS, default='parquet',
+                        help="file format of the store (default: parquet)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    runs = commands.add_parser('runs', help="list the stored runs")
+    runs.add_argument('store')
+
+    read = commands.add_parser('read', help="read columns of some runs")
+    read.add_argument('store')
+    read.add_argument('--run', action='append', help="run ID, latest or previous (repeatable; default: all)")
+    read.add_argument('--date', action='append', help="YYYY-MM-DD partition (repeatable; default: all)")
+    read.add_argument('--columns', help="comma-separated columns (default: all, plus date and run)")
+    read.add_argument('-o', '--out', default='-', help="CSV, .jsonl, .parquet or .arrow file (default: CSV on stdout)")
+
+    diff = commands.add_parser('diff', help="sites added, removed or changed between two runs")
+    diff.add_argument('store')
+    diff.add_argument('old', help="run ID, latest or previous")
+    diff.add_argument('new', help="run ID, latest or previous")
+    diff.add_argument('--columns', default=','.join(DIFF_FIELDS),
+                      help=f"comma-separated columns to compare (default: {','.join(DIFF_FIELDS)})")
+    diff.add_argument('--key', default='Website', help="column identifying a business (default: Website)")
+    diff.add_argument('-o', '--out', default='-', help="CSV, .jsonl, .parquet or .arrow file (default: CSV on stdout)")
+
+    load = commands.add_parser('import', help="store a CSV or JSON Lines result file as a run")
+    load.add_argument('store')
+    load.add_argument('input')
+    load.add_argument('--run', help="run ID (default: a new one)")
+    load.add_argument('--date', help="YYYY-MM-DD partition (default: today)")
+    args = parser.parse_args()
+
+    try:
+        store = ResultStore(args.store, args.format)
+        if args.command == 'runs':
+            for run in store.runs():
+                print(f"{run['date']}  {run['run']}  {run['rows']:>10} rows  {run['parts']} parts")
+        elif args.command == 'read':
+            columns = args.columns.split(',') if args.columns else None
+            write_table(store.read(columns, runs=args.run, dates=args.date), args.out)
+        elif args.command == 'diff':
+            table = store.diff(args.old, args.new, args.columns.split(','), key=args.key)
+            write_table(table, args.out)
+            print(f"🔍 {table.num_rows} sites differ", file=sys.stderr)
+        else:
+            writer = store.import_file(args.input, args.run, args.date)
+            print(f"💾 {writer.total} rows stored as run {writer.run_id}")
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == '__main__':
+    main()
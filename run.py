@@ -5,21 +5,19 @@ Simple startup script for the Website Scraper Web App
 
 import os
 import sys
+from importlib.util import find_spec
+
+REQUIRED_PACKAGES = ('flask', 'flask_socketio', 'requests', 'bs4', 'pandas')
 
 def check_dependencies():
-    """Check if required packages are installed"""
-    try:
-        import flask
-        import flask_socketio
-        import requests
-        import bs4
-        import pandas
-        print("✅ All required packages are installed!")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing package: {e}")
+    """Check if required packages are installed (without importing them, which is slow)"""
+    missing = [name for name in REQUIRED_PACKAGES if find_spec(name) is None]
+    if missing:
+        print(f"❌ Missing package: {', '.join(missing)}")
         print("Please install requirements: pip install -r requirements.txt")
         return False
+    print("✅ All required packages are installed!")
+    return True
 
 def main():
     """Main startup function"""
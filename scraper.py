@@ -6,19 +6,97 @@ Scrapes business contact information from a list of websites and saves to CSV.
 
 import requests
 import re
-import pandas as pd
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import time
+import threading
 import csv
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from politeness import HostScheduler, host_key, parse_retry_after
+from parsers import extract_page, resolve_backend
+from streaming import RESULT_FIELDS
+from crawl import ContactCrawl, CONTACT_FIELDS
+from dedupe import canonical_url, iter_deduped, url_digest
+from network import DnsCache, ScraperAdapter, abort_response, end_trace, start_trace
+from metrics import ScrapeMetrics
+from resilience import CircuitBreaker, HOST_FAILURES, RetryPolicy, classify_error, is_transient
+
+class RetryAfterError(requests.exceptions.HTTPError):
+    """Raised when a host answers 429/503 with a Retry-After header"""
+    
+    def __init__(self, retry_after, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+class CacheMissError(requests.exceptions.RequestException):
+    """Raised in offline mode for pages that are not in the response cache"""
+    
+    error_type = 'offline'
+
+class ContentTypeError(requests.exceptions.RequestException):
+    """Raised for responses that are not HTML (PDFs, images, video, ...)"""
+    
+    error_type = 'content_type'
+
+class FetchDeadlineError(requests.exceptions.Timeout):
+    """Raised when a page takes longer than the per-URL deadline to download"""
+    
+    # The server is answering, just slowly; another full deadline rarely helps
+    transient = False
+
+# Content types worth parsing; a missing Content-Type is given the benefit of the doubt
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+READ_CHUNK_SIZE = 16 * 1024
 
 class BusinessScraper:
-    def __init__(self):
+    def __init__(self, scheduler=None, parser='auto', cache=None,
+                 contact_pages=0, contact_depth=1, site_time_budget=15.0,
+                 dns_cache=None, pool_hosts=256, pool_per_host=None, timing_sink=None,
+                 max_bytes=2 * 1024 * 1024, head_kb=None, fetch_deadline=30.0,
+                 retry_policy=None, breaker=None, metrics=None, candidate_sink=None, timeout=10):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
+        # Per-host rate and concurrency limits (replaces a flat sleep between sites)
+        self.scheduler = scheduler or HostScheduler()
+        # Shared DNS cache, and connection pools: how many hosts keep a pool and
+        # how many connections each keeps (defaults to the per-host limit)
+        self.dns_cache = dns_cache or DnsCache()
+        self.mount_adapter(pool_hosts, pool_per_host or self.scheduler.max_per_host)
+        # Called as timing_sink(url, phases) with dns/connect/tls/ttfb/body seconds for every fetch
+        self.timing_sink = timing_sink
+        # Called as candidate_sink(record) with the ranked candidates of every page
+        # (candidates.CandidateLog keeps them for ranking again offline)
+        self.candidate_sink = candidate_sink
+        # How many times to come back to a host that answered with Retry-After
+        self.retry_after_attempts = 2
+        # Backoff with jitter for transient failures, and a per-host breaker
+        # that fails fast on hosts that keep failing
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        # Phase timings and result counters (metrics.ScrapeMetrics, may be shared)
+        self.metrics = metrics or ScrapeMetrics()
+        # HTML parser backend ('auto' picks the fastest one installed)
+        self.parser = resolve_backend(parser)
+        # Optional on-disk response cache (http_cache.ResponseCache)
+        self.cache = cache
+        # Optional contact/about page crawl when the homepage lacks details:
+        # pages fetched per site, link depth, and seconds allowed per site
+        self.contact_pages = contact_pages
+        self.contact_depth = contact_depth
+        self.site_time_budget = site_time_budget
+        # Bounded downloads: connect/read timeout, body size cap, optionally stop
+        # head_kb KB after </head>, and wall-clock seconds allowed per page
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.head_kb = head_kb
+        self.fetch_deadline = fetch_deadline
+        # Where progress messages go (None is stdout; use stderr when piping results),
+        # and whether per-site messages are printed at all
+        self.log_file = None
+        self.verbose = True
+        
     def extract_business_name(self, soup, url):
         """Extract business name from title tag or other sources"""
         # Try to get from title tag first
@@ -110,125 +188,350 @@ class BusinessScraper:
         
         return "N/A"
     
+    def mount_adapter(self, pool_hosts, pool_per_host):
+        """Use pooled connections that resolve through the DNS cache and record timings"""
+        adapter = ScraperAdapter(self.dns_cache, pool_hosts=pool_hosts, pool_per_host=pool_per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def cached_page(self, url):
+        """Body of a fresh cached copy of url, or None if it has to be fetched"""
+        if self.cache is None:
+            return None
+        
+        entry = self.cache.get(url)
+        if self.cache.offline:
+            if entry is None:
+                raise CacheMissError(f"Not in cache (offline mode): {url}")
+            return entry.body
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry.body
+        return None
+    
+    def fetch_page(self, url):
+        """Download a page and return the raw response body"""
+        # Revalidate a stale cached copy instead of downloading it again
+        entry = self.cache.get(url) if self.cache is not None else None
+        headers = entry.conditional_headers() if entry is not None else None
+        
+        deadline = time.monotonic() + self.fetch_deadline
+        started = time.perf_counter()
+        trace = start_trace()
+        try:
+            timeout = min(self.timeout, self.fetch_deadline)
+            with self.session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+                if response.status_code == 304 and entry is not None:
+                    self.cache.refresh(entry)
+                    return entry.body
+                
+                # Let the scheduler cool the host down when it asks us to slow down
+                if response.status_code in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after is not None:
+                        raise RetryAfterError(
+                            retry_after,
+                            f"{response.status_code} Error: retry after {retry_after:.0f}s for url: {url}",
+                            response=response
+                        )
+                
+                response.raise_for_status()
+                self.check_content_type(response)
+                reading = time.perf_counter()
+                content, complete = self.read_body(response, deadline)
+                trace.add('body', time.perf_counter() - reading)
+        finally:
+            self.metrics.observe('fetch', time.perf_counter() - started)
+            self.record_timing(url, end_trace())
+        
+        self.metrics.inc('downloaded_bytes_total', len(content))
+        # A body cut off at max_bytes/head_kb is not the page; keep it out of the cache
+        if self.cache is not None and complete:
+            self.cache.store(url, content, response.headers)
+        return content
+    
+    def check_content_type(self, response):
+        """Refuse non-HTML responses before downloading their body"""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type and content_type not in HTML_CONTENT_TYPES:
+            raise ContentTypeError(f"Not an HTML page ({content_type}) for url: {response.url}", response=response)
+    
+    def read_body(self, response, deadline):
+        """Read the body in chunks, stopping at max_bytes (or head_kb KB after </head>)
+        and failing once the per-URL deadline has passed
+
+        Returns the body and whether it was read to the end. The deadline is enforced
+        by a timer that shuts the connection down, so a server trickling in a few bytes
+        at a time cannot hold a read open past it.
+        """
+        expired = threading.Event()
+
+        def expire():
+            expired.set()
+            abort_response(response)
+
+        timer = threading.Timer(max(0.0, deadline - time.monotonic()), expire)
+        timer.daemon = True
+        timer.start()
+
+        body = bytearray()
+        limit = self.max_bytes
+        head_end = -1
+        complete = True
+        try:
+            for chunk in response.iter_content(READ_CHUNK_SIZE):
+                searched = max(0, len(body) - 6)
+                body += chunk
+                
+                if self.head_kb is not None and head_end < 0:
+                    head_end = body.find(b'</head', searched)
+                    if head_end < 0:
+                        head_end = body.find(b'</HEAD', searched)
+                    if head_end >= 0:
+                        limit = min(limit, head_end + self.head_kb * 1024)
+                
+                if len(body) >= limit:
+                    del body[limit:]
+                    complete = False
+                    break
+        except requests.exceptions.RequestException:
+            if not expired.is_set():
+                raise
+        finally:
+            timer.cancel()
+        
+        if expired.is_set():
+            raise FetchDeadlineError(
+                f"Download took longer than {self.fetch_deadline:.0f}s for url: {response.url}"
+            )
+        return bytes(body), complete
+    
+    def record_timing(self, url, phases):
+        """Add the phase timings of one fetch to the metrics and the timing sink, if there is one"""
+        if phases is None:
+            return
+        self.metrics.observe_phases(phases)
+        if self.timing_sink is not None:
+            self.timing_sink(url, phases)
+    
+    def retry_delay(self, host, error, attempt):
+        """Seconds to wait before fetching again after a failed attempt, or None to give up"""
+        if isinstance(error, RetryAfterError):
+            # The host is up and asked us to slow down; the scheduler holds it off
+            if attempt >= self.retry_after_attempts:
+                return None
+            self.scheduler.backoff(host, error.retry_after)
+            self.metrics.inc('retries_total', type='retry_after')
+            return 0.0
+        
+        error_type = classify_error(error)
+        if error_type not in HOST_FAILURES:
+            # The host answered; a 408, 425 or 429 without Retry-After is still worth asking again
+            self.breaker.record_success(host)
+        elif self.breaker.record_failure(host):
+            return None
+        if attempt >= self.retry_policy.retries or not is_transient(error):
+            return None
+        self.metrics.inc('retries_total', type=error_type)
+        return self.retry_policy.delay(attempt)
+    
+    def polite_fetch(self, url):
+        """Fetch a page within the per-host limits, honouring Retry-After and
+        retrying transient failures unless the host's circuit breaker is open"""
+        # Fresh cached pages skip the network and the politeness delays
+        content = self.cached_page(url)
+        if content is not None:
+            return content
+        
+        host = host_key(url)
+        attempt = 0
+        while True:
+            self.breaker.check(host)
+            self.scheduler.acquire(host)
+            try:
+                content = self.fetch_page(url)
+            except requests.exceptions.RequestException as e:
+                delay = self.retry_delay(host, e, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.breaker.record_success(host)
+                return content
+            finally:
+                self.scheduler.release(host)
+            
+            attempt += 1
+            time.sleep(delay)
+    
+    def page_fields(self, content, url):
+        """Extract the business fields, plus likely contact links when crawling"""
+        timings = {}
+        fields = extract_page(content, url, self.parser, self.contact_pages, timings)
+        self.metrics.observe_phases(timings)
+        self.record_candidates(fields)
+        return fields
+    
+    def record_candidates(self, fields):
+        """Pass the page's candidate record to the candidate sink, if there is one"""
+        if self.candidate_sink is not None:
+            self.candidate_sink(fields['Candidates'])
+    
+    def parse_page(self, content, url):
+        """Parse a downloaded page and extract the business fields"""
+        return self.result_row(url, self.page_fields(content, url))
+    
+    def result_row(self, url, fields):
+        """Build the output row from extracted fields"""
+        return {
+            'Business Name': fields['Business Name'],
+            'Website': url,
+            'Email': fields['Email'],
+            'Instagram': fields['Instagram'],
+            'Phone': fields['Phone'],
+            'Error': '',
+            'Error Type': ''
+        }
+    
+    def empty_result(self, url, error='', error_type=''):
+        """Result row used when a website could not be scraped"""
+        return {
+            'Business Name': 'N/A',
+            'Website': url,
+            'Email': 'N/A',
+            'Instagram': 'N/A',
+            'Phone': 'N/A',
+            'Error': error,
+            'Error Type': error_type
+        }
+    
+    def log(self, message, progress_type='info'):
+        """Report scraping progress on the console"""
+        if self.verbose:
+            print(message, file=self.log_file)
+    
+    def prepare_url(self, url):
+        """Canonicalize the URL, adding https:// if no protocol specified"""
+        return canonical_url(url)
+    
+    def needs_contact_crawl(self, result, fields):
+        """Whether to look at contact/about pages for fields the homepage lacked"""
+        return (self.contact_pages > 0 and fields.get('Contact Links')
+                and any(result[field] == 'N/A' for field in CONTACT_FIELDS))
+    
+    def fetch_contact_page(self, link):
+        """Fields from one contact/about page, or None if it could not be loaded"""
+        try:
+            return self.page_fields(self.polite_fetch(link), link)
+        except Exception as e:
+            self.log(f"   ⚠️ Skipped {link}: {str(e)}", 'warning')
+            return None
+    
+    def crawl_contact_pages(self, result, links, deadline):
+        """Fill missing fields from contact/about pages, fetched concurrently"""
+        crawl = ContactCrawl(result, links, self.contact_pages, self.contact_depth, deadline)
+        pool = ThreadPoolExecutor(max_workers=self.contact_pages)
+        try:
+            batch = crawl.next_batch()
+            while batch:
+                futures = {pool.submit(self.fetch_contact_page, link): depth for link, depth in batch}
+                try:
+                    for future in as_completed(futures, timeout=max(crawl.time_left(), 0)):
+                        fields = future.result()
+                        if fields:
+                            crawl.add(fields, futures[future])
+                        if crawl.complete:
+                            break
+                except FuturesTimeoutError:
+                    self.log(f"   ⏱️ Site time budget used up for {result['Website']}", 'warning')
+                    break
+                batch = crawl.next_batch()
+        finally:
+            # Do not wait for pages that are no longer needed
+            pool.shutdown(wait=False, cancel_futures=True)
+        return crawl.result
+    
+    def found_website(self, result, started=None):
+        """Report a scraped website and return its result row"""
+        self.log(f"   ✅ Found: {result['Business Name']}", 'success')
+        self.metrics.record_result(result, time.monotonic() - started if started else None)
+        return result
+    
+    def failed_website(self, url, error, started=None):
+        """Report a failed website and return its empty result row"""
+        error_type = classify_error(error)
+        if isinstance(error, requests.exceptions.RequestException):
+            self.log(f"   ❌ Error loading {url} ({error_type}): {str(error)}", 'error')
+        else:
+            self.log(f"   ❌ Unexpected error with {url}: {str(error)}", 'error')
+        result = self.empty_result(url, str(error) or type(error).__name__, error_type)
+        self.metrics.record_result(result, time.monotonic() - started if started else None)
+        return result
+    
     def scrape_website(self, url):
         """Scrape a single website for business information"""
+        started = time.monotonic()
         try:
-            print(f"🔍 Scraping: {url}")
-            
-            # Add http:// if no protocol specified
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
+            self.log(f"🔍 Scraping: {url}", 'scraping')
+            url = self.prepare_url(url)
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            content = self.polite_fetch(url)
+            fields = self.page_fields(content, url)
+            result = self.result_row(url, fields)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if self.needs_contact_crawl(result, fields):
+                result = self.crawl_contact_pages(
+                    result, fields['Contact Links'], started + self.site_time_budget
+                )
+            return self.found_website(result, started)
             
-            business_name = self.extract_business_name(soup, url)
-            email = self.extract_email(soup, url)
-            instagram = self.extract_instagram(soup, url)
-            phone = self.extract_phone(soup, url)
-            
-            print(f"   ✅ Found: {business_name}")
-            
-            return {
-                'Business Name': business_name,
-                'Website': url,
-                'Email': email,
-                'Instagram': instagram,
-                'Phone': phone
-            }
-            
-        except requests.exceptions.RequestException as e:
-            print(f"   ❌ Error loading {url}: {str(e)}")
-            return {
-                'Business Name': 'N/A',
-                'Website': url,
-                'Email': 'N/A',
-                'Instagram': 'N/A',
-                'Phone': 'N/A'
-            }
         except Exception as e:
-            print(f"   ❌ Unexpected error with {url}: {str(e)}")
-            return {
-                'Business Name': 'N/A',
-                'Website': url,
-                'Email': 'N/A',
-                'Instagram': 'N/A',
-                'Phone': 'N/A'
-            }
+            return self.failed_website(url, e, started)
     
     def scrape_websites(self, urls):
         """Scrape multiple websites and return results"""
-        results = []
-        total_urls = len(urls)
+        # Spellings of the same site are scraped once, so progress counts distinct sites
+        total_urls = len({url_digest(url) for url in urls if url.strip()})
         
         print(f"🚀 Starting to scrape {total_urls} websites...")
         print("=" * 50)
         
-        for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{total_urls}] ", end="")
-            result = self.scrape_website(url.strip())
-            results.append(result)
-            
-            # Small delay to be respectful to servers
-            if i < total_urls:
-                time.sleep(1)
+        def scrape_each(distinct_urls):
+            for i, url in enumerate(distinct_urls, 1):
+                print(f"\n[{i}/{total_urls}] ", end="")
+                # Politeness delays are applied per host inside scrape_website
+                yield self.scrape_website(url)
         
-        return results
+        # Spellings of the same site are scraped once and copied to each input row
+        return list(iter_deduped(scrape_each, urls))
+    
+    def iter_websites(self, urls):
+        """Scrape websites from any iterable, yielding each result as soon as it is ready"""
+        for url in urls:
+            url = url.strip()
+            if url:
+                yield self.scrape_website(url)
     
     def save_to_csv(self, data, filename='business_info.csv'):
-        """Save scraped data to CSV file"""
-        df = pd.DataFrame(data)
+        """Normalize scraped data, flag duplicate businesses and save it to a CSV file"""
+        # pandas takes longer to import than the rest of the scraper together,
+        # so only runs that save with it pay for it
+        import pandas as pd
+        from postprocess import PostProcessor
+        
+        processor = PostProcessor()
+        df = processor.process(pd.DataFrame(data, columns=RESULT_FIELDS))
         df.to_csv(filename, index=False, encoding='utf-8')
         print(f"\n💾 Data saved to {filename}")
         print(f"📊 Total records: {len(data)}")
         
-        # Display summary
+        # Display summary (counted in the same pass as the normalization)
         print("\n📋 Summary:")
-        print(f"   • Websites with business names: {len([r for r in data if r['Business Name'] != 'N/A'])}")
-        print(f"   • Websites with emails: {len([r for r in data if r['Email'] != 'N/A'])}")
-        print(f"   • Websites with Instagram: {len([r for r in data if r['Instagram'] != 'N/A'])}")
-        print(f"   • Websites with phone numbers: {len([r for r in data if r['Phone'] != 'N/A'])}")
+        for line in processor.summary_lines():
+            print(line)
 
-def main():
-    """Main function to run the scraper"""
-    print("🌐 Website Business Information Scraper")
-    print("=" * 50)
-    
-    # List of websites to scrape - ADD YOUR WEBSITES HERE
-    websites = [
-        # Example websites (replace with your actual list)
-        "example.com",
-        "business-website.org",
-        "company-site.net"
-    ]
-    
-    # Alternative: Load from a text file
-    # with open('websites.txt', 'r') as f:
-    #     websites = [line.strip() for line in f if line.strip()]
-    
-    if not websites:
-        print("❌ No websites provided. Please add websites to the script or create a websites.txt file.")
-        return
-    
-    # Create scraper instance
-    scraper = BusinessScraper()
-    
-    # Scrape all websites
-    results = scraper.scrape_websites(websites)
-    
-    # Save results to CSV
-    scraper.save_to_csv(results)
-    
-    print("\n" + "=" * 50)
-    print("✅ Scraping complete! Data saved to business_info.csv")
-    
-    # Show first few results
-    if results:
-        print("\n📋 First few results:")
-        df = pd.DataFrame(results)
-        print(df.head().to_string(index=False))
+def main(argv=None):
+    """Command line entry point: python -m scraper run|worker [options] (see cli.py)"""
+    from cli import main as cli_main
+    cli_main(argv)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Streaming input and output for the Website Business Information Scraper
+Reads URLs lazily from a file or stdin and writes every result row to CSV or
+JSON Lines as soon as it is ready, so memory stays flat however long the list
+is and a crash only loses the rows that were still in flight. Parquet and Arrow
+output (needs pyarrow) is written one row group at a time.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import time
+import zlib
+
+from dedupe import iter_deduped
+
+RESULT_FIELDS = ['Business Name', 'Website', 'Email', 'Instagram', 'Phone', 'Error', 'Error Type']
+# Columns of normalized results (see postprocess.py)
+CLEAN_FIELDS = RESULT_FIELDS + ['Duplicate Of']
+# Rows normalized together when streaming with a PostProcessor
+NORMALIZE_BATCH = 100
+
+# Summary label for every field that is counted when it is not N/A
+SUMMARY_FIELDS = [
+    ('Business Name', 'business names'),
+    ('Email', 'emails'),
+    ('Instagram', 'Instagram'),
+    ('Phone', 'phone numbers'),
+]
+
+
+def iter_urls(source):
+    """Yield URLs one at a time from a path, '-' for stdin, or an open file
+
+    Blank lines and '#' comments (as in websites.txt) are skipped.
+    """
+    if hasattr(source, 'read'):
+        lines = source
+    elif source == '-':
+        lines = sys.stdin
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter_urls(f)
+        return
+
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield url
+
+
+OUTPUT_FORMATS = ('csv', 'jsonl', 'parquet', 'arrow')
+# Formats written by ColumnarRows, a row group at a time
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+COLUMNAR_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def output_format(path, default='csv'):
+    """Guess the output format from the file extension"""
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith('.parquet'):
+        return 'parquet'
+    if path.endswith(('.arrow', '.feather')):
+        return 'arrow'
+    return default
+
+
+def load_pyarrow():
+    """The pyarrow and pyarrow.parquet modules, imported on first use"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet and Arrow files need pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+class ColumnarRows:
+    """Writes result rows to a Parquet or Arrow IPC file as string columns, row_group_size rows at a time
+
+    The file is only readable once closed (both formats keep their index at the end).
+    """
+
+    def __init__(self, path, fields, format='parquet', row_group_size=10_000):
+        pa, pq = load_pyarrow()
+        self._pa = pa
+        self.fields = fields
+        self.schema = pa.schema([(field, pa.string()) for field in fields])
+        self.row_group_size = row_group_size
+        if format == 'parquet':
+            self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows as one row group (a record batch in Arrow files)"""
+        if not self.rows:
+            return
+        columns = {
+            field: [None if row.get(field) is None else str(row[field]) for row in self.rows]
+            for field in self.fields
+        }
+        self.writer.write_table(self._pa.Table.from_pydict(columns, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+class ResultWriter:
+    """Writes result rows to CSV, JSON Lines, Parquet or Arrow as they arrive and keeps summary counts"""
+
+    def __init__(self, path, format=None, flush_every=100, flush_interval=5.0, fields=None, append=False,
+                 row_group_size=10_000):
+        self.path = path
+        self.format = format or output_format(path)
+        if self.format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format {self.format!r}, use one of: {', '.join(OUTPUT_FORMATS)}")
+
+        self.fields = fields or RESULT_FIELDS
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.total = 0
+        self.counts = {field: 0 for field, _ in SUMMARY_FIELDS}
+
+        self._csv = None
+        self._columnar = None
+        if self.format in COLUMNAR_FORMATS:
+            if path == '-' or append:
+                raise ValueError(f"{self.format.title()} output must go to a new file (no stdout, no appending)")
+            self.file = None
+            self._owns_file = False
+            self._columnar = ColumnarRows(path, self.fields, self.format, row_group_size)
+        elif path == '-':
+            self.file = sys.stdout
+            self._owns_file = False
+        else:
+            # Appending (e.g. when resuming) continues an existing file without a second header
+            has_rows = append and os.path.exists(path) and os.path.getsize(path) > 0
+            self.file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+            self._owns_file = True
+
+        if self.format == 'csv':
+            self._csv = csv.DictWriter(self.file, fieldnames=self.fields, extrasaction='ignore')
+            if path == '-' or not has_rows:
+                self._csv.writeheader()
+
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, row):
+        """Write one result row"""
+        if self._csv is not None:
+            self._csv.writerow(row)
+        elif self._columnar is not None:
+            self._columnar.write(row)
+        else:
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+        self.total += 1
+        for field in self.counts:
+            if row.get(field, 'N/A') != 'N/A':
+                self.counts[field] += 1
+
+        # Flush every few rows or seconds so finished work survives a crash
+        self._unflushed += 1
+        if (self._unflushed >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        # Columnar rows wait for a full row group; small groups make slow files
+        if self.file is not None:
+            self.file.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self._columnar is not None:
+            self._columnar.close()
+        if self._owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def summary_lines(self):
+        """Summary in the same shape save_to_csv prints"""
+        lines = [f"📊 Total records: {self.total}", "", "📋 Summary:"]
+        for field, label in SUMMARY_FIELDS:
+            lines.append(f"   • Websites with {label}: {self.counts[field]}")
+        return lines
+
+
+def csv_chunks(row_batches, fields=None):
+    """Encode batches of result rows as CSV text, one chunk per batch after the header"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields or RESULT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    for rows in row_batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    """Compress a stream of text chunks into one gzip stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def row_batches(rows, size):
+    """Group an iterable of rows into lists of up to size rows"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_websites(scraper, urls, writer, journal=None, processor=None):
+    """Scrape an iterable of URLs and write each row as soon as it is ready
+
+    Spellings of the same site are scraped once; every input row still gets its row.
+    With a postprocess.PostProcessor rows are normalized NORMALIZE_BATCH at a
+    time before they are written (the journal keeps them as scraped).
+    """
+    def results():
+        for result in iter_deduped(scraper.iter_websites, urls):
+            if journal is not None:
+                journal.record(result)
+            yield result
+
+    if processor is None:
+        for result in results():
+            writer.write(result)
+    else:
+        for rows in processor.iter_batches(row_batches(results(), NORMALIZE_BATCH)):
+            for row in rows:
+                writer.write(row)
+    return writer.total
+
+
+def scrape_file(scraper, source, destination, format=None, journal=None, resume=False, processor=None):
+    """Stream URLs from source ('-' for stdin) into destination ('-' for stdout)
+
+    destination can also be an open ResultWriter, e.g. a run of a
+    resultstore.ResultStore. With a journal every finished URL is recorded;
+    with resume=True URLs the journal already has as done are skipped and new
+    rows are appended. With a postprocess.PostProcessor the rows are
+    normalized and get a 'Duplicate Of' column.
+    """
+    urls = iter_urls(source)
+    if journal is not None and resume:
+        urls = journal.pending(urls, key=scraper.prepare_url)
+
+    if not isinstance(destination, ResultWriter):
+        fields = CLEAN_FIELDS if processor is not None else None
+        destination = ResultWriter(destination, format=format, fields=fields, append=resume)
+    with destination as writer:
+        stream_websites(scraper, urls, writer, journal, processor)
+
+    # Keep stdout clean for the data when it is being piped
+    log = sys.stderr if writer.path == '-' else sys.stdout
+    print(f"\n💾 Data saved to {'stdout' if writer.path == '-' else writer.path}", file=log)
+    for line in writer.summary_lines():
+        print(line, file=log)
+    if processor is not None:
+        print(f"   • Duplicate businesses: {processor.duplicates}", file=log)
+    return writer
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent scraping engine, run against a local HTTP server
+"""
+
+import os
+import sys
+import time
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_scraper import AsyncBusinessScraper
+
+def test_results_keep_input_order(site, unthrottled):
+    """Results come back in the same order as the input URLs"""
+    urls = [f"{site}/shop{i}" for i in range(12)]
+
+    results = AsyncBusinessScraper(concurrency=6, scheduler=unthrottled).scrape_websites(urls)
+
+    assert [r['Website'] for r in results] == urls
+    assert results[3]['Business Name'] == 'shop3 Bakery'
+    assert results[3]['Email'] == 'shop3@bakery.com'
+    assert results[3]['Instagram'] == 'https://instagram.com/shop3'
+    assert results[3]['Phone'] == '(555) 123-4567'
+
+
+def test_fetches_run_concurrently(site, page_delay, unthrottled):
+    """A batch takes about one page delay per `concurrency` URLs, not per URL"""
+    urls = [f"{site}/shop{i}" for i in range(10)]
+
+    start = time.monotonic()
+    results = AsyncBusinessScraper(concurrency=10, scheduler=unthrottled).scrape_websites(urls)
+    elapsed = time.monotonic() - start
+
+    assert len(results) == 10
+    assert elapsed < page_delay * 5
+
+
+def test_errors_become_empty_rows(site, unthrottled):
+    """Unreachable sites still produce a row in their input position"""
+    urls = [f"{site}/first", "http://127.0.0.1:9/closed", f"{site}/last"]
+
+    results = AsyncBusinessScraper(concurrency=3, scheduler=unthrottled).scrape_websites(urls)
+
+    assert results[1]['Website'] == "http://127.0.0.1:9/closed"
+    assert results[1]['Business Name'] == 'N/A'
+    assert results[2]['Business Name'] == 'last Bakery'
+
+
+def test_process_pool_matches_thread_extraction(site, unthrottled):
+    """Extraction in worker processes gives the same rows in the same order"""
+    urls = [f"{site}/shop{i}" for i in range(8)] + ["http://127.0.0.1:9/closed"]
+
+    threaded = AsyncBusinessScraper(concurrency=8, scheduler=unthrottled).scrape_websites(urls)
+    pooled = AsyncBusinessScraper(
+        concurrency=8, workers=2, max_queued_pages=2, scheduler=unthrottled
+    ).scrape_websites(urls)
+
+    assert pooled == threaded
+    assert [r['Website'] for r in pooled] == urls
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the end-to-end benchmark and its offline fixture server
+"""
+
+import os
+import sys
+
+# Add current directory and the benchmarks folder to path to import modules
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import requests
+
+from bench_scraper import percentile, run
+from fixture_server import FixtureServer
+
+
+def test_fixture_server_routes():
+    """Pages, huge pages and error statuses are served locally"""
+    with FixtureServer(hosts=1) as server:
+        base = server.bases[0]
+        assert b'<' in requests.get(f"{base}/page/bakery.html").content
+        assert len(requests.get(f"{base}/huge?blocks=500").content) > 50_000
+        assert requests.get(f"{base}/status/503").status_code == 503
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0.0
+
+
+def test_benchmark_report_is_complete():
+    """A small concurrent run reports throughput, latency, phases and memory"""
+    report = run(urls=20, concurrency=4, delay=0.05, huge_blocks=500, error_share=0.2)
+
+    assert report['results']['ok'] + report['results']['errors'] == 20
+    assert report['results']['errors'] > 0
+    assert report['pages_per_sec'] > 0
+    assert report['latency_ms']['p50'] <= report['latency_ms']['p99']
+    assert set(report['phases_ms']) == {'fetch', 'parse', 'extract'}
+    assert report['phases_ms']['fetch'] > 0
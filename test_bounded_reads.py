@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for bounded response reading
+"""
+
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from http_cache import ResponseCache
+from scraper import BusinessScraper
+
+HEAD = b"<html><head><title>Big Page Co</title></head><body>"
+
+
+class BoundedHandler(BaseHTTPRequestHandler):
+    """Serves a PDF, a large page, a page that trickles in slowly and one that
+    drips in a byte at a time"""
+
+    sent = {}
+
+    def do_GET(self):
+        if self.path == '/brochure.pdf':
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/pdf')
+            self.send_header('Content-Length', str(10 * 1024 * 1024))
+            self.end_headers()
+            self.sent[self.path] = 0
+            return
+
+        if self.path == '/drip':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(HEAD) + 100))
+            self.end_headers()
+            self.sent[self.path] = 0
+            try:
+                self.write(HEAD)
+                for _ in range(100):
+                    self.wfile.flush()
+                    time.sleep(0.2)
+                    self.write(b'x')
+            except OSError:
+                pass
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.sent[self.path] = 0
+        try:
+            self.write(HEAD)
+            for _ in range(200):
+                if self.path == '/slow':
+                    time.sleep(0.05)
+                self.write(b"<p>" + b"x" * 16 * 1024 + b"</p>")
+            self.write(b"<p>tail@bigpage.com</p></body></html>")
+        except OSError:
+            pass
+
+    def write(self, data):
+        self.wfile.write(data)
+        self.sent[self.path] += len(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def bounded_site(serve):
+    BoundedHandler.sent = {}
+    return serve(BoundedHandler)
+
+
+def test_non_html_is_refused_before_download(bounded_site, unthrottled):
+    result = BusinessScraper(scheduler=unthrottled).scrape_website(f"{bounded_site}/brochure.pdf")
+    assert 'application/pdf' in result['Error']
+
+
+def test_body_is_capped(bounded_site, unthrottled):
+    scraper = BusinessScraper(scheduler=unthrottled, max_bytes=100 * 1024)
+    content = scraper.fetch_page(f"{bounded_site}/big")
+
+    assert len(content) == 100 * 1024
+    assert content.startswith(HEAD)
+    assert scraper.scrape_website(f"{bounded_site}/big")['Business Name'] == 'Big Page Co'
+
+
+def test_head_plus_n_kb(bounded_site, unthrottled):
+    scraper = BusinessScraper(scheduler=unthrottled, head_kb=8)
+    content = scraper.fetch_page(f"{bounded_site}/big")
+
+    assert len(content) == HEAD.index(b'</head') + 8 * 1024
+
+
+def test_deadline_covers_the_whole_download(bounded_site, unthrottled):
+    scraper = BusinessScraper(scheduler=unthrottled, fetch_deadline=0.5)
+    start = time.monotonic()
+    result = scraper.scrape_website(f"{bounded_site}/slow")
+
+    assert 'longer than' in result['Error']
+    assert time.monotonic() - start < 2
+
+
+def test_deadline_holds_when_the_body_drips_in(bounded_site, unthrottled):
+    """A server sending a byte at a time cannot keep a read open past the deadline"""
+    scraper = BusinessScraper(scheduler=unthrottled, fetch_deadline=1.0)
+    start = time.monotonic()
+    result = scraper.scrape_website(f"{bounded_site}/drip")
+
+    assert 'longer than' in result['Error']
+    assert time.monotonic() - start < 3
+
+
+def test_cut_off_bodies_are_not_cached(bounded_site, unthrottled, tmp_path):
+    """A body stopped at max_bytes is not stored as if it were the whole page"""
+    cache = ResponseCache(str(tmp_path))
+    scraper = BusinessScraper(scheduler=unthrottled, max_bytes=100 * 1024, cache=cache)
+    scraper.fetch_page(f"{bounded_site}/big")
+    assert cache.get(f"{bounded_site}/big") is None
+
+    BusinessScraper(scheduler=unthrottled, max_bytes=8 * 1024 * 1024, cache=cache).fetch_page(f"{bounded_site}/big")
+    assert cache.get(f"{bounded_site}/big") is not None
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for candidate collection, confidence ranking and offline re-ranking
+"""
+
+import csv
+import os
+import sys
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_scraper import AsyncBusinessScraper
+from candidates import (CandidateLog, best_fields, candidate_confidence, collect_candidates, merge_records,
+                        rank_candidates, read_records, rerank_file)
+from parsers import extract_page, parse_html
+from scraper import BusinessScraper
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+URL = 'https://www.brightsmilesdenver.com/'
+
+
+def dentist_record():
+    with open(os.path.join(PAGES_DIR, 'dentist.html'), 'rb') as f:
+        return collect_candidates(parse_html(f.read()), URL)
+
+
+def test_every_candidate_is_kept_with_its_source():
+    candidates = dentist_record()['candidates']
+    # The JSON-LD, tel: link and text sightings of one number are merged
+    assert candidates['Phone'][0] == ['+1-303-555-0199', 'json_ld', 'json_ld', 3]
+    assert [c[0] for c in candidates['Phone'][1:]] == ['2024', '2024 1105 7781 2290']
+    assert candidates['Email'] == [['frontdesk@brightsmilesdenver.com', 'json_ld', '', 2]]
+    assert candidates['Instagram'] == [['http://instagram.com/brightsmilesdenver', 'href', '', 1]]
+    assert [c[:2] for c in candidates['Business Name']] == [
+        ['Bright Smiles Family Dental', 'json_ld'],
+        ['Dentist in Denver | Bright Smiles Family Dental', 'title'],
+        ['Brightsmilesdenver', 'domain'],
+    ]
+
+
+def test_dates_and_ids_rank_below_real_numbers():
+    ranked = rank_candidates(dentist_record())
+    assert [value for _, value, _ in ranked['Phone']] == ['+1-303-555-0199', '2024 1105 7781 2290', '2024']
+    assert all(score < 0 for score, _, _ in ranked['Phone'][1:])
+
+    page = parse_html(b'<p>Order #20481193, shipped 2024-03-14. Since 1987.</p>')
+    assert best_fields(collect_candidates(page, URL))['Phone'] == 'N/A'
+
+
+def test_footer_and_link_sources():
+    page = parse_html(b'<body><p>Sales: 720-555-0100</p><footer><p>Office: 303-555-0142</p>\n'
+                      b'<a href="mailto:hi@shop.com">hi@shop.com</a></footer></body>')
+    record = collect_candidates(page, 'https://shop.com/')
+    assert record['candidates']['Phone'] == [['303-555-0142', 'footer', 'us', 1], ['720-555-0100', 'text', 'us', 1]]
+    assert record['candidates']['Email'] == [['hi@shop.com', 'href', '', 2]]
+    assert best_fields(record)['Phone'] == '303-555-0142'
+
+
+def test_extract_page_returns_ranked_fields_and_record():
+    with open(os.path.join(PAGES_DIR, 'dentist.html'), 'rb') as f:
+        fields = extract_page(f.read(), URL)
+    assert fields['Business Name'] == 'Bright Smiles Family Dental'
+    assert fields['Phone'] == '+1-303-555-0199'
+    assert fields['Candidates'] == dentist_record()
+
+
+def test_stored_candidates_are_ranked_again_offline(tmp_path):
+    path = tmp_path / 'candidates.jsonl'
+    with CandidateLog(str(path)) as log:
+        log(dentist_record())
+        # A contact page of the same site adds to the homepage's candidates
+        log({'url': URL + 'contact', 'candidates': {'Email': [['billing@brightsmilesdenver.com', 'footer', '', 4]]}})
+
+    assert rerank_file(str(path), str(tmp_path / 'default.csv')) == 1
+    with open(tmp_path / 'default.csv', encoding='utf-8') as f:
+        [row] = list(csv.DictReader(f))
+    assert (row['Website'], row['Email'], row['Phone']) == (URL, 'frontdesk@brightsmilesdenver.com', '+1-303-555-0199')
+
+    # A different scorer over the same stored records, no page involved
+    def footer_first(field, candidate, site):
+        return 2.0 if candidate[1] == 'footer' else candidate_confidence(field, candidate, site)
+
+    [record] = merge_records(read_records(str(path)))
+    assert best_fields(record, footer_first)['Email'] == 'billing@brightsmilesdenver.com'
+    assert best_fields(record, min_confidence=1.5) == {
+        'Business Name': 'N/A', 'Email': 'N/A', 'Instagram': 'N/A', 'Phone': 'N/A'
+    }
+
+
+def test_scrapers_send_records_to_the_candidate_sink(site, unthrottled):
+    for scraper_class in (BusinessScraper, AsyncBusinessScraper):
+        records = []
+        scraper = scraper_class(scheduler=unthrottled, candidate_sink=records.append)
+        scraper.scrape_websites([f"{site}/shop{i}" for i in range(3)])
+
+        assert sorted(record['url'] for record in records) == [f"{site}/shop{i}" for i in range(3)]
+        emails = [record['candidates']['Email'][0][0] for record in records]
+        assert sorted(emails) == [f"shop{i}@bakery.com" for i in range(3)]
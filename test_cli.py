@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the command line interface (python -m scraper run|worker)
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+
+# Add current directory to path to import modules
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+import pytest
+
+import cli
+from workqueue import WorkQueue
+
+
+def test_run_writes_jsonl_and_metrics(tmp_path, url_file, fast_options):
+    out = tmp_path / 'results.jsonl'
+    cli.main(['run', '--input', url_file(), '--out', str(out), '--journal', str(tmp_path / 'j.db'),
+              '--concurrency', '4', '--timeout', '5', '--metrics-file', str(tmp_path / 'metrics.prom')] + fast_options)
+
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [row['Email'] for row in rows] == [f"shop{i}@bakery.com" for i in range(3)]
+    assert 'scraper_results_total{outcome="ok"} 3' in (tmp_path / 'metrics.prom').read_text()
+
+
+def test_old_positional_form_still_runs(tmp_path, capsys, url_file, fast_options):
+    out = tmp_path / 'results.csv'
+    cli.main([url_file(2), str(out), '--journal', str(tmp_path / 'j.db')] + fast_options)
+    with open(out, encoding='utf-8') as f:
+        assert len(list(csv.DictReader(f))) == 2
+    assert 'Data saved to' in capsys.readouterr().out
+
+
+def test_parquet_output(tmp_path, url_file, fast_options):
+    pq = pytest.importorskip('pyarrow.parquet')
+    out = tmp_path / 'results.parquet'
+    cli.main(['run', '-i', url_file(), '-o', str(out), '--journal', str(tmp_path / 'j.db')] + fast_options)
+
+    table = pq.read_table(str(out), columns=['Website', 'Phone'])
+    assert table.num_rows == 3 and table.column_names == ['Website', 'Phone']
+    assert set(table.column('Phone').to_pylist()) == {'(555) 123-4567'}
+
+
+def test_normalize_cleans_rows_and_flags_duplicates(tmp_path, site, capsys, url_file, fast_options):
+    pytest.importorskip('pandas')
+    out = tmp_path / 'results.csv'
+    cli.main(['run', '-i', url_file(), '-o', str(out), '--journal', str(tmp_path / 'j.db'),
+              '--normalize'] + fast_options)
+
+    with open(out, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert {row['Phone'] for row in rows} == {'+15551234567'}
+    # Every fixture shop shares one phone number, so the later two point at the first
+    assert [row['Duplicate Of'] for row in rows] == ['', f"{site}/shop0", f"{site}/shop0"]
+    assert 'Duplicate businesses: 2' in capsys.readouterr().out
+
+
+def test_invalid_combinations_are_rejected(tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main(['run', '--input', str(tmp_path / 'missing.txt')])
+    with pytest.raises(SystemExit):
+        cli.main(['run', '--input', '-', '--out', '-', '--format', 'parquet'])
+
+
+def test_pipes_stdin_to_stdout_with_summary_progress(tmp_path, site):
+    urls = ''.join(f"{site}/shop{i}\n" for i in range(4))
+    completed = subprocess.run(
+        [sys.executable, '-m', 'scraper', 'run', '--journal', str(tmp_path / 'j.db'), '--input', '-', '--out', '-',
+         '--host-delay', '0', '--per-host', '20', '--progress', 'summary', '--progress-interval', '0.05'],
+        input=urls, capture_output=True, text=True, cwd=ROOT, check=True, timeout=60
+    )
+    rows = list(csv.DictReader(completed.stdout.splitlines()))
+    assert len(rows) == 4 and rows[0]['Business Name'] == 'shop0 Bakery'
+    assert '⏳ 4 websites' in completed.stderr
+    # Per-site lines are left out in summary mode
+    assert 'shop0@bakery.com' not in completed.stderr
+
+
+def test_worker_command_drains_a_queue(tmp_path, site, capsys, fast_options):
+    path = str(tmp_path / 'queue.db')
+    with WorkQueue(path) as queue:
+        job_id = queue.enqueue([f"{site}/shop{i}" for i in range(3)])
+
+    cli.main(['worker', '--queue', path, '--exit-when-idle', '--concurrency', '4'] + fast_options)
+
+    with WorkQueue(path) as queue:
+        assert queue.job_status(job_id)['completed'] == 3
+    assert 'scraped 3 websites' in capsys.readouterr().out
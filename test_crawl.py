@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for contact-page discovery
+"""
+
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from async_scraper import AsyncBusinessScraper
+from extraction import contact_links
+from scraper import BusinessScraper
+
+PAGES = {
+    '/': "<title>Harbor Florist</title><a href='/menu'>Menu</a>"
+         "<a href='/about-us'>About</a><a href='/contact'>Contact</a>",
+    '/contact': "<p>Write to </p><p>blooms@harborflorist.com</p>",
+    '/about-us': "<p>Call </p><p>(206) 555-0170</p><a href='/team'>Team</a>",
+    '/team': "<a href='https://instagram.com/harborflorist'>IG</a>",
+    '/menu': "<p>Roses</p>",
+}
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """A small site whose details are spread over several pages"""
+
+    requested = []
+
+    def do_GET(self):
+        self.requested.append(self.path)
+        if self.path == '/slow-contact':
+            time.sleep(2)
+        body = PAGES.get(self.path, '<p>slow</p>').encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def florist_site(serve):
+    SiteHandler.requested = []
+    return serve(SiteHandler)
+
+
+def test_contact_links_ranks_and_filters():
+    """Contact links come first, other sites and non-pages are dropped"""
+    hrefs = ['/about', 'https://www.shop.com/contact-us#form', 'mailto:a@b.com',
+             'https://other.com/contact', '/menu', '/about', 'https://shop.com/']
+    assert contact_links(hrefs, 'https://shop.com/', 5) == [
+        'https://www.shop.com/contact-us',
+        'https://shop.com/about',
+    ]
+    assert contact_links(hrefs, 'https://shop.com/', 1) == ['https://www.shop.com/contact-us']
+
+
+def test_crawl_fills_missing_fields(florist_site, unthrottled):
+    """Email and phone found on contact/about pages fill the homepage row"""
+    url = f"{florist_site}/"
+    scraper = BusinessScraper(scheduler=unthrottled, contact_pages=2, contact_depth=1)
+    result = scraper.scrape_website(url)
+
+    assert result['Business Name'] == 'Harbor Florist'
+    assert result['Email'] == 'blooms@harborflorist.com'
+    assert result['Phone'] == '(206) 555-0170'
+    assert result['Instagram'] == 'N/A'
+    assert '/menu' not in SiteHandler.requested
+
+
+def test_async_crawl_follows_links_to_depth(florist_site, unthrottled):
+    """With depth 2 the team page linked from the about page is checked too"""
+    url = f"{florist_site}/"
+    scraper = AsyncBusinessScraper(scheduler=unthrottled, contact_pages=3, contact_depth=2)
+    result = scraper.scrape_websites([url])[0]
+
+    assert result['Email'] == 'blooms@harborflorist.com'
+    assert result['Phone'] == '(206) 555-0170'
+    assert result['Instagram'] == 'https://instagram.com/harborflorist'
+
+
+def test_site_time_budget_stops_slow_pages(florist_site, unthrottled):
+    """A contact page slower than the site budget is abandoned"""
+    url = f"{florist_site}/"
+    scraper = AsyncBusinessScraper(scheduler=unthrottled, contact_pages=3, site_time_budget=0.5)
+    homepage = PAGES['/']
+    PAGES['/'] = "<title>Harbor Florist</title><a href='/slow-contact'>Contact</a>"
+    try:
+        start = time.monotonic()
+        result = scraper.scrape_websites([url])[0]
+        elapsed = time.monotonic() - start
+    finally:
+        PAGES['/'] = homepage
+
+    assert result['Email'] == 'N/A'
+    assert elapsed < 1.5
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for URL normalization and deduplication
+"""
+
+import os
+import sys
+import tracemalloc
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_scraper import AsyncBusinessScraper
+from dedupe import canonical_url, dedupe_key, iter_deduped
+from scraper import BusinessScraper
+
+
+def test_canonical_url():
+    assert canonical_url('example.com') == 'https://example.com'
+    assert canonical_url(' HTTPS://Example.COM:443//about//?utm_source=x&page=2#team ') == \
+        'https://example.com/about?page=2'
+    assert canonical_url('http://example.com/index.html?fbclid=abc') == 'http://example.com'
+    assert canonical_url('http://localhost:8080/shop/') == 'http://localhost:8080/shop'
+    assert canonical_url('http://[::1]:8000/x') == 'http://[::1]:8000/x'
+    assert canonical_url('https://[2001:DB8::1]:443/') == 'https://[2001:db8::1]'
+    assert canonical_url('https://user:pw@Example.com/') == 'https://user:pw@example.com'
+    # Generic parameters can change what a page shows, so only known trackers are dropped
+    assert canonical_url('https://shop.com/menu?source=lunch&ref=2&gclid=x') == 'https://shop.com/menu?source=lunch&ref=2'
+
+
+def test_spellings_of_one_site_share_a_key():
+    spellings = ['example.com', 'https://www.example.com/', 'http://example.com/index.html',
+                 'https://EXAMPLE.com/?utm_campaign=spring']
+    assert {dedupe_key(url) for url in spellings} == {'example.com'}
+    assert dedupe_key('example.com/shop') != dedupe_key('example.com')
+
+
+def fake_scrape(calls):
+    def scrape(urls):
+        for url in urls:
+            calls.append(url)
+            yield {'Website': canonical_url(url), 'Email': f"hi@{dedupe_key(url)}"}
+    return scrape
+
+
+def test_each_site_is_scraped_once_and_fanned_out_in_order():
+    calls = []
+    urls = ['example.com', 'shop.net', '', 'https://www.example.com/', 'http://shop.net/index.html', 'example.com']
+    rows = list(iter_deduped(fake_scrape(calls), urls))
+
+    assert calls == ['example.com', 'shop.net']
+    assert [row['Website'] for row in rows] == [
+        'https://example.com', 'https://shop.net', 'https://www.example.com',
+        'http://shop.net', 'https://example.com'
+    ]
+    assert [row['Email'] for row in rows] == ['hi@example.com', 'hi@shop.net', 'hi@example.com',
+                                              'hi@shop.net', 'hi@example.com']
+
+
+def test_duplicates_beyond_the_memory_window_are_scraped_again():
+    calls = []
+    urls = ['a.com', 'b.com', 'c.com', 'd.com', 'a.com', 'd.com']
+    rows = list(iter_deduped(fake_scrape(calls), urls, remember=2))
+
+    assert calls == ['a.com', 'b.com', 'c.com', 'd.com', 'a.com']
+    assert len(rows) == 6
+
+
+def test_memory_stays_flat_on_long_distinct_inputs():
+    def scrape(urls):
+        for url in urls:
+            yield {'Website': url}
+
+    def peak_bytes(count):
+        tracemalloc.start()
+        for _ in iter_deduped(scrape, (f"shop{i}.com" for i in range(count)), remember=100):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    # Ten times the sites must not cost anywhere near ten times the memory
+    assert peak_bytes(20_000) < 2 * peak_bytes(2_000)
+
+
+def test_async_engine_fetches_duplicates_once(site, unthrottled):
+    urls = [f"{site}/shop1", f"{site}/shop1/", f"{site}/shop2?utm_source=list", f"{site}/shop1/index.html"]
+    scraper = AsyncBusinessScraper(concurrency=4, scheduler=unthrottled)
+    results = scraper.scrape_websites(urls)
+
+    assert [row['Email'] for row in results] == ['shop1@bakery.com', 'shop1@bakery.com',
+                                                 'shop2@bakery.com', 'shop1@bakery.com']
+    assert results[2]['Website'] == f"{site}/shop2"
+
+
+def test_sequential_progress_counts_distinct_sites(capsys, site, unthrottled):
+    urls = [f"{site}/shop1", f"{site}/shop1/", f"{site}/shop2"]
+    results = BusinessScraper(scheduler=unthrottled).scrape_websites(urls)
+
+    assert len(results) == 3
+    out = capsys.readouterr().out
+    assert 'Starting to scrape 2 websites' in out and '[2/2]' in out and '/3]' not in out
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the extraction path every scrape uses (parsers.extract_page)
+"""
+
+import os
+import sys
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from parsers import available_backends, extract_page
+from scraper import BusinessScraper
+
+URL = 'https://www.example.com/'
+
+EDGE_CASES = [
+    # Email whose local part is a phone number: the digits are not a phone too
+    ("<p>Text 2175550142@vtext.com for updates</p>", {'Email': '2175550142@vtext.com'}),
+    ("<p>Text 2175550142@vtext.com or call (217) 555-0199</p>",
+     {'Email': '2175550142@vtext.com', 'Phone': '(217) 555-0199'}),
+    # A year is not a phone number, and this spacing is not a US number either
+    ("<p>Since 2019. Call (303)  555-0100</p>", {}),
+    # Address only in a mailto link, first one unusable
+    ("<a href='mailto:broken'>x</a><a href='mailto:owner@shop.io?cc=a@b.com'>y</a>", {'Email': 'owner@shop.io'}),
+    # Instagram only in text, mentioned after a non-profile link
+    ("<a href='https://example.com'>site</a><p>see https://www.instagram.com/shop_1 now</p>",
+     {'Instagram': 'https://www.instagram.com/shop_1'}),
+    # Title reduced to nothing by the suffix cleanup, the heading is used instead
+    ("<title> - Home</title><h1>Heading Shop</h1>", {'Business Name': 'Heading Shop'}),
+    # No title, whitespace heading, fallback to the domain
+    ("<h1>   </h1><p>nothing here</p>", {}),
+    ("", {}),
+]
+
+
+@pytest.mark.parametrize('html,expected', EDGE_CASES)
+def test_extract_page_edge_cases(html, expected):
+    """Every backend gives the expected fields; anything not listed is the domain name or N/A"""
+    row = dict({'Business Name': 'Example', 'Email': 'N/A', 'Instagram': 'N/A', 'Phone': 'N/A'}, **expected)
+    for backend in available_backends():
+        fields = extract_page(html.encode('utf-8'), URL, backend)
+        assert fields.pop('Candidates')['url'] == URL
+        assert fields == row, backend
+
+
+def test_parse_page_fills_every_column():
+    """parse_page builds the full result row from the ranked fields"""
+    html = b"<title>Corner Shop</title><p>(555) 010-2030 hi@corner.shop</p>"
+    result = BusinessScraper().parse_page(html, URL)
+    assert result == {
+        'Business Name': 'Corner Shop',
+        'Website': URL,
+        'Email': 'hi@corner.shop',
+        'Instagram': 'N/A',
+        'Phone': '(555) 010-2030',
+        'Error': '',
+        'Error Type': ''
+    }
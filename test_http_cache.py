@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk HTTP response cache
+"""
+
+import os
+import sys
+from http.server import BaseHTTPRequestHandler
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from http_cache import ResponseCache
+from politeness import HostScheduler
+from scraper import BusinessScraper
+
+ETAG = '"v1"'
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Serves one page with an ETag and answers 304 when it is unchanged"""
+
+    statuses = []
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == ETAG:
+            self.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.statuses.append(200)
+        body = b"<html><head><title>Cached Deli</title></head><body><p>Mail deli@example.com</p></body></html>"
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def etag_site(serve):
+    ETagHandler.statuses = []
+    return serve(ETagHandler)
+
+
+def scraper_with(cache):
+    return BusinessScraper(scheduler=HostScheduler(min_interval=0), cache=cache)
+
+
+def test_equivalent_urls_share_one_entry(tmp_path):
+    """The cache key is the canonical URL dedupe and the journal use"""
+    cache = ResponseCache(str(tmp_path))
+    cache.store('HTTPS://Example.COM:443/shop/index.html?utm_source=ad#top', b'<p>shop</p>', {})
+    for url in ('https://example.com/shop', 'example.com/shop/', 'https://example.com:443/shop?fbclid=1'):
+        assert cache.get(url).body == b'<p>shop</p>', url
+    assert cache.get('http://example.com:8080/shop') is None
+
+
+def test_fresh_entry_skips_network(etag_site, tmp_path):
+    """A page inside its TTL is served from disk"""
+    url = f"{etag_site}/"
+    scraper = scraper_with(ResponseCache(str(tmp_path)))
+
+    first = scraper.scrape_website(url)
+    second = scraper.scrape_website(url)
+
+    assert first == second
+    assert second['Email'] == 'deli@example.com'
+    assert ETagHandler.statuses == [200]
+
+
+def test_stale_entry_is_revalidated(etag_site, tmp_path):
+    """A stale page is revalidated with If-None-Match and reused on 304"""
+    url = f"{etag_site}/"
+    scraper = scraper_with(ResponseCache(str(tmp_path), ttl=0))
+
+    scraper.scrape_website(url)
+    result = scraper.scrape_website(url)
+
+    assert result['Business Name'] == 'Cached Deli'
+    assert ETagHandler.statuses == [200, 304]
+
+
+def test_offline_mode_uses_only_the_cache(etag_site, tmp_path):
+    """Offline runs re-extract cached pages and report misses as errors"""
+    url = f"{etag_site}/"
+    scraper_with(ResponseCache(str(tmp_path))).scrape_website(url)
+
+    offline = scraper_with(ResponseCache(str(tmp_path), offline=True))
+    assert offline.scrape_website(url)['Business Name'] == 'Cached Deli'
+
+    missing = offline.scrape_website('https://not-cached.example.com')
+    assert missing['Business Name'] == 'N/A'
+    assert 'offline' in missing['Error']
+
+
+def test_eviction_keeps_cache_under_limit(tmp_path):
+    """Least recently used pages are dropped once the cache is too big"""
+    cache = ResponseCache(str(tmp_path), max_bytes=5000)
+    for i in range(10):
+        cache.store(f"https://shop{i}.example.com/", b'x' * 1000, {'etag': f'"{i}"'})
+
+    total = sum(os.path.getsize(os.path.join(folder, name))
+                for folder, _, files in os.walk(str(tmp_path)) for name in files)
+    assert total <= 5000
+    assert cache.get('https://shop9.example.com/') is not None
+    assert cache.get('https://shop0.example.com/') is None
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for background scraping jobs and the per-job web endpoints
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep the web app's journal out of the working directory
+os.environ.setdefault('SCRAPER_JOURNAL', os.path.join(tempfile.mkdtemp(prefix='journal-'), 'journal.db'))
+
+import app as web_app
+from jobs import DONE, STOPPED, JobManager, JobQueueFullError
+
+
+def test_jobs_run_at_the_same_time(wait_for):
+    """Two jobs share the pool instead of waiting for each other"""
+    running = []
+    both_started = threading.Event()
+
+    def run_job(job):
+        running.append(job.id)
+        if len(running) == 2:
+            both_started.set()
+        assert both_started.wait(5)
+
+    manager = JobManager(run_job, max_workers=2)
+    first = manager.submit(['a.com'])
+    second = manager.submit(['b.com'])
+
+    assert wait_for(first).state == DONE
+    assert wait_for(second).state == DONE
+    assert manager.get(first.id) is first
+    assert manager.latest() is second
+    manager.shutdown()
+
+
+def test_stop_and_queue_limit(wait_for):
+    """A queued job can be cancelled and the waiting queue is bounded"""
+    release = threading.Event()
+    manager = JobManager(lambda job: release.wait(5), max_workers=1, max_queued=1)
+
+    busy = manager.submit(['a.com'])
+    waiting = manager.submit(['b.com'])
+    try:
+        manager.submit(['c.com'])
+        assert False, 'expected the queue to be full'
+    except JobQueueFullError:
+        pass
+
+    manager.stop(waiting.id)
+    release.set()
+    assert wait_for(busy).state == DONE
+    assert wait_for(waiting).state == STOPPED
+    manager.shutdown()
+
+
+def test_web_jobs_have_their_own_status_and_csv(site, wait_for):
+    """Each job started through the web app reports and downloads only its own rows"""
+    client = web_app.app.test_client()
+
+    job_ids = []
+    for name in ('shop1', 'shop2'):
+        response = client.post('/start_scraping', json={'urls': f"{site}/{name}"})
+        assert response.status_code == 200
+        job_ids.append(response.get_json()['job_id'])
+
+    for job_id, name in zip(job_ids, ('shop1', 'shop2')):
+        job = web_app.job_manager.get(job_id)
+        wait_for(job)
+
+        status = client.get(f'/jobs/{job_id}/status').get_json()
+        assert status['state'] == DONE
+        assert status['completed'] == 1
+
+        download = client.get(f'/jobs/{job_id}/download')
+        rows = list(csv.DictReader(io.StringIO(download.get_data(as_text=True))))
+        assert [row['Email'] for row in rows] == [f'{name}@bakery.com']
+
+    assert client.get('/jobs/missing/status').status_code == 404
+
+
+def test_status_is_counters_and_results_use_a_cursor(site, wait_for):
+    """Status carries no rows; rows come in pages from a cursor or as NDJSON"""
+    client = web_app.app.test_client()
+    urls = '\n'.join(f"{site}/shop{i}" for i in range(5))
+    job_id = client.post('/start_scraping', json={'urls': urls}).get_json()['job_id']
+    wait_for(web_app.job_manager.get(job_id), timeout=30)
+
+    status = client.get(f'/jobs/{job_id}/status').get_json()
+    assert 'results' not in status
+    assert status['completed'] == 5
+    assert status['found']['Email'] == 5
+
+    page = client.get(f'/jobs/{job_id}/results?since=0&limit=2').get_json()
+    assert [row['Website'] for row in page['results']] == [f"{site}/shop0", f"{site}/shop1"]
+    page = client.get(f"/jobs/{job_id}/results?since={page['next']}&limit=10").get_json()
+    assert len(page['results']) == 3
+    assert page['next'] == 5
+
+    stream = client.get(f'/jobs/{job_id}/results.ndjson?since=3')
+    lines = stream.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['Website'] for line in lines] == [f"{site}/shop3", f"{site}/shop4"]
+
+
+def test_download_streams_while_running_and_gzips():
+    """Downloads stream the rows finished so far and can be gzipped"""
+    release = threading.Event()
+
+    def run_job(job):
+        job.add_result({'Business Name': 'Early Bird', 'Website': 'https://early.example.com',
+                        'Email': 'N/A', 'Instagram': 'N/A', 'Phone': 'N/A', 'Error': ''})
+        release.wait(5)
+
+    manager = JobManager(run_job, max_workers=1)
+    job = manager.submit(['https://early.example.com', 'https://late.example.com'])
+    original, web_app.job_manager = web_app.job_manager, manager
+    try:
+        client = web_app.app.test_client()
+        while job.completed == 0:
+            time.sleep(0.01)
+
+        response = client.get(f'/jobs/{job.id}/download')
+        assert response.is_streamed
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [row['Business Name'] for row in rows] == ['Early Bird']
+
+        response = client.get(f'/jobs/{job.id}/download?gzip=1')
+        assert 'csv.gz' in response.headers['Content-Disposition']
+        text = gzip.decompress(response.get_data()).decode('utf-8')
+        assert text.splitlines()[0] == 'Business Name,Website,Email,Instagram,Phone,Error,Error Type'
+    finally:
+        release.set()
+        web_app.job_manager = original
+        manager.shutdown()
+
+
+def test_socket_events_only_reach_clients_watching_the_job(site, wait_for):
+    """Progress and results go to the job's room, and a late watcher still learns how it ended"""
+    client = web_app.app.test_client()
+    watcher = web_app.socketio.test_client(web_app.app)
+    other = web_app.socketio.test_client(web_app.app)
+    try:
+        job_id = client.post('/start_scraping', json={'urls': f"{site}/shop1"}).get_json()['job_id']
+        watcher.emit('watch_job', {'job_id': job_id})
+        wait_for(web_app.job_manager.get(job_id))
+
+        received = watcher.get_received()
+        assert 'scraping_complete' in [event['name'] for event in received]
+        assert all(event['args'][0]['job_id'] == job_id for event in received)
+        assert other.get_received() == []
+
+        other.emit('watch_job', {'job_id': job_id})
+        assert [event['name'] for event in other.get_received()] == ['scraping_complete', 'summary_update']
+    finally:
+        watcher.disconnect()
+        other.disconnect()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the crawl journal and resumable runs
+"""
+
+import csv
+import os
+import sys
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_scraper import AsyncBusinessScraper
+from journal import CrawlJournal
+from streaming import scrape_file
+
+
+def row(url, error=''):
+    return {'Business Name': 'Shop', 'Website': url, 'Email': 'N/A',
+            'Instagram': 'N/A', 'Phone': 'N/A', 'Error': error}
+
+
+def test_latest_entry_wins(tmp_path):
+    """A later success replaces an earlier failure for the same URL"""
+    with CrawlJournal(str(tmp_path / 'j.db')) as journal:
+        assert journal.record(row('https://a.com', error='timeout')) == 'failed'
+        assert not journal.is_done('https://a.com')
+
+        assert journal.record(row('https://a.com')) == 'done'
+        assert journal.is_done('https://a.com')
+        assert journal.counts() == {'done': 1, 'failed': 0}
+        assert [r['Website'] for r in journal.iter_results()] == ['https://a.com']
+
+
+def test_pending_skips_only_finished_urls(tmp_path):
+    """Unseen and failed URLs are still pending, finished ones are not"""
+    with CrawlJournal(str(tmp_path / 'j.db')) as journal:
+        journal.record(row('https://done.com'))
+        journal.record(row('https://failed.com', error='dns'))
+
+        pending = journal.pending(['done.com', 'failed.com', 'new.com'],
+                                  key=lambda url: 'https://' + url)
+        assert list(pending) == ['failed.com', 'new.com']
+
+
+def test_entries_survive_reopening(tmp_path):
+    """Committed entries are there after the journal is closed and reopened"""
+    path = str(tmp_path / 'j.db')
+    with CrawlJournal(path) as journal:
+        journal.record(row('https://a.com'))
+    with CrawlJournal(path) as journal:
+        assert journal.is_done('https://a.com')
+
+
+def test_resume_rescrapes_only_failed_urls(tmp_path, site, unthrottled):
+    """A resumed run appends rows only for URLs that did not finish"""
+    good = [f"{site}/shop{i}" for i in range(3)]
+    dead = "http://127.0.0.1:9/closed"
+    source = tmp_path / 'urls.txt'
+    source.write_text('\n'.join(good + [dead]) + '\n')
+    destination = str(tmp_path / 'out.csv')
+    scraper = AsyncBusinessScraper(concurrency=4, scheduler=unthrottled)
+
+    with CrawlJournal(str(tmp_path / 'j.db')) as journal:
+        first = scrape_file(scraper, str(source), destination, journal=journal)
+        second = scrape_file(scraper, str(source), destination, journal=journal, resume=True)
+
+    assert first.total == 4
+    assert second.total == 1
+
+    with open(destination, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['Website'] for r in rows] == good + [dead, dead]
+    assert rows[-1]['Error']
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for phase metrics, the /metrics endpoint and job profiling
+"""
+
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep the web app's journal out of the working directory
+os.environ.setdefault('SCRAPER_JOURNAL', os.path.join(tempfile.mkdtemp(prefix='journal-'), 'journal.db'))
+
+import app as web_app
+from async_scraper import AsyncBusinessScraper
+from metrics import Histogram, JobProfiler, ScrapeMetrics
+from scraper import BusinessScraper
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == float('inf')
+
+
+def test_render_is_prometheus_text():
+    metrics = ScrapeMetrics(buckets=(0.1, 1.0))
+    metrics.observe('fetch', 0.05)
+    metrics.observe('fetch', 0.5)
+    metrics.record_result({'Business Name': 'Shop', 'Email': 'N/A', 'Error': 'boom', 'Error Type': 'dns'})
+    text = metrics.render()
+
+    assert 'scraper_phase_seconds_bucket{phase="fetch",le="0.1"} 1' in text
+    assert 'scraper_phase_seconds_bucket{phase="fetch",le="+Inf"} 2' in text
+    assert 'scraper_phase_seconds_count{phase="fetch"} 2' in text
+    assert 'scraper_results_total{outcome="error"} 1' in text
+    assert 'scraper_errors_total{type="dns"} 1' in text
+    assert 'scraper_fields_found_total{field="Business Name"} 1' in text
+    assert '# TYPE scraper_downloaded_bytes_total counter' in text
+
+
+def test_scrapers_time_every_phase(site, unthrottled):
+    for scraper in (BusinessScraper(scheduler=unthrottled),
+                    AsyncBusinessScraper(concurrency=4, scheduler=unthrottled)):
+        scraper.scrape_websites([f"{site}/shop{i}" for i in range(3)])
+        metrics = scraper.metrics
+
+        for phase in ('fetch', 'ttfb', 'body', 'parse', 'extract', 'site'):
+            assert metrics.histogram(phase).count >= 3, phase
+        assert metrics.value('results_total', outcome='ok') == 3
+        assert metrics.value('fields_found_total', field='Email') == 3
+        assert metrics.value('downloaded_bytes_total') > 0
+        assert any('3 websites scraped' in line for line in metrics.summary_lines())
+
+
+def test_metrics_endpoint_counts_web_jobs(site, wait_for):
+    client = web_app.app.test_client()
+    response = client.post('/start_scraping', json={'urls': f"{site}/shop1"})
+    wait_for(web_app.job_manager.get(response.get_json()['job_id']))
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'scraper_results_total{outcome="ok"}' in text
+    assert 'scraper_phase_seconds_count{phase="fetch"}' in text
+    assert 'scraper_jobs{state="done"}' in text
+
+
+def busy():
+    total = 0
+    deadline = time.monotonic() + 0.1
+    while time.monotonic() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def test_job_profiler_writes_either_kind_of_profile(tmp_path):
+    prof = tmp_path / 'job.prof'
+    with JobProfiler(str(prof)):
+        busy()
+    assert any(name == 'busy' for _, _, name in pstats.Stats(str(prof)).stats)
+
+    stacks = tmp_path / 'job.stacks'
+    with JobProfiler(str(stacks), 'sample', interval=0.001):
+        busy()
+    assert 'busy (test_metrics.py' in stacks.read_text()
+
+    with JobProfiler(None):
+        busy()
+
+
+def test_sampling_can_be_limited_to_one_thread(tmp_path):
+    """A job's profile leaves out what other threads are doing at the same time"""
+    other = threading.Thread(target=busy)
+    stacks = tmp_path / 'job.stacks'
+    with JobProfiler(str(stacks), 'sample', interval=0.001, thread_ids=[threading.get_ident()]):
+        other.start()
+        busy()
+        other.join()
+    text = stacks.read_text()
+    assert 'test_sampling_can_be_limited_to_one_thread' in text
+    assert '_bootstrap' not in text
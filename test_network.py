@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the DNS cache, pooled connections and per-phase fetch timings
+"""
+
+import os
+import socket
+import sys
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from network import PHASES, DnsCache
+from scraper import BusinessScraper
+
+
+def test_answers_and_failures_are_cached(counting_getaddrinfo):
+    """Known hosts are looked up once per TTL and unknown ones fail fast"""
+    calls = counting_getaddrinfo
+    cache = DnsCache(ttl=60, negative_ttl=60)
+
+    assert cache.resolve('shop.example', 80) == cache.resolve('shop.example', 80)
+    for _ in range(3):
+        try:
+            cache.resolve('gone.invalid', 443)
+            assert False, 'expected a resolution error'
+        except socket.gaierror:
+            pass
+
+    assert calls == ['shop.example', 'gone.invalid']
+    assert cache.hits == 3
+
+
+def test_expired_entries_are_looked_up_again(counting_getaddrinfo):
+    calls = counting_getaddrinfo
+    cache = DnsCache(ttl=0, negative_ttl=0)
+    cache.resolve('shop.example', 80)
+    cache.resolve('shop.example', 80)
+    assert calls == ['shop.example', 'shop.example']
+
+
+def test_prefetch_is_shared_with_resolve(counting_getaddrinfo):
+    calls = counting_getaddrinfo
+    cache = DnsCache()
+    cache.prefetch('shop.example', 80)
+    cache.prefetch('shop.example', 80)
+    assert cache.resolve('shop.example', 80)
+    assert calls == ['shop.example']
+
+
+def test_fetches_use_the_cache_and_record_phases(site, unthrottled):
+    """Every fetch reports its phase timings and reuses cached DNS answers"""
+    timings = []
+    scraper = BusinessScraper(scheduler=unthrottled, timing_sink=lambda url, phases: timings.append((url, phases)))
+    base = site.replace('127.0.0.1', 'localhost')
+    first = scraper.scrape_website(f"{base}/shop1")
+    second = scraper.scrape_website(f"{base}/shop2")
+
+    assert first['Email'] == 'shop1@bakery.com'
+    assert second['Email'] == 'shop2@bakery.com'
+    assert [url for url, _ in timings] == [f"{base}/shop1", f"{base}/shop2"]
+    assert set(timings[0][1]) == set(PHASES)
+    assert timings[0][1]['ttfb'] > 0
+    assert scraper.dns_cache.misses == 1
+
+
+def test_unknown_domain_fails_with_an_error_row(unthrottled, counting_getaddrinfo):
+    result = BusinessScraper(scheduler=unthrottled).scrape_website('https://gone.invalid')
+    assert result['Business Name'] == 'N/A'
+    assert result['Error']
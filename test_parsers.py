@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the HTML parser backends
+"""
+
+import glob
+import os
+import sys
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import parsers
+from parsers import available_backends, extract_page, parse_html, resolve_backend
+from scraper import BusinessScraper
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+URL = 'https://www.example.com/'
+
+
+def fixture_pages():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append(pytest.param(f.read(), id=os.path.basename(path)))
+    return pages
+
+
+@pytest.mark.parametrize('html', fixture_pages())
+def test_backends_agree_on_fixture_corpus(html):
+    """Every installed backend extracts the same fields as html.parser"""
+    expected = extract_page(html, URL, 'html.parser', max_links=5)
+    for backend in available_backends():
+        assert extract_page(html, URL, backend, max_links=5) == expected, backend
+
+
+def test_backends_collect_footer_and_json_ld():
+    """Nested footers are read once and JSON-LD survives the script stripping"""
+    html = (b'<html><head><script type="Application/LD+JSON">{"telephone": "555"}</script>'
+            b'<script>var x = 1;</script></head><body><p>Main</p>'
+            b'<footer>Outer <footer>inner</footer> end</footer><footer>Second</footer></body></html>')
+    for backend in available_backends():
+        page = parse_html(html, backend)
+        assert page.footer == 'Outer inner end\nSecond', backend
+        assert page.json_ld == ['{"telephone": "555"}'], backend
+
+
+def test_auto_picks_fastest_installed(monkeypatch):
+    """auto prefers selectolax, then the lxml streaming path"""
+    assert resolve_backend('auto') == available_backends()[0]
+
+    monkeypatch.setattr(parsers, 'LexborHTMLParser', None)
+    assert resolve_backend('auto') == 'lxml-stream'
+
+    monkeypatch.setattr(parsers, 'etree', None)
+    assert resolve_backend('auto') == 'html.parser'
+
+
+def test_missing_backend_falls_back(monkeypatch):
+    """Asking for an uninstalled backend uses the best installed one instead"""
+    monkeypatch.setattr(parsers, 'LexborHTMLParser', None)
+    assert BusinessScraper(parser='selectolax').parser == 'lxml-stream'
+
+    with pytest.raises(ValueError):
+        resolve_backend('html5')
+
+
+def test_decode_html_uses_declared_charset():
+    """Pages declaring a legacy charset are decoded with it"""
+    html = '<meta charset="iso-8859-1"><title>Café</title>'.encode('latin-1')
+    for backend in available_backends():
+        assert parse_html(html, backend).title == 'Café', backend
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-host politeness scheduler
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_scraper import AsyncBusinessScraper
+from politeness import HostScheduler, host_key, parse_retry_after
+
+
+def test_host_key_ignores_case_and_port():
+    """Limits are tracked per host name"""
+    assert host_key('https://Example.COM:8443/contact') == 'example.com'
+    assert host_key('http://example.com') == 'example.com'
+
+
+def test_parse_retry_after():
+    """Retry-After accepts delta seconds and HTTP dates"""
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_same_host_is_spaced_out():
+    """A second request to one host waits for the minimum interval"""
+    scheduler = HostScheduler(min_interval=10, max_per_host=5)
+    assert scheduler.try_acquire('a.com') == 0.0
+    scheduler.release('a.com')
+    assert scheduler.try_acquire('a.com') > 9
+
+
+def test_other_hosts_are_not_delayed():
+    """Cooling one host never delays a different host"""
+    scheduler = HostScheduler(min_interval=10, max_per_host=1)
+    scheduler.backoff('slow.com', 60)
+    assert scheduler.try_acquire('slow.com') > 0
+    assert scheduler.try_acquire('fast.com') == 0.0
+    assert scheduler.try_acquire('other.com') == 0.0
+
+
+def test_per_host_concurrency_limit():
+    """No more than max_per_host requests run against one host at once"""
+    scheduler = HostScheduler(min_interval=0, max_per_host=2)
+    assert scheduler.try_acquire('a.com') == 0.0
+    assert scheduler.try_acquire('a.com') == 0.0
+    assert scheduler.try_acquire('a.com') > 0
+    scheduler.release('a.com')
+    assert scheduler.try_acquire('a.com') == 0.0
+
+
+class RateLimitedHandler(BaseHTTPRequestHandler):
+    """Answers 429 with Retry-After on the first request to each path"""
+
+    seen = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            first = self.path not in self.seen
+            self.seen.add(self.path)
+
+        if first:
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = b"<html><head><title>Patient Bakery</title></head><body></body></html>"
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_retry_after_is_honoured(serve):
+    """A 429 with Retry-After is retried once the host has cooled down"""
+    url = f"{serve(RateLimitedHandler)}/menu"
+    scraper = AsyncBusinessScraper(
+        concurrency=2, scheduler=HostScheduler(min_interval=0, max_per_host=2)
+    )
+
+    start = time.monotonic()
+    results = scraper.scrape_websites([url])
+    elapsed = time.monotonic() - start
+
+    assert results[0]['Business Name'] == 'Patient Bakery'
+    assert elapsed >= 1.0
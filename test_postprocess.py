@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the column-wise normalization of results and duplicate detection
+"""
+
+import csv
+import json
+import os
+import sys
+
+import pandas as pd
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from postprocess import (CLEAN_FIELDS, PostProcessor, normalize_emails, normalize_instagram,
+                         normalize_phones, postprocess_file)
+from scraper import BusinessScraper
+
+
+def row(website, email='N/A', instagram='N/A', phone='N/A', error=''):
+    return {'Business Name': 'Shop', 'Website': website, 'Email': email, 'Instagram': instagram,
+            'Phone': phone, 'Error': error, 'Error Type': 'dns' if error else ''}
+
+
+def test_phones_become_e164():
+    phones = pd.Series(['(555) 010-2030', '1-555-010-2030', '+44 20 7946 0958', '0044 20 7946 0958',
+                        '555-0102', 'N/A', None])
+    assert normalize_phones(phones).tolist() == [
+        '+15550102030', '+15550102030', '+442079460958', '+442079460958', 'N/A', 'N/A', 'N/A'
+    ]
+    assert normalize_phones(pd.Series(['030 1234567']), country_code='49').tolist() == ['+49301234567']
+
+
+def test_emails_are_lowercased_and_validated():
+    emails = pd.Series([' Info@Shop.COM ', 'logo@2x.png', 'not-an-email', 'N/A', None])
+    assert normalize_emails(emails).tolist() == ['info@shop.com', 'N/A', 'N/A', 'N/A', 'N/A']
+
+
+def test_instagram_links_are_canonical():
+    links = pd.Series(['http://www.instagram.com/Corner_Shop/', 'https://instagram.com/corner_shop?hl=en',
+                       'https://www.instagram.com/p/Cx1y2z', 'N/A'])
+    assert normalize_instagram(links).tolist() == [
+        'https://instagram.com/corner_shop', 'https://instagram.com/corner_shop', 'N/A', 'N/A'
+    ]
+
+
+def test_duplicates_are_flagged_across_batches_and_counted():
+    processor = PostProcessor()
+    first = processor.process(pd.DataFrame([
+        row('https://a.com', email='hi@a.com', phone='(555) 010-2030'),
+        row('https://b.com', phone='555.010.2030'),
+        row('https://c.com', error='gone'),
+    ]))
+    second = processor.process_rows([
+        row('https://d.com', email='HI@A.COM'),
+        row('https://e.com', instagram='instagram.com/e_shop'),
+        row('https://a.com', email='hi@a.com'),
+    ])
+
+    assert first['Duplicate Of'].tolist() == ['', 'https://a.com', '']
+    # The same site repeated (e.g. fanned out by the dedupe stage) is not a duplicate business
+    assert [r['Duplicate Of'] for r in second] == ['https://a.com', '', '']
+    assert list(first.columns) == CLEAN_FIELDS
+    assert processor.summary() == {
+        'rows': 6, 'errors': 1, 'duplicates': 2,
+        'found': {'Business Name': 6, 'Email': 3, 'Instagram': 1, 'Phone': 2}
+    }
+
+
+def test_files_are_processed_in_chunks(tmp_path):
+    source = tmp_path / 'results.csv'
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(row('x')))
+        writer.writeheader()
+        for i in range(25):
+            writer.writerow(row(f'https://s{i}.com', email=f'Team@S{i % 10}.com'))
+
+    processor = postprocess_file(str(source), str(tmp_path / 'clean.csv'), chunksize=7)
+    with open(tmp_path / 'clean.csv', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 25 and processor.duplicates == 15
+    assert rows[0]['Email'] == 'team@s0.com' and rows[0]['Phone'] == 'N/A'
+    assert rows[10]['Duplicate Of'] == 'https://s0.com'
+
+    postprocess_file(str(tmp_path / 'clean.csv'), str(tmp_path / 'clean.jsonl'), chunksize=10)
+    with open(tmp_path / 'clean.jsonl', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 25 and records[24]['Duplicate Of'] == 'https://s4.com'
+
+
+def test_save_to_csv_writes_normalized_rows(tmp_path, capsys):
+    path = tmp_path / 'business_info.csv'
+    BusinessScraper().save_to_csv([row('https://a.com', email='Hi@A.com', phone='(555) 010-2030')], str(path))
+    with open(path, encoding='utf-8') as f:
+        [saved] = list(csv.DictReader(f))
+    assert (saved['Email'], saved['Phone']) == ('hi@a.com', '+15550102030')
+    assert 'Websites with emails: 1' in capsys.readouterr().out
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for batched progress events
+"""
+
+import os
+import sys
+import time
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from progress import ProgressAggregator
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, data):
+        self.events.append((event, data))
+
+
+def test_updates_are_merged_into_one_batch():
+    """Many updates between flushes become one event with the latest progress"""
+    emit = Recorder()
+    progress = ProgressAggregator(emit, job_id='job1', max_messages=3)
+    for i in range(1, 101):
+        progress.progress(i, 100, f"https://shop{i}.example.com")
+        progress.message(f"Scraping shop{i}", 'scraping')
+    progress.message('Found one', 'success')
+    progress.flush()
+
+    assert len(emit.events) == 1
+    event, batch = emit.events[0]
+    assert event == 'progress_batch'
+    assert batch['job_id'] == 'job1'
+    assert (batch['current'], batch['total'], batch['percentage']) == (100, 100, 100.0)
+    assert batch['current_url'] == 'https://shop100.example.com'
+    assert [m['message'] for m in batch['messages']] == ['Scraping shop99', 'Scraping shop100', 'Found one']
+    assert batch['dropped'] == 98
+    assert batch['counts'] == {'scraping': 100, 'success': 1}
+
+
+def test_idle_flush_sends_nothing():
+    emit = Recorder()
+    progress = ProgressAggregator(emit)
+    progress.flush()
+    progress.message('hello')
+    progress.flush()
+    progress.flush()
+    assert len(emit.events) == 1
+
+
+def test_background_flush_and_final_batch():
+    """Batches go out on the interval and close() sends what is left"""
+    emit = Recorder()
+    with ProgressAggregator(emit, interval=0.05) as progress:
+        progress.message('first')
+        time.sleep(0.2)
+        progress.message('last')
+
+    messages = [m['message'] for _, batch in emit.events for m in batch['messages']]
+    assert messages == ['first', 'last']
+    assert len(emit.events) == 2
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar result store: partitioned runs, column reads and run diffs
+"""
+
+import os
+import sys
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pc = pytest.importorskip('pyarrow.compute')
+
+import cli
+from resultstore import ResultStore
+from streaming import ResultWriter
+
+
+def row(i, email=None):
+    return {'Business Name': f'Shop {i}', 'Website': f'https://shop{i}.com', 'Email': email or f'hi@shop{i}.com',
+            'Instagram': 'N/A', 'Phone': '(555) 123-4567', 'Error': '', 'Error Type': ''}
+
+
+def write_run(store, rows, run_id, date, part_rows=1000):
+    with store.open_run(run_id, date, part_rows=part_rows) as writer:
+        for result in rows:
+            writer.write(result)
+    return writer
+
+
+@pytest.mark.parametrize('format', ['parquet', 'arrow'])
+def test_runs_are_partitioned_by_date_and_run(tmp_path, format):
+    store = ResultStore(str(tmp_path), format)
+    writer = write_run(store, [row(i) for i in range(5)], 'week1', '2026-10-11', part_rows=2)
+
+    assert [os.path.basename(path) for path in writer.parts] == [f'part-0000{i}.{format}' for i in range(3)]
+    assert os.path.dirname(writer.parts[0]) == str(tmp_path / 'date=2026-10-11' / 'run=week1')
+    # Nothing half-written is left behind
+    assert not [name for name in os.listdir(writer.directory) if name.endswith('.tmp')]
+
+    # Another writer adds parts to the same run
+    write_run(store, [row(9)], 'week1', None)
+    write_run(store, [row(i) for i in range(2)], 'week2', '2026-10-18')
+    assert store.runs() == [
+        {'run': 'week1', 'date': '2026-10-11', 'parts': 4, 'rows': 6},
+        {'run': 'week2', 'date': '2026-10-18', 'parts': 1, 'rows': 2},
+    ]
+
+
+def test_reads_only_the_selected_columns_and_runs(tmp_path):
+    store = ResultStore(str(tmp_path))
+    write_run(store, [row(i) for i in range(3)], 'week1', '2026-10-11')
+    write_run(store, [row(i) for i in range(4)], 'week2', '2026-10-18')
+
+    table = store.read(['Website', 'Email', 'run'], runs=['latest'])
+    assert table.column_names == ['Website', 'Email', 'run'] and table.num_rows == 4
+    assert set(table.column('run').to_pylist()) == {'week2'}
+
+    assert store.read(['Website'], dates=['2026-10-11']).num_rows == 3
+    only_shop1 = store.read(['date'], filter=pc.field('Website') == 'https://shop1.com')
+    assert sorted(only_shop1.column('date').to_pylist()) == ['2026-10-11', '2026-10-18']
+    assert sum(batch.num_rows for batch in store.scan(['Website'], batch_size=2)) == 7
+
+    with pytest.raises(ValueError):
+        store.read(runs=['week3'])
+
+
+def test_diff_reports_added_removed_and_changed_sites(tmp_path):
+    store = ResultStore(str(tmp_path))
+    write_run(store, [row(0), row(1), row(2), row(2)], 'week1', '2026-10-11')
+    write_run(store, [row(1, 'new@shop1.com'), row(2), row(3)], 'week2', '2026-10-18')
+
+    diff = store.diff('previous', 'latest', columns=['Email'])
+    assert diff.to_pylist() == [
+        {'Website': 'https://shop0.com', 'Change': 'removed', 'Email (old)': 'hi@shop0.com', 'Email (new)': None},
+        {'Website': 'https://shop1.com', 'Change': 'changed', 'Email (old)': 'hi@shop1.com',
+         'Email (new)': 'new@shop1.com'},
+        {'Website': 'https://shop3.com', 'Change': 'added', 'Email (old)': None, 'Email (new)': 'hi@shop3.com'},
+    ]
+    # Phones did not change for any site both runs have
+    phones = store.diff('week1', 'week2', columns=['Phone'], include_unchanged=True)
+    assert dict(zip(phones.column('Website').to_pylist(), phones.column('Change').to_pylist()))['https://shop1.com'] \
+        == 'unchanged'
+
+
+def test_import_a_csv_snapshot(tmp_path):
+    path = str(tmp_path / 'business_info.csv')
+    with ResultWriter(path) as writer:
+        for i in range(3):
+            writer.write(row(i))
+
+    store = ResultStore(str(tmp_path / 'store'), 'arrow')
+    run = store.import_file(path, date='2026-10-04')
+    assert run.total == 3
+    assert store.read(['Email'], runs=[run.run_id]).column('Email').to_pylist() == [f'hi@shop{i}.com' for i in range(3)]
+
+
+def test_run_command_writes_into_the_store(tmp_path, url_file, fast_options):
+    store_dir = str(tmp_path / 'store')
+    for _ in range(2):
+        cli.main(['run', '-i', url_file(), '--store', store_dir, '--journal', str(tmp_path / 'j.db')]
+                 + fast_options)
+
+    store = ResultStore(store_dir)
+    assert [run['rows'] for run in store.runs()] == [3, 3]
+    assert store.diff('previous', 'latest').num_rows == 0
+    with pytest.raises(SystemExit):
+        cli.main(['run', '-i', url_file(), '--store', store_dir, '-o', 'x.csv'])
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for error classification, retries with backoff and the per-host circuit breaker
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from async_scraper import AsyncBusinessScraper
+from resilience import CircuitBreaker, RetryPolicy
+from scraper import BusinessScraper
+
+PAGE = b'<html><head><title>Flaky Bakery</title></head><body><p>Mail us: hello@flaky.com</p></body></html>'
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """/flaky/<n>/... fails with 503 n times before answering, /status/<code>/<n>/... with
+    <code>; /gone is a 404"""
+
+    hits = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.hits[self.path] += 1
+            hits = self.hits[self.path]
+
+        parts = self.path.strip('/').split('/')
+        if parts[0] == 'gone':
+            status = 404
+        elif parts[0] == 'flaky' and hits <= int(parts[1]):
+            status = 503
+        elif parts[0] == 'status' and hits <= int(parts[2]):
+            status = int(parts[1])
+        else:
+            status = 200
+
+        body = PAGE if status == 200 else b'unavailable'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_site(serve):
+    return serve(FlakyHandler)
+
+
+def closed_port():
+    """A local port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def fast_retries():
+    return RetryPolicy(retries=2, base_delay=0.01, max_delay=0.05)
+
+
+def test_transient_errors_are_retried(flaky_site, unthrottled):
+    url = f"{flaky_site}/flaky/2/sync"
+    result = BusinessScraper(scheduler=unthrottled, retry_policy=fast_retries()).scrape_website(url)
+    assert result['Email'] == 'hello@flaky.com'
+    assert result['Error Type'] == ''
+    assert FlakyHandler.hits['/flaky/2/sync'] == 3
+
+
+def test_async_engine_retries_too(flaky_site, unthrottled):
+    urls = [f"{flaky_site}/flaky/1/async{i}" for i in range(4)]
+    scraper = AsyncBusinessScraper(concurrency=4, scheduler=unthrottled, retry_policy=fast_retries())
+    results = scraper.scrape_websites(urls)
+    assert [r['Email'] for r in results] == ['hello@flaky.com'] * 4
+    assert all(FlakyHandler.hits[f"/flaky/1/async{i}"] == 2 for i in range(4))
+
+
+def test_retries_give_up_with_an_http_error_class(flaky_site, unthrottled):
+    scraper = BusinessScraper(scheduler=unthrottled, retry_policy=fast_retries())
+
+    failing = scraper.scrape_website(f"{flaky_site}/flaky/9/down")
+    missing = scraper.scrape_website(f"{flaky_site}/gone")
+
+    assert failing['Error Type'] == 'http_5xx'
+    assert FlakyHandler.hits['/flaky/9/down'] == 3
+    # Client errors are not worth asking again
+    assert missing['Error Type'] == 'http_4xx'
+    assert FlakyHandler.hits['/gone'] == 1
+
+
+def test_transient_client_errors_are_retried_without_tripping_the_breaker(flaky_site, unthrottled):
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    scraper = BusinessScraper(scheduler=unthrottled, retry_policy=fast_retries(), breaker=breaker)
+
+    # 429 Too Many Requests and 408 Request Timeout without a Retry-After header
+    for status in (429, 408):
+        result = scraper.scrape_website(f"{flaky_site}/status/{status}/2/sync")
+        assert (result['Email'], result['Error Type']) == ('hello@flaky.com', '')
+        assert FlakyHandler.hits[f'/status/{status}/2/sync'] == 3
+
+    failing = scraper.scrape_website(f"{flaky_site}/status/429/9/down")
+    assert failing['Error Type'] == 'http_4xx'
+    assert FlakyHandler.hits['/status/429/9/down'] == 3
+    assert breaker.allow("127.0.0.1")
+
+
+def test_connection_failures_are_classified(unthrottled, counting_getaddrinfo):
+    scraper = BusinessScraper(scheduler=unthrottled, retry_policy=fast_retries())
+    assert scraper.scrape_website('https://gone.invalid')['Error Type'] == 'dns'
+    assert scraper.scrape_website(f"http://127.0.0.1:{closed_port()}")['Error Type'] == 'refused'
+
+
+def test_breaker_fails_fast_on_a_dead_host(unthrottled):
+    port = closed_port()
+    scraper = BusinessScraper(scheduler=unthrottled, breaker=CircuitBreaker(threshold=2, cooldown=60))
+    results = [scraper.scrape_website(f"http://127.0.0.1:{port}/page{i}") for i in range(4)]
+    assert [r['Error Type'] for r in results] == ['refused', 'refused', 'circuit_open', 'circuit_open']
+
+
+def test_breaker_lets_one_probe_through_after_the_cooldown():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    breaker.record_failure('shop.example')
+    assert breaker.allow('shop.example')
+    assert breaker.record_failure('shop.example')
+    assert not breaker.allow('shop.example')
+
+    time.sleep(0.06)
+    assert breaker.allow('shop.example')  # the probe
+    assert not breaker.allow('shop.example')
+    breaker.record_success('shop.example')
+    assert breaker.allow('shop.example')
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(retries=5, base_delay=1.0, max_delay=3.0)
+    delays = [policy.delay(attempt) for attempt in range(5) for _ in range(20)]
+    assert all(0 <= delay <= 3.0 for delay in delays)
+    assert len(set(delays)) > 1
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Import-time regression checks: the scraping core starts fast and without pandas, Flask or bs4
+"""
+
+import os
+import subprocess
+import sys
+
+# Add current directory and the benchmarks folder to path to import modules
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bench_startup import STARTUP_BUDGETS, run
+
+
+def test_entry_modules_stay_within_their_startup_budget():
+    for row in run(repeat=3):
+        assert not row['unwanted'], f"{row['module']} imports {row['unwanted']}"
+        assert row['import_ms'] <= row['budget_ms'], f"{row['module']} took {row['import_ms']} ms"
+    assert set(STARTUP_BUDGETS) >= {'scraper', 'async_scraper', 'workqueue', 'app'}
+
+
+def test_heavy_dependencies_load_when_used(tmp_path):
+    code = (
+        "import sys, scraper; assert 'pandas' not in sys.modules; "
+        f"scraper.BusinessScraper().save_to_csv([], {str(tmp_path / 'out.csv')!r}); "
+        "assert 'pandas' in sys.modules; "
+        "from parsers import parse_html; parse_html(b'<title>Shop</title>', 'html.parser'); "
+        "assert 'bs4' in sys.modules"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True)
+
+
+def test_dependency_check_does_not_import_packages():
+    code = "import sys, run; assert run.check_dependencies(); assert 'pandas' not in sys.modules"
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming URL input and incremental result output
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_scraper import AsyncBusinessScraper
+from streaming import ResultWriter, iter_urls, scrape_file
+
+ROW = {
+    'Business Name': 'Corner Shop',
+    'Website': 'https://corner.shop',
+    'Email': 'hi@corner.shop',
+    'Instagram': 'N/A',
+    'Phone': 'N/A',
+    'Error': '',
+    'Error Type': ''
+}
+
+
+def test_iter_urls_skips_blanks_and_comments():
+    """websites.txt style comments and blank lines are ignored"""
+    source = io.StringIO("# my list\nexample.com\n\n  shop.net  \n# done\n")
+    assert list(iter_urls(source)) == ['example.com', 'shop.net']
+
+
+def test_csv_rows_are_visible_before_close(tmp_path):
+    """Rows reach the file as they are written, not only at the end"""
+    path = str(tmp_path / 'out.csv')
+    writer = ResultWriter(path, flush_every=1)
+    writer.write(ROW)
+
+    with open(path, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [ROW]
+    writer.close()
+
+
+def test_jsonl_output_and_summary(tmp_path):
+    """JSON Lines output keeps one row per line and counts found fields"""
+    path = str(tmp_path / 'out.jsonl')
+    with ResultWriter(path) as writer:
+        writer.write(ROW)
+        writer.write(dict(ROW, Email='N/A'))
+
+    with open(path, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert rows[0] == ROW
+    assert writer.total == 2
+    assert writer.counts['Email'] == 1
+    assert writer.counts['Business Name'] == 2
+
+
+def test_scrape_file_streams_generator_input(tmp_path, site, unthrottled):
+    """URLs are pulled lazily and every row lands in the output in input order"""
+    source = tmp_path / 'urls.txt'
+    source.write_text('\n'.join(f"{site}/shop{i}" for i in range(6)) + '\n')
+    destination = str(tmp_path / 'results.csv')
+
+    scraper = AsyncBusinessScraper(concurrency=3, scheduler=unthrottled)
+    writer = scrape_file(scraper, str(source), destination)
+
+    with open(destination, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert writer.total == 6
+    assert [row['Website'] for row in rows] == [f"{site}/shop{i}" for i in range(6)]
+    assert rows[2]['Email'] == 'shop2@bakery.com'
+
+
+def test_iter_websites_can_stop_early(site, unthrottled):
+    """Abandoning the result stream shuts the engine down cleanly"""
+    urls = (f"{site}/shop{i}" for i in range(50))
+
+    stream = AsyncBusinessScraper(concurrency=2, scheduler=unthrottled).iter_websites(urls)
+    first = next(stream)
+    stream.close()
+
+    assert first['Website'] == f"{site}/shop0"
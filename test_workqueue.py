@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite work queue, its workers and the queue-backed web front end
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add current directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep the web app's journal out of the working directory
+os.environ.setdefault('SCRAPER_JOURNAL', os.path.join(tempfile.mkdtemp(prefix='journal-'), 'journal.db'))
+
+import app as web_app
+from async_scraper import AsyncBusinessScraper
+from jobs import DONE, STOPPED
+from scraper import BusinessScraper
+from workqueue import QueueJobManager, QueueWorker, WorkQueue
+
+
+def row(url, email='N/A', error=''):
+    return {'Business Name': 'Shop', 'Website': url, 'Email': email, 'Instagram': 'N/A',
+            'Phone': 'N/A', 'Error': error, 'Error Type': 'dns' if error else ''}
+
+
+def test_each_site_is_queued_once_and_leased_once(tmp_path):
+    with WorkQueue(str(tmp_path / 'queue.db')) as queue:
+        job_id = queue.enqueue(['example.com', 'https://www.example.com/', '', 'other.org'])
+        # Every input row counts, as in the in-process job manager
+        assert queue.job_status(job_id)['total_urls'] == 3
+
+        tasks = queue.lease('w1', limit=10)
+        assert [task.url for task in tasks] == ['example.com', 'other.org']
+        assert queue.lease('w2', limit=10) == []
+        assert queue.job_status(job_id)['state'] == 'running'
+
+        assert queue.complete(tasks[0], row('https://example.com', email='hi@example.com'))
+        assert queue.job_status(job_id)['completed'] == 2
+        assert queue.complete(tasks[1], row('https://other.org', error='gone'))
+        status = queue.job_status(job_id)
+        assert (status['state'], status['completed'], status['failed']) == (DONE, 3, 1)
+        assert status['found']['Email'] == 2
+        # The duplicate row is a copy of its site's result with its own canonical URL
+        assert [(r['Website'], r['Email']) for r in queue.results(job_id)] == [
+            ('https://example.com', 'hi@example.com'), ('https://www.example.com', 'hi@example.com'),
+            ('https://other.org', 'N/A')]
+        assert queue.results(job_id, since=2) == [row('https://other.org', error='gone')]
+
+
+def test_expired_leases_are_redelivered_and_recorded_once(tmp_path):
+    with WorkQueue(str(tmp_path / 'queue.db')) as queue:
+        job_id = queue.enqueue(['example.com'])
+        first = queue.lease('w1', visibility_timeout=0.05)[0]
+        time.sleep(0.1)
+        second = queue.lease('w2', visibility_timeout=60)[0]
+        assert second.id == first.id and second.attempts == 2
+
+        # The slow first worker still finishes; the redelivery is then a duplicate
+        assert queue.complete(first, row('https://example.com'))
+        assert not queue.complete(second, row('https://example.com'))
+        assert len(queue.results(job_id)) == 1
+
+
+def test_tasks_that_keep_losing_their_worker_are_given_up(tmp_path):
+    with WorkQueue(str(tmp_path / 'queue.db'), max_attempts=2) as queue:
+        job_id = queue.enqueue(['example.com'])
+        for _ in range(2):
+            assert queue.lease('w', visibility_timeout=0)
+        assert queue.lease('w') == []
+
+        [result] = queue.results(job_id)
+        assert 'Gave up after 2 attempts' in result['Error']
+        assert queue.job_status(job_id)['state'] == DONE
+
+
+def test_released_and_cancelled_tasks(tmp_path):
+    with WorkQueue(str(tmp_path / 'queue.db')) as queue:
+        job_id = queue.enqueue(['a.com', 'b.com', 'c.com'])
+        tasks = queue.lease('w', limit=1)
+        queue.release(tasks)
+        again = queue.lease('w', limit=1)
+        assert again[0].id == tasks[0].id and again[0].attempts == 1
+
+        queue.cancel(job_id)
+        assert queue.lease('w') == []
+        # The task that was in flight still reports its result
+        assert queue.complete(again[0], row('https://a.com'))
+        assert queue.job_status(job_id)['state'] == STOPPED
+
+
+def test_workers_share_a_job(tmp_path, site, unthrottled):
+    path = str(tmp_path / 'queue.db')
+    with WorkQueue(path) as producer:
+        job_id = producer.enqueue([f"{site}/shop{i}" for i in range(12)])
+
+    queues = [WorkQueue(path) for _ in range(2)]
+    workers = [
+        QueueWorker(queues[0], BusinessScraper(scheduler=unthrottled), 'sync', batch_size=2),
+        QueueWorker(queues[1], AsyncBusinessScraper(concurrency=4, scheduler=unthrottled), 'async'),
+    ]
+    threads = [threading.Thread(target=worker.run, kwargs={'exit_when_idle': True}) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert sum(worker.processed for worker in workers) == 12
+    status = queues[0].job_status(job_id)
+    assert (status['state'], status['completed']) == (DONE, 12)
+    emails = sorted(r['Email'] for r in queues[0].results(job_id))
+    assert emails == sorted(f"shop{i}@bakery.com" for i in range(12))
+    for queue in queues:
+        queue.close()
+
+
+def test_worker_feeds_one_scraper_run_across_leases(tmp_path, site, unthrottled):
+    """Later leases go to the scraper that is already running instead of a new one per batch"""
+    runs = []
+
+    class CountingScraper(AsyncBusinessScraper):
+        def iter_websites(self, urls):
+            runs.append(1)
+            return super().iter_websites(urls)
+
+    with WorkQueue(str(tmp_path / 'queue.db')) as queue:
+        job_id = queue.enqueue([f"{site}/shop{i}" for i in range(10)])
+        worker = QueueWorker(queue, CountingScraper(concurrency=2, scheduler=unthrottled), batch_size=2)
+
+        assert worker.run(exit_when_idle=True) == 10
+        assert runs == [1]
+        assert queue.job_status(job_id)['completed'] == 10
+        assert sorted(r['Email'] for r in queue.results(job_id)) == sorted(f"shop{i}@bakery.com" for i in range(10))
+
+
+def test_web_app_as_a_queue_front_end(tmp_path, monkeypatch, site, unthrottled):
+    queue = WorkQueue(str(tmp_path / 'queue.db'))
+    monkeypatch.setattr(web_app, 'job_manager', QueueJobManager(queue))
+    try:
+        client = web_app.app.test_client()
+        url = f"{site}/shop1"
+        response = client.post('/start_scraping', json={'urls': f"{url}\n{url}/"})
+        job_id = response.get_json()['job_id']
+        assert client.get(f'/jobs/{job_id}/status').get_json()['state'] == 'queued'
+
+        worker_queue = WorkQueue(queue.path)
+        QueueWorker(worker_queue, BusinessScraper(scheduler=unthrottled)).run(exit_when_idle=True)
+        worker_queue.close()
+
+        status = client.get(f'/jobs/{job_id}/status').get_json()
+        assert (status['state'], status['completed'], status['total_urls'], status['is_running']) == (DONE, 2, 2, False)
+        rows = list(csv.DictReader(io.StringIO(client.get(f'/jobs/{job_id}/download').get_data(as_text=True))))
+        assert [r['Email'] for r in rows] == ['shop1@bakery.com'] * 2
+        assert client.get('/get_status').get_json()['job_id'] == job_id
+
+        # Options the queue cannot honour are refused, not dropped
+        response = client.post('/start_scraping', json={'urls': 'example.com', 'resume': True})
+        assert response.status_code == 400 and 'queue mode' in response.get_json()['error']
+    finally:
+        queue.close()
@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Distributed work queue for the Website Business Information Scraper
+A producer enqueues a job's URLs into a shared SQLite queue and any number of
+worker processes, on this machine or others that share the database file,
+lease batches of them, scrape them with the usual scraper and write the result
+rows back to the same database. Leases expire after a visibility timeout
+(workers extend them while they are busy), so URLs held by a crashed worker
+are handed out again: delivery is at least once, and a URL's result is
+recorded once. URLs that keep killing workers are given up on after
+max_attempts leases and recorded as failed rows. Each distinct site is
+scraped once per job, and its result is written back for every input row
+that named it, as in the in-process path (see dedupe.iter_deduped).
+
+The web app uses QueueJobManager as a drop-in for jobs.JobManager when
+SCRAPER_QUEUE is set, which turns it into a thin submit/monitor front end.
+
+Usage:
+    python workqueue.py enqueue websites.txt --queue queue.db
+    python workqueue.py worker --queue queue.db --concurrency 20
+    python workqueue.py status <job id> --queue queue.db
+    python workqueue.py export <job id> results.csv --queue queue.db
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from dedupe import canonical_url, url_digest
+from jobs import DONE, QUEUED, RUNNING, STOPPED
+from streaming import SUMMARY_FIELDS, ResultWriter, iter_urls
+
+PENDING = 'pending'  # waiting for a worker, or leased until lease_until
+CANCELLED = 'cancelled'
+
+
+class JobOptionError(ValueError):
+    """Raised for job options the queue front end cannot honour"""
+
+
+class Task:
+    """One leased URL; token identifies the lease"""
+
+    __slots__ = ('id', 'job_id', 'url', 'attempts', 'token')
+
+    def __init__(self, id, job_id, url, attempts, token):
+        self.id = id
+        self.job_id = job_id
+        self.url = url
+        self.attempts = attempts
+        self.token = token
+
+
+class WorkQueue:
+    """SQLite-backed queue of URLs with leases, plus the result rows of every job"""
+
+    def __init__(self, path='scrape_queue.db', max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.RLock()
+        # Autocommit mode: writes take the database lock up front with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                total INTEGER NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                found TEXT NOT NULL,
+                cancelled INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_until REAL NOT NULL DEFAULT 0,
+                lease_token TEXT,
+                worker TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tasks_available ON tasks (state, lease_until, id);
+            CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id, state);
+            CREATE TABLE IF NOT EXISTS inputs (
+                task_id INTEGER NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS inputs_task ON inputs (task_id);
+            CREATE TABLE IF NOT EXISTS results (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                task_id INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+        ''')
+
+    def _write(self):
+        return _Transaction(self)
+
+    def enqueue(self, urls, job_id=None):
+        """Add a job with one task per distinct site among urls; returns the job ID
+
+        Every input row is kept and counts toward the job's total, so the job
+        ends with one result row per input row, duplicates included.
+        """
+        job_id = job_id or uuid.uuid4().hex[:12]
+        found = json.dumps({field: 0 for field, _ in SUMMARY_FIELDS})
+        tasks = {}  # url digest -> task ID
+        total = 0
+        with self._write() as conn:
+            conn.execute('INSERT INTO jobs (id, total, found, created_at) VALUES (?, ?, ?, ?)',
+                         (job_id, 0, found, time.time()))
+            for url in urls:
+                url = url.strip()
+                if not url:
+                    continue
+                digest = url_digest(url)
+                task_id = tasks.get(digest)
+                if task_id is None:
+                    task_id = tasks[digest] = conn.execute(
+                        'INSERT INTO tasks (job_id, url, state) VALUES (?, ?, ?)', (job_id, url, PENDING)
+                    ).lastrowid
+                conn.execute('INSERT INTO inputs (task_id, url) VALUES (?, ?)', (task_id, url))
+                total += 1
+            conn.execute('UPDATE jobs SET total = ?, finished_at = ? WHERE id = ?',
+                         (total, None if total else time.time(), job_id))
+        return job_id
+
+    def lease(self, worker, limit=10, visibility_timeout=300):
+        """Lease up to limit available tasks (new ones, or ones whose lease expired)"""
+        token = uuid.uuid4().hex
+        now = time.time()
+        tasks = []
+        with self._write() as conn:
+            rows = conn.execute(
+                'SELECT id, job_id, url, attempts FROM tasks WHERE state = ? AND lease_until <= ? '
+                'ORDER BY lease_until, id LIMIT ?', (PENDING, now, limit)
+            ).fetchall()
+            for task_id, job_id, url, attempts in rows:
+                if attempts >= self.max_attempts:
+                    # Its earlier workers never came back: record it as failed instead
+                    message = f"Gave up after {attempts} attempts (worker lost while scraping)"
+                    self._finish(conn, task_id, job_id, {
+                        'Business Name': 'N/A', 'Website': url, 'Email': 'N/A', 'Instagram': 'N/A',
+                        'Phone': 'N/A', 'Error': message, 'Error Type': 'other'
+                    })
+                    continue
+                conn.execute(
+                    'UPDATE tasks SET attempts = attempts + 1, lease_until = ?, lease_token = ?, worker = ? '
+                    'WHERE id = ?', (now + visibility_timeout, token, worker, task_id)
+                )
+                tasks.append(Task(task_id, job_id, url, attempts + 1, token))
+        return tasks
+
+    def extend(self, tasks, visibility_timeout=300):
+        """Push back the lease expiry of tasks that are still being worked on"""
+        until = time.time() + visibility_timeout
+        with self._write() as conn:
+            conn.executemany(
+                'UPDATE tasks SET lease_until = ? WHERE id = ? AND lease_token = ? AND state = ?',
+                ((until, task.id, task.token, PENDING) for task in tasks)
+            )
+
+    def release(self, tasks):
+        """Hand tasks back unfinished (e.g. on shutdown) without counting the attempt"""
+        with self._write() as conn:
+            conn.executemany(
+                'UPDATE tasks SET lease_until = 0, lease_token = NULL, attempts = MAX(attempts - 1, 0) '
+                'WHERE id = ? AND lease_token = ? AND state = ?',
+                ((task.id, task.token, PENDING) for task in tasks)
+            )
+
+    def complete(self, task, result):
+        """Record a task's result row; returns False if another delivery already did"""
+        with self._write() as conn:
+            row = conn.execute('SELECT state FROM tasks WHERE id = ?', (task.id,)).fetchone()
+            if row is None or row[0] == DONE:
+                return False
+            self._finish(conn, task.id, task.job_id, result)
+        return True
+
+    def _finish(self, conn, task_id, job_id, result):
+        conn.execute('UPDATE tasks SET state = ?, lease_token = NULL WHERE id = ?', (DONE, task_id))
+        completed, total, found = conn.execute(
+            'SELECT completed, total, found FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        found = json.loads(found)
+        # The first input row gets the result as is, duplicates a copy with their own canonical URL
+        urls = [url for (url,) in conn.execute('SELECT url FROM inputs WHERE task_id = ? ORDER BY rowid',
+                                                (task_id,))]
+        rows = [result] + [dict(result, Website=canonical_url(url)) for url in urls[1:]]
+        for row in rows:
+            completed += 1
+            for field in found:
+                if row.get(field, 'N/A') != 'N/A':
+                    found[field] += 1
+            conn.execute('INSERT INTO results (job_id, seq, task_id, result) VALUES (?, ?, ?, ?)',
+                         (job_id, completed, task_id, json.dumps(row, ensure_ascii=False)))
+
+        conn.execute(
+            'UPDATE jobs SET completed = ?, failed = failed + ?, found = ?, finished_at = ? WHERE id = ?',
+            (completed, len(rows) if result.get('Error') else 0, json.dumps(found),
+             time.time() if completed >= total else None, job_id)
+        )
+
+    def cancel(self, job_id):
+        """Stop handing out a job's tasks; leased ones still report their results"""
+        with self._write() as conn:
+            conn.execute('UPDATE jobs SET cancelled = 1 WHERE id = ?', (job_id,))
+            conn.execute('UPDATE tasks SET state = ? WHERE job_id = ? AND state = ?',
+                         (CANCELLED, job_id, PENDING))
+
+    def job_status(self, job_id):
+        """Counters of a job as a dict, or None if there is no such job"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT total, completed, failed, found, cancelled, created_at, finished_at FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            leased = self.conn.execute(
+                'SELECT COUNT(*) FROM tasks WHERE job_id = ? AND state IN (?, ?) AND lease_until > ?',
+                (job_id, PENDING, CANCELLED, time.time())
+            ).fetchone()[0]
+
+        total, completed, failed, found, cancelled, created_at, finished_at = row
+        if completed >= total:
+            state = DONE
+        elif cancelled:
+            state = RUNNING if leased else STOPPED
+        else:
+            state = RUNNING if completed or leased else QUEUED
+        return {
+            'job_id': job_id,
+            'state': state,
+            'total_urls': total,
+            'completed': completed,
+            'failed': failed,
+            'in_progress': leased,
+            'found': json.loads(found),
+            'created_at': created_at,
+            'finished_at': finished_at,
+        }
+
+    def results(self, job_id, since=0, limit=None):
+        """Result rows of a job in the order they finished, from offset since"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT result FROM results WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?',
+                (job_id, since, -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(result) for (result,) in rows]
+
+    def job_ids(self, limit=100):
+        """IDs of the most recent jobs, newest first"""
+        with self._lock:
+            rows = self.conn.execute('SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,))
+            return [job_id for (job_id,) in rows]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT (or ROLLBACK) on the queue's connection"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __enter__(self):
+        self.queue._lock.acquire()
+        try:
+            self.queue.conn.execute('BEGIN IMMEDIATE')
+        except Exception:
+            self.queue._lock.release()
+            raise
+        return self.queue.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.queue.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self.queue._lock.release()
+
+
+class QueueWorker:
+    """Leases URLs as its scraper asks for them, scrapes them and writes their results back"""
+
+    def __init__(self, queue, scraper, worker_id=None, batch_size=None, visibility_timeout=300,
+                 poll_interval=2.0):
+        self.queue = queue
+        self.scraper = scraper
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        # URLs leased at a time; enough to keep every fetch slot of the async engine busy
+        self.batch_size = batch_size or max(1, getattr(scraper, 'concurrency', 1) * 2)
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.processed = 0
+
+    def run(self, stop=None, exit_when_idle=False):
+        """Work until stop is set (or, with exit_when_idle, until the queue is empty)"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            if not self.process(stop):
+                if exit_when_idle:
+                    break
+                stop.wait(self.poll_interval)
+        return self.processed
+
+    def process(self, stop=None):
+        """Scrape leased URLs until the queue runs dry, keeping the leases alive;
+        returns how many results were written
+
+        One scraper run is fed for the whole stretch and leases more URLs as it
+        asks for them, so its fetch slots are not left waiting for the slowest
+        URL of a batch and the async engine's loop and pools are set up once.
+        Results come back in input order, which matches them to their tasks.
+        """
+        stop = stop or threading.Event()
+        tasks = self.queue.lease(self.worker_id, self.batch_size, self.visibility_timeout)
+        if not tasks:
+            return 0
+
+        lock = threading.Lock()
+        unfinished = {}  # task ID -> Task, for the heartbeat and release
+        in_flight = deque()  # tasks handed to the scraper, in order
+        done = threading.Event()
+
+        def feed(tasks):
+            # Runs on the event loop thread of the async engine, so it must not wait
+            # for new work: when the queue is empty the run ends and run() polls
+            while tasks:
+                with lock:
+                    unfinished.update((task.id, task) for task in tasks)
+                for task in tasks:
+                    in_flight.append(task)
+                    yield task.url
+                if stop.is_set():
+                    return
+                tasks = self.queue.lease(self.worker_id, self.batch_size, self.visibility_timeout)
+
+        def heartbeat():
+            while not done.wait(self.visibility_timeout / 3):
+                with lock:
+                    tasks = list(unfinished.values())
+                if tasks:
+                    self.queue.extend(tasks, self.visibility_timeout)
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        written = 0
+        results = self.scraper.iter_websites(feed(tasks))
+        try:
+            for result in results:
+                task = in_flight.popleft()
+                self.queue.complete(task, result)
+                with lock:
+                    del unfinished[task.id]
+                self.processed += 1
+                written += 1
+                if stop.is_set():
+                    break
+        finally:
+            results.close()
+            done.set()
+            beat.join()
+            # Whatever was not finished goes straight back to the queue
+            if unfinished:
+                self.queue.release(list(unfinished.values()))
+        return written
+
+
+class QueueJob:
+    """A job in the work queue, with the interface of jobs.ScrapeJob for the web app"""
+
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.id = job_id
+
+    def status(self):
+        status = self.queue.job_status(self.id)
+        total = status['total_urls']
+        status.update({
+            'is_running': status['state'] in (QUEUED, RUNNING),
+            'current_url': '',
+            'progress': round(status['completed'] / total * 100, 1) if total else 0,
+            'error': None,
+            'started_at': None,
+            'csv_ready': status['completed'] > 0
+        })
+        return status
+
+    @property
+    def state(self):
+        return self.queue.job_status(self.id)['state']
+
+    @property
+    def is_running(self):
+        return self.state in (QUEUED, RUNNING)
+
+    @property
+    def total_urls(self):
+        return self.queue.job_status(self.id)['total_urls']
+
+    @property
+    def completed(self):
+        return self.queue.job_status(self.id)['completed']
+
+    @property
+    def found(self):
+        return self.queue.job_status(self.id)['found']
+
+    def stop(self):
+        self.queue.cancel(self.id)
+
+    def results_since(self, since=0, limit=None):
+        return self.queue.results(self.id, since, limit)
+
+    def iter_result_batches(self, since=0, follow=False, batch_size=500, poll_interval=0.5):
+        """Yield lists of result rows from offset since; with follow, until the job ends"""
+        while True:
+            # Check before reading so rows added just before the job ends are still sent
+            running = self.is_running
+            rows = self.results_since(since, batch_size)
+            if rows:
+                since += len(rows)
+                yield rows
+            elif follow and running:
+                time.sleep(poll_interval)
+            else:
+                return
+
+
+class QueueJobManager:
+    """jobs.JobManager stand-in that only enqueues; separate workers do the scraping"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def submit(self, urls, resume=False, profile=None):
+        """Enqueue a new job and return it
+
+        resume and profile are rejected rather than ignored: leases already
+        hand a lost worker's URLs to another one, and profiles are taken by
+        starting a worker with --profile.
+        """
+        if resume:
+            raise JobOptionError("Resume is not available in queue mode; unfinished URLs are retried by other workers")
+        if profile:
+            raise JobOptionError("Profiling is not available in queue mode; start the workers with --profile")
+        return QueueJob(self.queue, self.queue.enqueue(urls))
+
+    def get(self, job_id):
+        if self.queue.job_status(job_id) is None:
+            return None
+        return QueueJob(self.queue, job_id)
+
+    def latest(self):
+        job_ids = self.queue.job_ids(limit=1)
+        return QueueJob(self.queue, job_ids[0]) if job_ids else None
+
+    def jobs(self):
+        return [QueueJob(self.queue, job_id) for job_id in self.queue.job_ids()]
+
+    def stop(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.stop()
+        return job
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def add_worker_options(parser):
+    """Options of a queue worker, besides the scraper's own"""
+    parser.add_argument('--batch-size', type=int, help="URLs leased at a time (default: 2 x concurrency)")
+    parser.add_argument('--visibility-timeout', type=float, default=300,
+                        help="seconds before an unfinished lease is handed to another worker (default: 300)")
+    parser.add_argument('--exit-when-idle', action='store_true', help="stop once the queue is empty")
+
+
+def run_worker(queue, scraper, args):
+    """Run a QueueWorker with parsed worker options until it is stopped or, if asked, idle"""
+    worker = QueueWorker(queue, scraper, batch_size=args.batch_size, visibility_timeout=args.visibility_timeout)
+    print(f"👷 Worker {worker.worker_id} waiting for URLs in {queue.path}")
+    try:
+        worker.run(exit_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        pass
+    print(f"✅ Worker {worker.worker_id} scraped {worker.processed} websites")
+    return worker
+
+
+def main():
+    from cli import add_scraper_options, worker_command
+
+    parser = argparse.ArgumentParser(description="Queue URLs and scrape them with any number of workers")
+    parser.add_argument('--queue', default=os.environ.get('SCRAPER_QUEUE', 'scrape_queue.db'),
+                        help="queue database shared by the producer and workers (default: $SCRAPER_QUEUE or scrape_queue.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="add a job with the URLs of a file (- for stdin)")
+    enqueue.add_argument('input')
+
+    worker = commands.add_parser('worker', help="scrape queued URLs until stopped")
+    add_worker_options(worker)
+    add_scraper_options(worker)
+
+    status = commands.add_parser('status', help="show the counters of a job")
+    status.add_argument('job_id')
+
+    export = commands.add_parser('export', help="write a job's results to a CSV, .jsonl or .parquet file")
+    export.add_argument('job_id')
+    export.add_argument('output')
+    args = parser.parse_args()
+
+    if args.command == 'worker':
+        worker_command(args, parser)
+        return
+
+    with WorkQueue(args.queue) as queue:
+        if args.command == 'enqueue':
+            job_id = queue.enqueue(iter_urls(args.input))
+            print(f"📥 Queued job {job_id} with {queue.job_status(job_id)['total_urls']} websites")
+        elif args.command == 'status':
+            status = queue.job_status(args.job_id)
+            if status is None:
+                sys.exit(f"❌ No job {args.job_id} in {args.queue}")
+            print(json.dumps(status, indent=2))
+        else:
+            with ResultWriter(args.output) as writer:
+                since = 0
+                while True:
+                    rows = queue.results(args.job_id, since, 1000)
+                    if not rows:
+                        break
+                    for row in rows:
+                        writer.write(row)
+                    since += len(rows)
+            print(f"💾 {writer.total} rows saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()